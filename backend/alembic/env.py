@@ -3,6 +3,7 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 import os
+import sys
 from pathlib import Path
 
 # 添加项目根目录到路径
@@ -12,15 +13,21 @@ if sys_path not in sys.path:
 
 # 导入模型
 from app.models.base import Base
-from app.models.custom_character_db import CustomCharacterDB
-from app.models.user_progress_db import PracticeRecordDB, PracticeGoalDB
+from app.models.custom_character_db import CustomCharacterDB  # noqa: F401
+from app.models.user_progress_db import (  # noqa: F401  (注册表元数据)
+    PracticeRecordDB,
+    PracticeGoalDB,
+    UserProgressRollupDB,
+    UserCharacterRollupDB,
+    DailyUserStatsDB,
+)
 
 # Alembic Config 对象
 config = context.config
 
 # 解释配置文件中的 Python 日志配置
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # 为 autogenerate 支持添加模型的 MetaData 对象
 target_metadata = Base.metadata
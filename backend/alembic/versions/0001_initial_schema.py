@@ -0,0 +1,161 @@
+"""初始表结构：自定义范字、练习记录、练习目标及进度汇总表
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_initial_schema"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "custom_characters",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("char", sa.String(length=1), nullable=False),
+        sa.Column("style", sa.String(length=20), nullable=False),
+        sa.Column("strokes", sa.JSON(), nullable=False),
+        sa.Column("creator_id", sa.String(length=100), nullable=False),
+        sa.Column("creator_name", sa.String(length=100), nullable=False),
+        sa.Column("tags", sa.JSON(), nullable=True),
+        sa.Column("is_public", sa.Boolean(), nullable=True),
+        sa.Column("usage_count", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_custom_characters_id", "custom_characters", ["id"])
+    op.create_index("ix_custom_characters_char", "custom_characters", ["char"])
+    op.create_index("ix_custom_characters_creator_id", "custom_characters", ["creator_id"])
+    op.create_index("ix_custom_characters_is_public", "custom_characters", ["is_public"])
+
+    op.create_table(
+        "practice_records",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.String(length=100), nullable=False),
+        sa.Column("character", sa.String(length=1), nullable=False),
+        sa.Column("character_type", sa.String(length=20), nullable=False),
+        sa.Column("custom_character_id", sa.Integer(), nullable=True),
+        sa.Column("mode", sa.String(length=20), nullable=False),
+        sa.Column("total_score", sa.Integer(), nullable=False),
+        sa.Column("stroke_scores", sa.JSON(), nullable=False),
+        sa.Column("stroke_order_correct", sa.Boolean(), nullable=False),
+        sa.Column("posture_score", sa.Integer(), nullable=True),
+        sa.Column("grip_correct", sa.Boolean(), nullable=True),
+        sa.Column("time_spent", sa.Float(), nullable=False),
+        sa.Column("stroke_count", sa.Integer(), nullable=False),
+        sa.Column("score_level", sa.String(length=20), nullable=False),
+        sa.Column("client_record_id", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["custom_character_id"], ["custom_characters.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "client_record_id", name="uq_practice_records_user_client_record"),
+    )
+    op.create_index("ix_practice_records_id", "practice_records", ["id"])
+    op.create_index("ix_practice_records_user_id", "practice_records", ["user_id"])
+    op.create_index("ix_practice_records_character", "practice_records", ["character"])
+    op.create_index("ix_practice_records_created_at", "practice_records", ["created_at"])
+
+    op.create_table(
+        "practice_goals",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.String(length=100), nullable=False),
+        sa.Column("goal_type", sa.String(length=50), nullable=False),
+        sa.Column("target_value", sa.Float(), nullable=False),
+        sa.Column("current_value", sa.Float(), nullable=True),
+        sa.Column("deadline", sa.DateTime(), nullable=True),
+        sa.Column("achieved", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_practice_goals_id", "practice_goals", ["id"])
+    op.create_index("ix_practice_goals_user_id", "practice_goals", ["user_id"])
+
+    op.create_table(
+        "user_progress_rollup",
+        sa.Column("user_id", sa.String(length=100), nullable=False),
+        sa.Column("total_practices", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Integer(), nullable=False),
+        sa.Column("average_score", sa.Float(), nullable=False),
+        sa.Column("best_score", sa.Integer(), nullable=False),
+        sa.Column("total_time_spent", sa.Float(), nullable=False),
+        sa.Column("posture_score_sum", sa.Integer(), nullable=False),
+        sa.Column("posture_count", sa.Integer(), nullable=False),
+        sa.Column("grip_correct_count", sa.Integer(), nullable=False),
+        sa.Column("grip_count", sa.Integer(), nullable=False),
+        sa.Column("unique_characters", sa.Integer(), nullable=False),
+        sa.Column("recent_scores", sa.JSON(), nullable=False),
+        sa.Column("current_streak", sa.Integer(), nullable=False),
+        sa.Column("longest_streak", sa.Integer(), nullable=False),
+        sa.Column("last_practice_date", sa.Date(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_user_progress_rollup_ranking",
+        "user_progress_rollup",
+        ["average_score", "total_practices", "user_id"],
+    )
+
+    op.create_table(
+        "user_character_rollup",
+        sa.Column("user_id", sa.String(length=100), nullable=False),
+        sa.Column("character", sa.String(length=1), nullable=False),
+        sa.Column("practice_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Integer(), nullable=False),
+        sa.Column("average_score", sa.Float(), nullable=False),
+        sa.Column("best_score", sa.Integer(), nullable=False),
+        sa.Column("last_practiced_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user_progress_rollup.user_id"]),
+        sa.PrimaryKeyConstraint("user_id", "character"),
+    )
+    op.create_index(
+        "ix_user_character_rollup_character_ranking",
+        "user_character_rollup",
+        ["character", "average_score", "practice_count", "user_id"],
+    )
+
+    op.create_table(
+        "daily_user_stats",
+        sa.Column("user_id", sa.String(length=100), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("mode", sa.String(length=20), nullable=False),
+        sa.Column("practice_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Integer(), nullable=False),
+        sa.Column("excellent_count", sa.Integer(), nullable=False),
+        sa.Column("good_count", sa.Integer(), nullable=False),
+        sa.Column("pass_count", sa.Integer(), nullable=False),
+        sa.Column("fail_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "date", "mode"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_user_stats")
+    op.drop_index("ix_user_character_rollup_character_ranking", table_name="user_character_rollup")
+    op.drop_table("user_character_rollup")
+    op.drop_index("ix_user_progress_rollup_ranking", table_name="user_progress_rollup")
+    op.drop_table("user_progress_rollup")
+    op.drop_index("ix_practice_goals_user_id", table_name="practice_goals")
+    op.drop_index("ix_practice_goals_id", table_name="practice_goals")
+    op.drop_table("practice_goals")
+    op.drop_index("ix_practice_records_created_at", table_name="practice_records")
+    op.drop_index("ix_practice_records_character", table_name="practice_records")
+    op.drop_index("ix_practice_records_user_id", table_name="practice_records")
+    op.drop_index("ix_practice_records_id", table_name="practice_records")
+    op.drop_table("practice_records")
+    op.drop_index("ix_custom_characters_is_public", table_name="custom_characters")
+    op.drop_index("ix_custom_characters_creator_id", table_name="custom_characters")
+    op.drop_index("ix_custom_characters_char", table_name="custom_characters")
+    op.drop_index("ix_custom_characters_id", table_name="custom_characters")
+    op.drop_table("custom_characters")
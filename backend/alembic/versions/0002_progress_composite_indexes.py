@@ -0,0 +1,52 @@
+"""热点进度查询的复合索引
+
+- practice_records (user_id, created_at DESC, id DESC)：记录列表 / 游标分页
+- practice_records (user_id, character)：用户按字符统计
+- practice_records (character, user_id)：按字符跨用户统计（排行榜重建）
+- custom_characters (created_at DESC, id DESC) 与 (creator_id, created_at DESC, id DESC)：
+  范字列表游标分页
+
+Revision ID: 0002_progress_composite_indexes
+Revises: 0001_initial_schema
+Create Date: 2024-03-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_progress_composite_indexes"
+down_revision: Union[str, None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_practice_records_user_created",
+        "practice_records",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index("ix_practice_records_user_character", "practice_records", ["user_id", "character"])
+    op.create_index("ix_practice_records_character_user", "practice_records", ["character", "user_id"])
+    op.create_index(
+        "ix_custom_characters_created",
+        "custom_characters",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_custom_characters_creator_created",
+        "custom_characters",
+        ["creator_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_custom_characters_creator_created", table_name="custom_characters")
+    op.drop_index("ix_custom_characters_created", table_name="custom_characters")
+    op.drop_index("ix_practice_records_character_user", table_name="practice_records")
+    op.drop_index("ix_practice_records_user_character", table_name="practice_records")
+    op.drop_index("ix_practice_records_user_created", table_name="practice_records")
@@ -0,0 +1,62 @@
+"""范字标签倒排表 custom_character_tags，并从 custom_characters.tags 回填
+
+Revision ID: 0003_custom_character_tags
+Revises: 0002_progress_composite_indexes
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_custom_character_tags"
+down_revision: Union[str, None] = "0002_progress_composite_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+# 与 app.models.custom_character.TAG_MAX_LENGTH 一致（tag 列长度）
+TAG_MAX_LENGTH = 100
+
+
+def upgrade() -> None:
+    tag_table = op.create_table(
+        "custom_character_tags",
+        sa.Column("tag", sa.String(length=TAG_MAX_LENGTH), nullable=False),
+        sa.Column("character_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["character_id"], ["custom_characters.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tag", "character_id"),
+    )
+    op.create_index(
+        "ix_custom_character_tags_character_id", "custom_character_tags", ["character_id"]
+    )
+
+    # 回填：与 CustomCharacterDB 写入倒排表的规则一致（去空白、去空、去重，
+    # 跳过超过 TAG_MAX_LENGTH 的旧标签，否则 PostgreSQL 写入 VARCHAR 失败导致升级中止）
+    characters = sa.table(
+        "custom_characters",
+        sa.column("id", sa.Integer()),
+        sa.column("tags", sa.JSON()),
+    )
+    bind = op.get_bind()
+    rows = []
+    for character_id, tags in bind.execute(sa.select(characters.c.id, characters.c.tags)):
+        seen = set()
+        for tag in tags or []:
+            tag = tag.strip() if isinstance(tag, str) else ""
+            if tag and len(tag) <= TAG_MAX_LENGTH and tag not in seen:
+                seen.add(tag)
+                rows.append({"tag": tag, "character_id": character_id})
+        if len(rows) >= BATCH_SIZE:
+            op.bulk_insert(tag_table, rows)
+            rows = []
+    if rows:
+        op.bulk_insert(tag_table, rows)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_custom_character_tags_character_id", table_name="custom_character_tags")
+    op.drop_table("custom_character_tags")
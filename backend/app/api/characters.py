@@ -10,6 +10,7 @@ from typing import Optional, Dict, List
 import logging
 
 from app.parsers.hanzi_writer import HanziWriterLoader
+from app.parsers.character_cache import get_character_cache
 from app.models.character import CharacterData, CoordinateSystem
 
 logger = logging.getLogger(__name__)
@@ -17,7 +18,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Create shared loader instance
-_loader = HanziWriterLoader()
+_loader = HanziWriterLoader(cache=get_character_cache())
 
 
 class CharacterResponse(BaseModel):
@@ -1,9 +1,9 @@
-"""自定义范字 API 端点"""
+"""自定义范字 API 端点（异步数据库会话）"""
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.custom_character import (
     CustomCharacterCreate,
     CustomCharacterUpdate,
@@ -12,17 +12,17 @@ from ..models.custom_character import (
     CharacterImageUpload,
     CharacterStyle,
 )
-from ..models.custom_character_db import CustomCharacterDB, CustomCharacterCRUD
-from ..services.inksight import InkSightModel
+from ..models.custom_character_db import AsyncCustomCharacterCRUD
+from ..models.inksight import InkSightModel
 from ..preprocessing.image import preprocess_image
 
 router = APIRouter(prefix="/api/custom-characters", tags=["自定义范字"])
 
 
 @router.post("/", response_model=CustomCharacterResponse, status_code=201)
-def create_custom_character(
+async def create_custom_character(
     obj_in: CustomCharacterCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     创建自定义范字
@@ -30,7 +30,7 @@ def create_custom_character(
     教师可以上传手写笔画数据创建个性化范字
     """
     try:
-        db_obj = CustomCharacterCRUD.create(db, obj_in)
+        db_obj = await AsyncCustomCharacterCRUD.create(db, obj_in)
         return CustomCharacterResponse.model_validate(db_obj)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"创建失败: {str(e)}")
@@ -45,7 +45,7 @@ async def create_custom_character_from_image(
     tags: str = Form("", description="标签（逗号分隔）"),
     is_public: bool = Form(False, description="是否公开"),
     image: UploadFile = File(..., description="字符图像"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     从图像创建自定义范字
@@ -80,7 +80,7 @@ async def create_custom_character_from_image(
             is_public=is_public,
         )
 
-        db_obj = CustomCharacterCRUD.create(db, obj_in)
+        db_obj = await AsyncCustomCharacterCRUD.create(db, obj_in)
         return CustomCharacterResponse.model_validate(db_obj)
 
     except Exception as e:
@@ -88,105 +88,113 @@ async def create_custom_character_from_image(
 
 
 @router.get("/", response_model=CustomCharacterList)
-def list_custom_characters(
+async def list_custom_characters(
     creator_id: Optional[str] = Query(None, description="筛选创建者"),
     char: Optional[str] = Query(None, description="筛选字符"),
     is_public: Optional[bool] = Query(None, description="仅公开范字"),
     tags: Optional[str] = Query(None, description="筛选标签（逗号分隔）"),
-    page: int = Query(1, ge=1, description="页码"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）"),
+    page: int = Query(1, ge=1, description="页码（未提供游标时使用）"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
-    db: Session = Depends(get_db),
+    include_total: bool = Query(False, description="是否返回总数（额外执行 count）"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """获取范字列表"""
+    """获取范字列表（推荐使用 next_cursor 翻页，深翻页代价恒定）"""
     tag_list = [t.strip() for t in tags.split(",")] if tags else None
 
     skip = (page - 1) * page_size
-    items, total = CustomCharacterCRUD.get_multi(
-        db,
-        creator_id=creator_id,
-        char=char,
-        is_public=is_public,
-        tags=tag_list,
-        skip=skip,
-        limit=page_size,
-    )
+    try:
+        items, total, next_cursor = await AsyncCustomCharacterCRUD.get_multi(
+            db,
+            creator_id=creator_id,
+            char=char,
+            is_public=is_public,
+            tags=tag_list,
+            cursor=cursor,
+            limit=page_size,
+            skip=skip,
+            include_total=include_total,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
 
     return CustomCharacterList(
         total=total,
         items=[CustomCharacterResponse.model_validate(item) for item in items],
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/popular", response_model=List[CustomCharacterResponse])
-def get_popular_characters(
+async def get_popular_characters(
     limit: int = Query(10, ge=1, le=50, description="返回数量"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取热门范字（按使用次数）"""
-    items = CustomCharacterCRUD.get_popular(db, limit=limit)
+    items = await AsyncCustomCharacterCRUD.get_popular(db, limit=limit)
     return [CustomCharacterResponse.model_validate(item) for item in items]
 
 
 @router.get("/search/by-tags", response_model=List[CustomCharacterResponse])
-def search_characters_by_tags(
+async def search_characters_by_tags(
     tags: str = Query(..., description="标签（逗号分隔）"),
     limit: int = Query(20, ge=1, le=100, description="返回数量"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """按标签搜索范字"""
     tag_list = [t.strip() for t in tags.split(",") if t.strip()]
-    items = CustomCharacterCRUD.search_by_tags(db, tags=tag_list, limit=limit)
+    items = await AsyncCustomCharacterCRUD.search_by_tags(db, tags=tag_list, limit=limit)
     return [CustomCharacterResponse.model_validate(item) for item in items]
 
 
 @router.get("/{character_id}", response_model=CustomCharacterResponse)
-def get_custom_character(
+async def get_custom_character(
     character_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取单个范字详情"""
-    db_obj = CustomCharacterCRUD.get(db, character_id)
+    db_obj = await AsyncCustomCharacterCRUD.get(db, character_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="范字不存在")
 
     # 增加使用计数
-    CustomCharacterCRUD.increment_usage(db, character_id)
+    await AsyncCustomCharacterCRUD.increment_usage(db, character_id)
 
     return CustomCharacterResponse.model_validate(db_obj)
 
 
 @router.put("/{character_id}", response_model=CustomCharacterResponse)
-def update_custom_character(
+async def update_custom_character(
     character_id: int,
     obj_in: CustomCharacterUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """更新范字"""
-    db_obj = CustomCharacterCRUD.get(db, character_id)
+    db_obj = await AsyncCustomCharacterCRUD.get(db, character_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="范字不存在")
 
-    updated_obj = CustomCharacterCRUD.update(db, db_obj, obj_in)
+    updated_obj = await AsyncCustomCharacterCRUD.update(db, db_obj, obj_in)
     return CustomCharacterResponse.model_validate(updated_obj)
 
 
 @router.delete("/{character_id}", status_code=204)
-def delete_custom_character(
+async def delete_custom_character(
     character_id: int,
     creator_id: str = Query(..., description="创建者 ID（验证权限）"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """删除范字（仅创建者可删除）"""
-    db_obj = CustomCharacterCRUD.get(db, character_id)
+    db_obj = await AsyncCustomCharacterCRUD.get(db, character_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="范字不存在")
 
     if db_obj.creator_id != creator_id:
         raise HTTPException(status_code=403, detail="无权删除此范字")
 
-    CustomCharacterCRUD.delete(db, character_id)
+    await AsyncCustomCharacterCRUD.delete(db, character_id)
 
 
 def _convert_trajectory_to_strokes(trajectory: List) -> List:
@@ -7,9 +7,10 @@ Combines DTW handwriting scoring with posture quality evaluation.
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from typing import List, Optional
+import asyncio
 import logging
+import os
 import json
-import io
 
 import numpy as np
 
@@ -18,27 +19,34 @@ from app.models.posture import (
     ComprehensiveScoreResult,
     PostureData,
     PostureAnalysis,
-    StrokeAnalysis
+    StrokeAnalysis,
+    WorksheetCellResult,
+    WorksheetScoreResult,
 )
 from app.models.character import CharacterData
 from app.parsers.hanzi_writer import HanziWriterLoader
+from app.parsers.character_cache import get_character_cache
 from app.algorithms.dtw import calculate_dtw_distance
 from app.scoring.posture_scorer import score_posture
 from app.scoring.normalizer import normalize_score
 from app.scoring.stroke_order import validate_stroke_order
-from app.models.inksight import InkSightModel, InksightResult
+from app.models.model_runtime import ModelBusyError
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # Shared instances
-_loader = HanziWriterLoader()
+_loader = HanziWriterLoader(cache=get_character_cache())
 
 # Scoring weights
 HANDWRITING_WEIGHT = 0.7  # 70% weight for handwriting quality
 POSTURE_WEIGHT = 0.3      # 30% weight for posture quality
 
+# Worksheet size limits (every cell is cropped, extracted and scored)
+WORKSHEET_MAX_SIDE = 30    # rows / cols per sheet
+WORKSHEET_MAX_CELLS = 200  # rows * cols, given or detected
+
 
 def _get_grade(score: float) -> str:
     """Convert score to grade string"""
@@ -119,127 +127,479 @@ async def comprehensive_score(request: ComprehensiveScoreRequest):
         logger.info(f"Loading reference character: {request.character}")
         reference_data = await _loader.load_character(request.character)
 
-        # Step 2: Validate stroke order/count before DTW
-        template_strokes = [
-            [(p.x, p.y) for p in median.points]
-            for median in reference_data.medians
-        ]
-        order_result = validate_stroke_order(template_strokes, request.user_strokes)
-        if not order_result.is_valid or not order_result.stroke_count_match:
-            return ComprehensiveScoreResult(
-                total_score=0.0,
-                handwriting_score=0.0,
-                posture_score=0.0,
-                grade="需练习",
-                stroke_analysis=[],
-                posture_analysis=None,
-                feedback="笔顺错误",
-                error_type=order_result.error_type or "stroke_order_error",
-                message="笔顺错误"
-            )
+        # Steps 2-7 are CPU-bound (DTW): keep them off the event loop
+        return await asyncio.to_thread(_score_comprehensive, request, reference_data)
 
-        # Step 3: Score handwriting using DTW
-        logger.info(f"Scoring {len(request.user_strokes)} user strokes")
-        handwriting_score, stroke_analyses = _score_handwriting(
-            request.user_strokes,
-            reference_data
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in comprehensive scoring: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"评分失败: {str(e)}"
         )
 
-        # Step 4: Score posture (if provided)
-        posture_score = 100.0
-        posture_analysis = None
 
-        if request.posture_data:
-            logger.info("Scoring posture data")
-            posture_analysis = score_posture(request.posture_data)
-            posture_score = posture_analysis.score
-        else:
-            logger.info("No posture data provided, using default score")
-            posture_score = 100.0  # No penalty if no posture data
+def _score_comprehensive(
+    request: ComprehensiveScoreRequest,
+    reference_data: CharacterData,
+) -> ComprehensiveScoreResult:
+    """
+    Score a validated request against its loaded reference character.
 
-        # Step 5: Calculate comprehensive score
-        total_score = (
-            handwriting_score * HANDWRITING_WEIGHT +
-            posture_score * POSTURE_WEIGHT
-        )
+    Synchronous and CPU-bound (stroke order check + DTW); async callers run
+    it with asyncio.to_thread.
 
-        # Step 6: Generate feedback
-        grade = _get_grade(total_score)
-        feedback = _generate_comprehensive_feedback(
-            handwriting_score,
-            posture_score,
-            posture_analysis
-        )
+    Args:
+        request: Request with the user strokes and optional posture data
+        reference_data: Reference character data from Hanzi Writer
 
-        # Step 7: Build response
+    Returns:
+        ComprehensiveScoreResult with detailed scoring breakdown
+    """
+    # Step 2: Validate stroke order/count before DTW
+    template_strokes = [
+        [(p.x, p.y) for p in median.points]
+        for median in reference_data.medians
+    ]
+    order_result = validate_stroke_order(template_strokes, request.user_strokes)
+    if not order_result.is_valid or not order_result.stroke_count_match:
         return ComprehensiveScoreResult(
-            total_score=round(total_score, 1),
-            handwriting_score=round(handwriting_score, 1),
-            posture_score=round(posture_score, 1),
-            grade=grade,
-            stroke_analysis=stroke_analyses,
-            posture_analysis=posture_analysis,
-            feedback=feedback
+            total_score=0.0,
+            handwriting_score=0.0,
+            posture_score=0.0,
+            grade="需练习",
+            stroke_analysis=[],
+            posture_analysis=None,
+            feedback="笔顺错误",
+            error_type=order_result.error_type or "stroke_order_error",
+            message="笔顺错误"
         )
 
-    except HTTPException:
+    # Step 3: Score handwriting using DTW
+    logger.info(f"Scoring {len(request.user_strokes)} user strokes")
+    handwriting_score, stroke_analyses = _score_handwriting(
+        request.user_strokes,
+        reference_data
+    )
+
+    # Step 4: Score posture (if provided)
+    posture_score = 100.0
+    posture_analysis = None
+
+    if request.posture_data:
+        logger.info("Scoring posture data")
+        posture_analysis = score_posture(request.posture_data)
+        posture_score = posture_analysis.score
+    else:
+        logger.info("No posture data provided, using default score")
+        posture_score = 100.0  # No penalty if no posture data
+
+    # Step 5: Calculate comprehensive score
+    total_score = (
+        handwriting_score * HANDWRITING_WEIGHT +
+        posture_score * POSTURE_WEIGHT
+    )
+
+    # Step 6: Generate feedback
+    grade = _get_grade(total_score)
+    feedback = _generate_comprehensive_feedback(
+        handwriting_score,
+        posture_score,
+        posture_analysis
+    )
+
+    # Step 7: Build response
+    return ComprehensiveScoreResult(
+        total_score=round(total_score, 1),
+        handwriting_score=round(handwriting_score, 1),
+        posture_score=round(posture_score, 1),
+        grade=grade,
+        stroke_analysis=stroke_analyses,
+        posture_analysis=posture_analysis,
+        feedback=feedback
+    )
+
+
+def _is_skeleton_fallback_enabled() -> bool:
+    """Whether photo scoring may fall back to skeleton strokes (SKELETON_FALLBACK_ENABLED, default true)"""
+    return os.getenv("SKELETON_FALLBACK_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_photo_decode_max_size() -> int:
+    """Longest side uploaded photos are decoded to (PHOTO_DECODE_MAX_SIZE, default 512)"""
+    return int(os.getenv("PHOTO_DECODE_MAX_SIZE", "512"))
+
+
+def _extract_skeleton_strokes(image_np: np.ndarray) -> Optional[List[List[tuple[float, float]]]]:
+    """
+    CPU-only stroke extraction (skeleton graph), used when InkSight is
+    unavailable, mocked, busy or yields nothing.
+    """
+    if not _is_skeleton_fallback_enabled():
+        return None
+
+    from app.preprocessing.stroke_graph import extract_strokes_from_image
+
+    try:
+        strokes = extract_strokes_from_image(image_np)
+    except Exception as e:
+        logger.warning(f"Skeleton stroke extraction failed: {e}")
+        return None
+
+    if strokes:
+        logger.info(f"Using skeleton fallback strokes ({len(strokes)} strokes)")
+    return strokes or None
+
+
+def _strokes_from_result(result) -> Optional[List[List[tuple[float, float]]]]:
+    """Normalize an InkSight result to a list of (x, y) float strokes (None if empty)"""
+    strokes = getattr(result, "strokes", None)
+    if not strokes:
+        return None
+
+    # Ensure list of list of (x, y) floats
+    normalized_strokes: List[List[tuple[float, float]]] = []
+    for stroke in strokes:
+        if not stroke:
+            continue
+        points = [(float(x), float(y)) for x, y in stroke]
+        normalized_strokes.append(points)
+
+    return normalized_strokes or None
+
+
+def _infer_user_strokes(
+    image_np: np.ndarray,
+) -> tuple[Optional[List[List[tuple[float, float]]]], bool]:
+    """
+    Extract strokes from a decoded photo using InkSight, falling back to the
+    skeleton stroke graph when the model is unavailable, mocked, fails or yields nothing.
+
+    Returns:
+        Tuple of (strokes or None, whether the strokes came from InkSight).
+        Fallback strokes must not be cached: a retry after the model
+        recovers should get the model's strokes.
+
+    Raises:
+        ModelBusyError: If InkSight is busy (the caller decides on fallback)
+    """
+    # Deferred: only the photo path needs the InkSight/TensorFlow stack
+    from app.models.inksight import InkSightModel
+    from app.models.inference_worker import (
+        is_inference_worker_enabled,
+        get_inference_worker,
+        get_worker_timeout,
+    )
+
+    try:
+        if is_inference_worker_enabled():
+            # Batched inference in the dedicated worker process
+            worker = get_inference_worker()
+            if worker.is_mock:
+                logger.warning("InkSight mock model detected; using skeleton fallback")
+                return _extract_skeleton_strokes(image_np), False
+            result = worker.submit(image_np).result(timeout=get_worker_timeout())
+        else:
+            inksight = InkSightModel.get_instance()
+            inksight.load()
+            if inksight.model is not None and inksight.model.__class__.__name__ == "MockModel":
+                logger.warning("InkSight mock model detected; using skeleton fallback")
+                return _extract_skeleton_strokes(image_np), False
+            result = inksight.predict(image_np)
+    except ModelBusyError:
         raise
     except Exception as e:
-        logger.error(f"Error in comprehensive scoring: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"评分失败: {str(e)}"
-        )
+        logger.warning(f"InkSight extraction failed: {e}")
+        return _extract_skeleton_strokes(image_np), False
+
+    strokes = _strokes_from_result(result)
+    if strokes:
+        return strokes, True
+    return _extract_skeleton_strokes(image_np), False
 
 
 def _extract_user_strokes_from_photo(
     image_bytes: bytes,
-    character: str
+    character: str,
+    user_id: Optional[str] = None,
 ) -> Optional[List[List[tuple[float, float]]]]:
     """
-    Extract user strokes from photo using InkSight (placeholder if unavailable).
+    Extract user strokes from photo using InkSight, falling back to the
+    skeleton stroke graph when the model is unavailable, mocked or busy.
+    Repeated uploads of the same photo by the same user for the same
+    character are served from the perceptual-hash stroke cache.
     Returns list of strokes in 0-1 normalized coordinates, or None on failure.
     """
+    from app.preprocessing.image import decode_image
+    from app.preprocessing.fingerprint import get_photo_stroke_cache, perceptual_hash
+
     try:
-        from PIL import Image
+        # Downscale while decoding: the model input is 256x256
+        image_np = decode_image(image_bytes, max_size=_get_photo_decode_max_size())
     except Exception as e:
-        logger.warning(f"PIL not available for image decode: {e}")
+        logger.warning(f"Failed to decode image: {e}")
         return None
 
+    cache = get_photo_stroke_cache()
+    phash = None
+    if cache is not None:
+        phash = perceptual_hash(image_np)
+        cached = cache.get(character, phash, user_id=user_id)
+        if cached is not None:
+            logger.debug(f"Photo stroke cache hit for '{character}' ({phash:016x})")
+            return cached
+
     try:
-        img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-        image_np = np.array(img)
+        strokes, from_model = _infer_user_strokes(image_np)
+    except ModelBusyError:
+        # Not cached: a retry should get the model's strokes
+        fallback = _extract_skeleton_strokes(image_np)
+        if fallback is None:
+            raise
+        return fallback
+
+    # Only model output is cached; fallback strokes would outlive a model recovery
+    if from_model and cache is not None:
+        cache.set(character, phash, strokes, user_id=user_id)
+    return strokes
+
+
+def _extract_user_strokes_batch(
+    images: List[np.ndarray]
+) -> List[Optional[List[List[tuple[float, float]]]]]:
+    """
+    Extract strokes for many images with one batched InkSight call
+    (or one worker submission per image, batched by the worker).
+    Images InkSight cannot handle fall back to skeleton strokes.
+    """
+    if not images:
+        return []
+
+    from app.models.inksight import InkSightModel
+    from app.models.inference_worker import (
+        is_inference_worker_enabled,
+        get_inference_worker,
+        get_worker_timeout,
+    )
+
+    results: List[Optional[object]] = [None] * len(images)
+    try:
+        if is_inference_worker_enabled():
+            worker = get_inference_worker()
+            if not worker.is_mock:
+                futures = [worker.submit(image) for image in images]
+                for i, future in enumerate(futures):
+                    try:
+                        results[i] = future.result(timeout=get_worker_timeout())
+                    except Exception as e:
+                        logger.warning(f"InkSight worker failed for cell {i}: {e}")
+        else:
+            inksight = InkSightModel.get_instance()
+            inksight.load()
+            if inksight.model is None or inksight.model.__class__.__name__ != "MockModel":
+                results = list(inksight.predict_batch(images))
+    except ModelBusyError:
+        if not _is_skeleton_fallback_enabled():
+            raise
+        logger.warning("InkSight busy; using skeleton fallback for worksheet")
     except Exception as e:
-        logger.warning(f"Failed to decode image: {e}")
-        return None
+        logger.warning(f"InkSight batch extraction failed: {e}")
+
+    return [
+        _strokes_from_result(result) or _extract_skeleton_strokes(image)
+        for result, image in zip(results, images)
+    ]
+
+
+def _verify_cells(images: List[np.ndarray], characters: List[str]):
+    """Verify worksheet cells with one batched PaddleOCR recognition call"""
+    from app.models.paddle_ocr import PaddleOCRModel
+
+    return PaddleOCRModel.get_instance().verify_characters_batch(images, characters)
+
+
+def _get_worksheet_decode_max_size() -> int:
+    """Longest side worksheet photos are decoded to (WORKSHEET_DECODE_MAX_SIZE, default 2048)"""
+    return int(os.getenv("WORKSHEET_DECODE_MAX_SIZE", "2048"))
+
+
+def _decode_worksheet_photo(image_bytes: bytes) -> np.ndarray:
+    """Decode a worksheet photo (runs off the event loop)"""
+    from app.preprocessing.image import decode_image
+
+    return decode_image(image_bytes, max_size=_get_worksheet_decode_max_size())
+
+
+def _segment_worksheet_photo(image_np: np.ndarray, rows: Optional[int], cols: Optional[int]):
+    """Segment a decoded worksheet photo into cells (runs off the event loop)"""
+    from app.preprocessing.worksheet import segment_worksheet
+
+    return segment_worksheet(image_np, rows=rows, cols=cols)
+
+
+@router.post("/score/worksheet", response_model=WorksheetScoreResult)
+async def score_worksheet(
+    characters: str = Form(...),
+    image: UploadFile = File(...),
+    rows: Optional[int] = Form(None, ge=1, le=WORKSHEET_MAX_SIDE),
+    cols: Optional[int] = Form(None, ge=1, le=WORKSHEET_MAX_SIDE),
+    verify: bool = Form(False),
+):
+    """
+    Score a whole 田字格 practice sheet from one photo.
+
+    characters: one character for every cell, or the cell characters in
+    row-major order (whitespace ignored; cells beyond the list are skipped).
+    verify: check every written cell with one batched PaddleOCR call first;
+    cells recognized as another character are reported as "mismatch".
+    rows * cols (given or detected) is capped at WORKSHEET_MAX_CELLS.
+    """
+    chars = [c for c in characters if not c.isspace()]
+    if not chars:
+        raise HTTPException(status_code=400, detail="请提供要评分的汉字")
+    if rows and cols and rows * cols > WORKSHEET_MAX_CELLS:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error_type": "worksheet_too_large",
+                "message": f"练习纸格子数不能超过 {WORKSHEET_MAX_CELLS}",
+            },
+        )
+
+    image_bytes = await image.read()
+    try:
+        image_np = await asyncio.to_thread(_decode_worksheet_photo, image_bytes)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error_type": "invalid_image",
+                "message": f"无法解析图片: {e}",
+            },
+        )
 
     try:
-        inksight = InkSightModel.get_instance()
-        inksight.load()
-        if inksight.model is not None and inksight.model.__class__.__name__ == "MockModel":
-            logger.warning("InkSight mock model detected; returning no_strokes")
-            return None
-        result = inksight.predict(image_np)
-        if isinstance(result, InksightResult):
-            strokes = result.strokes
+        cells = await asyncio.to_thread(_segment_worksheet_photo, image_np, rows, cols)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error_type": "grid_not_detected",
+                "message": f"未检测到田字格: {e}",
+            },
+        )
+    if len(cells) > WORKSHEET_MAX_CELLS:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error_type": "worksheet_too_large",
+                "message": f"练习纸格子数不能超过 {WORKSHEET_MAX_CELLS}",
+            },
+        )
+
+    def cell_character(index: int) -> Optional[str]:
+        if len(chars) == 1:
+            return chars[0]
+        return chars[index] if index < len(chars) else None
+
+    cell_results = [
+        WorksheetCellResult(
+            row=cell.row,
+            col=cell.col,
+            character=cell_character(i),
+            box=list(cell.box),
+            status="pending",
+        )
+        for i, cell in enumerate(cells)
+    ]
+
+    pending = []
+    for cell, cell_result in zip(cells, cell_results):
+        if cell_result.character is None:
+            cell_result.status = "skipped"
+        elif not cell.has_ink:
+            cell_result.status = "empty"
         else:
-            strokes = getattr(result, "strokes", None)
+            pending.append((cell, cell_result))
 
-        if not strokes:
-            return None
+    try:
+        if verify and pending:
+            verifications = await asyncio.to_thread(
+                _verify_cells,
+                [cell.image for cell, _ in pending],
+                [cell_result.character for _, cell_result in pending],
+            )
+            verified = []
+            for (cell, cell_result), verification in zip(pending, verifications):
+                cell_result.recognized = verification.text
+                cell_result.ocr_confidence = verification.confidence
+                if verification.verified:
+                    verified.append((cell, cell_result))
+                else:
+                    cell_result.status = "mismatch"
+                    cell_result.message = f"识别为 '{verification.text}'，与 '{cell_result.character}' 不符"
+            pending = verified
+
+        # One batched extraction for every written cell
+        strokes_per_cell = await asyncio.to_thread(
+            _extract_user_strokes_batch, [cell.image for cell, _ in pending]
+        )
+    except ModelBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error_type": "model_busy",
+                "message": "识别服务繁忙，请稍后重试",
+            },
+        )
 
-        # Ensure list of list of (x, y) floats
-        normalized_strokes: List[List[tuple[float, float]]] = []
-        for stroke in strokes:
-            if not stroke:
-                continue
-            points = [(float(x), float(y)) for x, y in stroke]
-            normalized_strokes.append(points)
+    # Load each distinct reference character once, not once per cell
+    distinct_chars = list(dict.fromkeys(
+        cell_result.character
+        for (_, cell_result), strokes in zip(pending, strokes_per_cell)
+        if strokes
+    ))
+    loaded = await asyncio.gather(
+        *(_loader.load_character(char) for char in distinct_chars),
+        return_exceptions=True,
+    )
+    references = dict(zip(distinct_chars, loaded))
 
-        return normalized_strokes if normalized_strokes else None
-    except Exception as e:
-        logger.warning(f"InkSight extraction failed: {e}")
-        return None
+    async def score_cell(cell_result: WorksheetCellResult, strokes) -> None:
+        if not strokes:
+            cell_result.status = "no_strokes"
+            cell_result.message = "未检测到可评分的书写轨迹"
+            return
+        try:
+            reference_data = references[cell_result.character]
+            if isinstance(reference_data, Exception):
+                raise reference_data
+            # DTW per cell is CPU-bound: score in worker threads, not on the event loop
+            cell_result.result = await asyncio.to_thread(
+                _score_comprehensive,
+                ComprehensiveScoreRequest(character=cell_result.character, user_strokes=strokes),
+                reference_data,
+            )
+            cell_result.status = "scored"
+        except Exception as e:
+            logger.warning(f"Scoring worksheet cell ({cell_result.row}, {cell_result.col}) failed: {e}")
+            cell_result.status = "error"
+            cell_result.message = f"评分失败: {e}"
+
+    await asyncio.gather(*(
+        score_cell(cell_result, strokes)
+        for (_, cell_result), strokes in zip(pending, strokes_per_cell)
+    ))
+
+    scores = [c.result.total_score for c in cell_results if c.status == "scored"]
+    return WorksheetScoreResult(
+        rows=max((c.row for c in cell_results), default=-1) + 1,
+        cols=max((c.col for c in cell_results), default=-1) + 1,
+        cells=cell_results,
+        scored_count=len(scores),
+        average_score=round(sum(scores) / len(scores), 1) if scores else None,
+    )
 
 
 @router.post("/score/from_photo", response_model=ComprehensiveScoreResult)
@@ -247,15 +607,31 @@ async def score_from_photo(
     character: str = Form(...),
     image: UploadFile = File(...),
     posture_data: Optional[str] = Form(None),
+    user_id: Optional[str] = Form(None),
 ):
     """
     Score handwriting from a photo.
+
+    user_id scopes the duplicate-photo stroke cache; anonymous uploads only
+    reuse strokes for an identical photo hash.
     """
     if not character or len(character) != 1:
         raise HTTPException(status_code=400, detail="请提供单个汉字")
 
     image_bytes = await image.read()
-    user_strokes = _extract_user_strokes_from_photo(image_bytes, character)
+    # Off the event loop: concurrent uploads can then be micro-batched by the worker
+    try:
+        user_strokes = await asyncio.to_thread(
+            _extract_user_strokes_from_photo, image_bytes, character, user_id
+        )
+    except ModelBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error_type": "model_busy",
+                "message": "识别服务繁忙，请稍后重试",
+            },
+        )
     if not user_strokes:
         raise HTTPException(
             status_code=422,
@@ -360,5 +736,15 @@ def _score_handwriting(
 
 @router.get("/score/health")
 async def health_check():
-    """Health check endpoint for scoring service"""
-    return {"status": "healthy", "service": "scoring"}
+    """Health check endpoint for scoring service (with model queueing metrics)"""
+    from app.models.inksight import InkSightModel
+    from app.models.paddle_ocr import PaddleOCRModel
+
+    return {
+        "status": "healthy",
+        "service": "scoring",
+        "models": {
+            "inksight": InkSightModel.get_instance().runtime.metrics(),
+            "paddleocr": PaddleOCRModel.get_instance().runtime.metrics(),
+        },
+    }
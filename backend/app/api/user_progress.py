@@ -1,217 +1,154 @@
-"""用户进度追踪 API 端点"""
+"""用户进度追踪 API 端点（异步数据库会话）"""
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.user_progress import (
     PracticeRecordCreate,
     PracticeRecordResponse,
+    PracticeRecordBulkSync,
+    PracticeRecordBulkSyncResult,
     UserProgressSummary,
     UserStreak,
     PracticeGoal,
     PracticeGoalCreate,
 )
-from ..models.user_progress_db import (
-    PracticeRecordDB,
-    PracticeGoalDB,
-    UserProgressCRUD,
-)
+from ..models.user_progress_db import AsyncUserProgressCRUD
+from ..models.leaderboard import get_leaderboard as get_shared_leaderboard
 
 router = APIRouter(prefix="/api/user-progress", tags=["用户进度"])
 
 
 @router.post("/practice", response_model=PracticeRecordResponse, status_code=201)
-def create_practice_record(
+async def create_practice_record(
     obj_in: PracticeRecordCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """记录练习结果"""
+    """记录练习结果（记录、汇总与目标进度一次提交）"""
     try:
-        db_obj = UserProgressCRUD.create_practice_record(db, obj_in)
-
-        # 更新目标进度
-        if obj_in.mode.value == "basic":
-            UserProgressCRUD.update_goal_progress(
-                db, obj_in.user_id, "daily_score", obj_in.total_score
-            )
-            UserProgressCRUD.update_goal_progress(
-                db, obj_in.user_id, "character_count", 1
-            )
-            UserProgressCRUD.update_goal_progress(
-                db, obj_in.user_id, "time_spent", obj_in.time_spent / 60  # 分钟
-            )
-
+        db_obj = await AsyncUserProgressCRUD.create_practice_record(db, obj_in)
         return PracticeRecordResponse.model_validate(db_obj)
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"记录失败: {str(e)}")
 
 
+@router.post("/practice/sync", response_model=PracticeRecordBulkSyncResult)
+async def sync_practice_records(
+    obj_in: PracticeRecordBulkSync,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """批量同步离线练习记录（按 client_record_id 幂等，可安全重试）"""
+    try:
+        results = await AsyncUserProgressCRUD.sync_practice_records(db, obj_in.records)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"同步失败: {str(e)}")
+
+    created = sum(1 for r in results if not r.duplicate)
+    return PracticeRecordBulkSyncResult(
+        created=created,
+        duplicates=len(results) - created,
+        records=results,
+    )
+
+
 @router.get("/practice", response_model=List[PracticeRecordResponse])
-def get_practice_records(
+async def get_practice_records(
+    response: Response,
     user_id: str = Query(..., description="用户 ID"),
     character: Optional[str] = Query(None, description="筛选字符"),
     mode: Optional[str] = Query(None, description="筛选模式"),
     days: Optional[int] = Query(None, description="最近 N 天"),
-    skip: int = Query(0, ge=0, description="跳过数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor）"),
+    skip: int = Query(0, ge=0, description="跳过数量（未提供游标时使用）"),
     limit: int = Query(20, ge=1, le=100, description="返回数量"),
-    db: Session = Depends(get_db),
+    include_total: bool = Query(False, description="是否在 X-Total-Count 返回总数"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """获取练习记录列表"""
-    items, total = UserProgressCRUD.get_user_records(
-        db,
-        user_id=user_id,
-        character=character,
-        mode=mode,
-        days=days,
-        skip=skip,
-        limit=limit,
-    )
+    """获取练习记录列表（下一页游标在 X-Next-Cursor 响应头中）"""
+    try:
+        items, total, next_cursor = await AsyncUserProgressCRUD.get_user_records(
+            db,
+            user_id=user_id,
+            character=character,
+            mode=mode,
+            days=days,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            include_total=include_total,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
     return [PracticeRecordResponse.model_validate(item) for item in items]
 
 
 @router.get("/summary", response_model=UserProgressSummary)
-def get_progress_summary(
+async def get_progress_summary(
     user_id: str = Query(..., description="用户 ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取用户进度汇总"""
-    summary = UserProgressCRUD.get_progress_summary(db, user_id)
+    summary = await AsyncUserProgressCRUD.get_progress_summary(db, user_id)
     return UserProgressSummary(**summary)
 
 
 @router.get("/streak", response_model=UserStreak)
-def get_user_streak(
+async def get_user_streak(
     user_id: str = Query(..., description="用户 ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取连续练习天数"""
-    streak = UserProgressCRUD.get_streak(db, user_id)
+    streak = await AsyncUserProgressCRUD.get_streak(db, user_id)
     return UserStreak(**streak)
 
 
 @router.post("/goals", response_model=PracticeGoal, status_code=201)
-def create_practice_goal(
+async def create_practice_goal(
     obj_in: PracticeGoalCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """创建练习目标"""
     try:
-        db_obj = UserProgressCRUD.create_goal(db, obj_in)
+        db_obj = await AsyncUserProgressCRUD.create_goal(db, obj_in)
         return PracticeGoal.model_validate(db_obj)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"创建目标失败: {str(e)}")
 
 
 @router.get("/goals", response_model=List[PracticeGoal])
-def get_user_goals(
+async def get_user_goals(
     user_id: str = Query(..., description="用户 ID"),
     achieved_only: bool = Query(False, description="仅显示已达成"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取用户目标列表"""
-    query = db.query(PracticeGoalDB).filter(PracticeGoalDB.user_id == user_id)
-
-    if achieved_only:
-        query = query.filter(PracticeGoalDB.achieved == True)
-
-    items = query.order_by(PracticeGoalDB.created_at.desc()).all()
+    items = await AsyncUserProgressCRUD.get_goals(db, user_id, achieved_only)
     return [PracticeGoal.model_validate(item) for item in items]
 
 
 @router.get("/leaderboard", response_model=List[dict])
-def get_leaderboard(
+async def get_leaderboard(
     character: Optional[str] = Query(None, description="筛选字符"),
     limit: int = Query(10, ge=1, le=50, description="返回数量"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """获取排行榜（按平均分）"""
-    query = db.query(
-        PracticeRecordDB.user_id,
-        func.avg(PracticeRecordDB.total_score).label("avg_score"),
-        func.count(PracticeRecordDB.id).label("practice_count"),
-    )
-
-    if character:
-        query = query.filter(PracticeRecordDB.character == character)
-
-    results = query.group_by(PracticeRecordDB.user_id).order_by(
-        func.avg(PracticeRecordDB.total_score).desc()
-    ).limit(limit).all()
-
-    return [
-        {
-            "user_id": row[0],
-            "average_score": float(row[1]),
-            "practice_count": row[2],
-        }
-        for row in results
-    ]
+    """获取排行榜（按平均分，读取增量维护的汇总表 / Redis 有序集合）"""
+    entries = await get_shared_leaderboard().top_async(db, character=character, limit=limit)
+    return [entry.model_dump() for entry in entries]
 
 
 @router.get("/analytics", response_model=dict)
-def get_user_analytics(
+async def get_user_analytics(
     user_id: str = Query(..., description="用户 ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """获取用户详细分析数据"""
-    # 按模式统计
-    mode_stats = db.query(
-        PracticeRecordDB.mode,
-        func.count(PracticeRecordDB.id).label("count"),
-        func.avg(PracticeRecordDB.total_score).label("avg_score"),
-    ).filter(PracticeRecordDB.user_id == user_id).group_by(
-        PracticeRecordDB.mode
-    ).all()
-
-    # 按评分等级统计
-    level_stats = db.query(
-        PracticeRecordDB.score_level,
-        func.count(PracticeRecordDB.id).label("count"),
-    ).filter(PracticeRecordDB.user_id == user_id).group_by(
-        PracticeRecordDB.score_level
-    ).all()
-
-    # 每日练习趋势（最近 30 天）
-    from datetime import timedelta
-
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    daily_trends = db.query(
-        func.date(PracticeRecordDB.created_at).label("date"),
-        func.count(PracticeRecordDB.id).label("count"),
-        func.avg(PracticeRecordDB.total_score).label("avg_score"),
-    ).filter(
-        PracticeRecordDB.user_id == user_id,
-        PracticeRecordDB.created_at >= thirty_days_ago,
-    ).group_by(
-        func.date(PracticeRecordDB.created_at)
-    ).order_by(
-        func.date(PracticeRecordDB.created_at)
-    ).all()
-
-    return {
-        "mode_statistics": [
-            {
-                "mode": row[0],
-                "count": row[1],
-                "average_score": float(row[2]),
-            }
-            for row in mode_stats
-        ],
-        "level_distribution": [
-            {
-                "level": row[0],
-                "count": row[1],
-            }
-            for row in level_stats
-        ],
-        "daily_trends": [
-            {
-                "date": row[0].isoformat(),
-                "count": row[1],
-                "average_score": float(row[2]),
-            }
-            for row in daily_trends
-        ],
-    }
+    """获取用户详细分析数据（读取每日分桶表，最近 30 天趋势）"""
+    return await AsyncUserProgressCRUD.get_analytics(db, user_id)
@@ -0,0 +1,140 @@
+"""数据库连接与会话管理
+
+配置（环境变量，见 deployment/.env.example）：
+- DATABASE_URL：完整连接串（优先）
+- POSTGRES_USER / POSTGRES_PASSWORD / POSTGRES_HOST / POSTGRES_PORT / POSTGRES_DB
+- DB_POOL_SIZE / DB_MAX_OVERFLOW：连接池大小（SQLite 忽略）
+- DB_POOL_TIMEOUT / DB_POOL_RECYCLE：等待连接超时、连接回收周期（秒）
+
+同步引擎供脚本和迁移使用；API 使用异步引擎（PostgreSQL 走 asyncpg，
+SQLite 走 aiosqlite），请求等待数据库时不占用线程池线程。
+"""
+import os
+from typing import AsyncIterator, Iterator, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from .models.base import Base
+
+
+def get_database_url() -> str:
+    """从环境变量获取数据库 URL（与 alembic/env.py 一致）"""
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        return database_url
+
+    user = os.getenv("POSTGRES_USER", "smartpen")
+    password = os.getenv("POSTGRES_PASSWORD", "smartpen123")
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    db = os.getenv("POSTGRES_DB", "smartpen")
+
+    return f"postgresql://{user}:{password}@{host}:{port}/{db}"
+
+
+# 数据库 -> 异步驱动
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def get_async_database_url(url: Optional[str] = None) -> str:
+    """
+    把同步连接串转换为异步驱动连接串
+
+    Args:
+        url: 同步连接串（默认 get_database_url()），如 postgresql://... 或
+            postgresql+psycopg2://...
+
+    Returns:
+        如 postgresql+asyncpg://... / sqlite+aiosqlite://...
+
+    Raises:
+        ValueError: 数据库没有已知的异步驱动
+    """
+    parsed = make_url(url or get_database_url())
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database: {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def _pool_kwargs() -> dict:
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+
+def _engine_kwargs(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return _pool_kwargs()
+
+
+# 引擎惰性连接：导入本模块不会访问数据库
+DATABASE_URL = get_database_url()
+engine = create_engine(DATABASE_URL, **_engine_kwargs(DATABASE_URL))
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def get_db() -> Iterator[Session]:
+    """FastAPI 依赖：每个请求一个会话，结束时关闭"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# 异步引擎在首次使用时创建：只用同步引擎的脚本不需要安装 asyncpg
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """获取进程共享的异步引擎（连接池配置见模块说明）"""
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_database_url(DATABASE_URL)
+        kwargs = {} if url.startswith("sqlite") else _pool_kwargs()
+        _async_engine = create_async_engine(url, **kwargs)
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """获取异步会话工厂（提交后不过期对象，响应序列化时不会触发隐式 IO）"""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_sessionmaker
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI 依赖：每个请求一个异步会话，结束时关闭"""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+__all__ = [
+    "Base",
+    "engine",
+    "SessionLocal",
+    "get_db",
+    "get_database_url",
+    "get_async_database_url",
+    "get_async_engine",
+    "get_async_sessionmaker",
+    "get_async_db",
+]
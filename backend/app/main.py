@@ -5,12 +5,47 @@ SmartPen Backend - FastAPI Main Entry
 端云协同架构: Python FastAPI + InkSight + PaddleOCR + DTW
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from app.api.characters import router as characters_router
 from app.api.scoring import router as scoring_router
+from app.parsers.character_cache import get_character_cache
+from app.parsers.hanzi_writer import HanziWriterLoader
+from app.warmup import warmup_state, warmup_from_env, is_warmup_enabled
+from app.models.inference_worker import (
+    is_inference_worker_enabled,
+    get_inference_worker,
+    shutdown_inference_worker,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: run warmup in the background so liveness is immediate"""
+    if is_inference_worker_enabled():
+        # Spawn the InkSight worker before serving so its model load is off the request path
+        await asyncio.to_thread(get_inference_worker)
+
+    warmup_task = None
+    if is_warmup_enabled():
+        # Shares the process-wide template cache with the API routers
+        loader = HanziWriterLoader(cache=get_character_cache())
+        warmup_task = asyncio.create_task(warmup_from_env(loader))
+    else:
+        warmup_state.ready = True
+
+    yield
+
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    shutdown_inference_worker()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -19,6 +54,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -47,11 +83,22 @@ async def root():
     }
 
 
-# Health check endpoint
+# Health check endpoint (liveness)
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring"""
-    return {"status": "healthy"}
+    """Health check endpoint for monitoring (liveness: process is up)"""
+    return {"status": "healthy", "ready": warmup_state.ready}
+
+
+# Readiness endpoint
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness check: 503 until startup warmup has finished"""
+    status_code = 200 if warmup_state.ready else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": "ready" if warmup_state.ready else "warming_up", **warmup_state.model_dump()},
+    )
 
 
 if __name__ == "__main__":
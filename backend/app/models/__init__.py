@@ -23,13 +23,24 @@ from app.models.inksight import (
     convert_to_hanzi_writer_format,
 )
 
+from app.models.inference_worker import (
+    InkSightWorker,
+    get_inference_worker,
+)
+
 from app.models.paddle_ocr import (
     PaddleOCRModel,
     OCRResult,
+    CharacterVerification,
     verify_character_match,
     preprocess_ocr_image,
 )
 
+from app.models.model_runtime import (
+    ModelRuntime,
+    ModelBusyError,
+)
+
 from app.models.model_loader import (
     get_model_cache_dir,
     get_inksight_model_path,
@@ -53,11 +64,18 @@ __all__ = [
     "map_inksight_to_hanzi_1024",
     "map_hanzi_1024_to_inksight",
     "convert_to_hanzi_writer_format",
+    # InkSight inference worker
+    "InkSightWorker",
+    "get_inference_worker",
     # PaddleOCR models
     "PaddleOCRModel",
     "OCRResult",
+    "CharacterVerification",
     "verify_character_match",
     "preprocess_ocr_image",
+    # Model runtime
+    "ModelRuntime",
+    "ModelBusyError",
     # Model loader
     "get_model_cache_dir",
     "get_inksight_model_path",
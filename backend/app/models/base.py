@@ -0,0 +1,8 @@
+"""数据库模型共享的 SQLAlchemy 声明基类
+
+所有 *_db.py 模型共用同一个 Base，外键（如 practice_records.custom_character_id）
+与 Alembic 自动生成都基于同一份 metadata。
+"""
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
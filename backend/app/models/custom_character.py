@@ -1,9 +1,14 @@
 """自定义范字数据模型"""
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
 
+# 单个标签的最大长度（与 custom_character_tags.tag 列一致）
+TAG_MAX_LENGTH = 100
+
+Tag = Annotated[str, Field(max_length=TAG_MAX_LENGTH)]
+
 
 class CharacterStyle(str, Enum):
     """字体风格"""
@@ -36,7 +41,7 @@ class CustomCharacterCreate(BaseModel):
     strokes: List[StrokeData] = Field(..., min_length=1, description="笔画列表")
     creator_id: str = Field(..., description="创建者 ID (教师)")
     creator_name: str = Field(..., description="创建者姓名")
-    tags: List[str] = Field(default_factory=list, description="标签（如：一年级、上册等）")
+    tags: List[Tag] = Field(default_factory=list, description="标签（如：一年级、上册等）")
     is_public: bool = Field(default=False, description="是否公开分享")
 
     class Config:
@@ -60,7 +65,7 @@ class CustomCharacterUpdate(BaseModel):
     """更新自定义范字请求"""
     style: Optional[CharacterStyle] = None
     strokes: Optional[List[StrokeData]] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[List[Tag]] = None
     is_public: Optional[bool] = None
 
 
@@ -84,10 +89,11 @@ class CustomCharacterResponse(BaseModel):
 
 class CustomCharacterList(BaseModel):
     """自定义范字列表响应"""
-    total: int
+    total: Optional[int] = Field(None, description="总数（仅 include_total=true 时计算）")
     items: List[CustomCharacterResponse]
     page: int
     page_size: int
+    next_cursor: Optional[str] = Field(None, description="下一页游标（没有更多数据时为空）")
 
 
 class CharacterImageUpload(BaseModel):
@@ -1,14 +1,14 @@
 """自定义范字数据库模型和操作"""
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Index, intersect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, relationship, validates
 from pydantic import BaseModel
 
-from ..models.custom_character import CustomCharacterCreate, CustomCharacterUpdate, StrokeData
-
-Base = declarative_base()
+from ..models.base import Base
+from ..models.pagination import paginate_keyset
+from ..models.custom_character import TAG_MAX_LENGTH, CustomCharacterCreate, CustomCharacterUpdate, StrokeData
 
 
 class CustomCharacterDB(Base):
@@ -27,8 +27,80 @@ class CustomCharacterDB(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # 范字列表游标分页（全部 / 按创建者）
+        Index("ix_custom_characters_created", created_at.desc(), id.desc()),
+        Index("ix_custom_characters_creator_created", creator_id, created_at.desc(), id.desc()),
+    )
+
     # 关系
     # user_practices = relationship("UserPractice", back_populates="custom_character")
+    tag_rows = relationship("CustomCharacterTagDB", cascade="all, delete-orphan")
+
+    @validates("tags")
+    def _sync_tag_rows(self, key, tags):
+        """tags 赋值时同步倒排表（增删差异行，保留未变化的标签行）"""
+        wanted = _index_tags(tags)
+        existing = {row.tag: row for row in self.tag_rows}
+        self.tag_rows = [existing.get(tag) or CustomCharacterTagDB(tag=tag) for tag in wanted]
+        return tags
+
+
+class CustomCharacterTagDB(Base):
+    """
+    范字标签倒排表（tag -> 范字）
+
+    主键 (tag, character_id) 即按标签查找的索引；多标签 AND 查询对每个标签
+    做一次索引范围扫描再取交集，不再逐行解析 custom_characters.tags JSON。
+    custom_characters.tags 仍保留原样用于返回，本表由赋值 tags 时自动维护。
+    """
+    __tablename__ = "custom_character_tags"
+
+    tag = Column(String(TAG_MAX_LENGTH), primary_key=True)
+    character_id = Column(
+        Integer,
+        ForeignKey("custom_characters.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+
+
+def normalize_tags(tags: Optional[List[str]]) -> List[str]:
+    """去除首尾空白、空标签和重复标签（保持原顺序）"""
+    seen = []
+    for tag in tags or []:
+        tag = tag.strip() if isinstance(tag, str) else ""
+        if tag and tag not in seen:
+            seen.append(tag)
+    return seen
+
+
+def _index_tags(tags: Optional[List[str]]) -> List[str]:
+    """
+    写入倒排表的标签：normalize_tags 后跳过超过 TAG_MAX_LENGTH 的标签
+
+    API 已拒绝超长标签；绕过校验写入的旧数据仍保留在 tags JSON 中，
+    只是不进入索引（迁移 0003 的回填使用同一规则）。
+    """
+    return [tag for tag in normalize_tags(tags) if len(tag) <= TAG_MAX_LENGTH]
+
+
+def _filter_by_tags(query, tags: Optional[List[str]]):
+    """
+    多标签 AND 过滤：id IN (tag=a 的 character_id INTERSECT tag=b 的 …)
+
+    每个子查询只走倒排表主键索引。
+    """
+    wanted = normalize_tags(tags)
+    if not wanted:
+        return query
+
+    selects = [
+        select(CustomCharacterTagDB.character_id).where(CustomCharacterTagDB.tag == tag)
+        for tag in wanted
+    ]
+    matches = selects[0] if len(selects) == 1 else intersect(*selects)
+    return query.filter(CustomCharacterDB.id.in_(matches))
 
 
 class CustomCharacterCRUD:
@@ -65,10 +137,25 @@ class CustomCharacterCRUD:
         char: Optional[str] = None,
         is_public: Optional[bool] = None,
         tags: Optional[List[str]] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100,
-    ) -> tuple[List[CustomCharacterDB], int]:
-        """获取范字列表"""
+        skip: int = 0,
+        include_total: bool = False,
+    ) -> tuple[List[CustomCharacterDB], Optional[int], Optional[str]]:
+        """
+        获取范字列表（按 created_at, id 降序，游标分页）
+
+        Args:
+            cursor: 上一页返回的游标（优先于 skip）
+            skip: 旧版 OFFSET 分页，仅在未提供游标时使用
+            include_total: 是否额外执行 count()
+
+        Returns:
+            (范字, 总数或 None, 下一页游标或 None)
+
+        Raises:
+            ValueError: 游标格式无效
+        """
         query = db.query(CustomCharacterDB)
 
         # 过滤条件
@@ -78,15 +165,14 @@ class CustomCharacterCRUD:
             query = query.filter(CustomCharacterDB.char == char)
         if is_public is not None:
             query = query.filter(CustomCharacterDB.is_public == is_public)
-        if tags:
-            # JSON 数组包含查询
-            for tag in tags:
-                query = query.filter(CustomCharacterDB.tags.contains(tag))
+        query = _filter_by_tags(query, tags)
 
-        total = query.count()
-        items = query.order_by(CustomCharacterDB.created_at.desc()).offset(skip).limit(limit).all()
+        total = query.count() if include_total else None
+        items, next_cursor = paginate_keyset(
+            query, CustomCharacterDB.created_at, CustomCharacterDB.id, cursor, limit, offset=skip
+        )
 
-        return items, total
+        return items, total, next_cursor
 
     @staticmethod
     def update(
@@ -140,10 +226,56 @@ class CustomCharacterCRUD:
 
     @staticmethod
     def search_by_tags(db: Session, tags: List[str], limit: int = 100) -> List[CustomCharacterDB]:
-        """按标签搜索范字"""
+        """按标签搜索公开范字（须包含全部标签，按使用次数降序）"""
         query = db.query(CustomCharacterDB).filter(CustomCharacterDB.is_public == True)
-
-        for tag in tags:
-            query = query.filter(CustomCharacterDB.tags.contains(tag))
+        query = _filter_by_tags(query, tags)
 
         return query.order_by(CustomCharacterDB.usage_count.desc()).limit(limit).all()
+
+
+class AsyncCustomCharacterCRUD:
+    """自定义范字异步 CRUD（通过 AsyncSession.run_sync 复用 CustomCharacterCRUD）"""
+
+    @staticmethod
+    async def create(db: AsyncSession, obj_in: CustomCharacterCreate) -> CustomCharacterDB:
+        """创建自定义范字"""
+        return await db.run_sync(CustomCharacterCRUD.create, obj_in)
+
+    @staticmethod
+    async def get(db: AsyncSession, id: int) -> Optional[CustomCharacterDB]:
+        """获取单个范字"""
+        return await db.run_sync(CustomCharacterCRUD.get, id)
+
+    @staticmethod
+    async def get_multi(
+        db: AsyncSession, **kwargs
+    ) -> tuple[List[CustomCharacterDB], Optional[int], Optional[str]]:
+        """获取范字列表（参数同 CustomCharacterCRUD.get_multi）"""
+        return await db.run_sync(CustomCharacterCRUD.get_multi, **kwargs)
+
+    @staticmethod
+    async def update(
+        db: AsyncSession, db_obj: CustomCharacterDB, obj_in: CustomCharacterUpdate
+    ) -> CustomCharacterDB:
+        """更新范字"""
+        return await db.run_sync(CustomCharacterCRUD.update, db_obj, obj_in)
+
+    @staticmethod
+    async def delete(db: AsyncSession, id: int) -> Optional[CustomCharacterDB]:
+        """删除范字"""
+        return await db.run_sync(CustomCharacterCRUD.delete, id)
+
+    @staticmethod
+    async def increment_usage(db: AsyncSession, id: int) -> Optional[CustomCharacterDB]:
+        """增加使用次数"""
+        return await db.run_sync(CustomCharacterCRUD.increment_usage, id)
+
+    @staticmethod
+    async def get_popular(db: AsyncSession, limit: int = 10) -> List[CustomCharacterDB]:
+        """获取热门范字"""
+        return await db.run_sync(CustomCharacterCRUD.get_popular, limit)
+
+    @staticmethod
+    async def search_by_tags(db: AsyncSession, tags: List[str], limit: int = 100) -> List[CustomCharacterDB]:
+        """按标签搜索范字"""
+        return await db.run_sync(CustomCharacterCRUD.search_by_tags, tags, limit)
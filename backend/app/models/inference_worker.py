@@ -0,0 +1,331 @@
+"""
+InkSight Inference Worker - InkSight 推理工作进程
+
+Model-serving subsystem for photo scoring:
+- A separate worker process owns the InkSight model (TensorFlow stays out of
+  the API process entirely)
+- Requests arrive over a local multiprocessing queue
+- Requests arriving within a small time window are micro-batched into one
+  InkSightModel.predict_batch call
+- Callers get a concurrent.futures.Future (or await predict())
+
+Configuration (environment variables):
+- INKSIGHT_WORKER_ENABLED: route photo scoring through the worker (default false)
+- INKSIGHT_BATCH_SIZE: maximum images per model call (default 8)
+- INKSIGHT_BATCH_WAIT_MS: batching window after the first request (default 10)
+- INKSIGHT_WORKER_TIMEOUT: per-request timeout in seconds (default 30)
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Control message sent by the worker once the model is loaded
+_READY = "__ready__"
+
+
+def _process_batch(model, batch: List[Tuple[int, np.ndarray]], response_queue) -> None:
+    """
+    Run one batched prediction and post per-request responses.
+
+    The batch size is reported on the first response of each batch only,
+    so the client can count batches.
+    """
+    request_ids = [request_id for request_id, _ in batch]
+    sizes = [len(batch)] + [0] * (len(batch) - 1)
+    try:
+        results = model.predict_batch([image for _, image in batch])
+        for request_id, result, size in zip(request_ids, results, sizes):
+            response_queue.put((request_id, result, None, size))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        for request_id, size in zip(request_ids, sizes):
+            response_queue.put((request_id, None, error, size))
+
+
+def _worker_main(request_queue, response_queue, max_batch_size: int, max_wait: float) -> None:
+    """
+    Worker process entry point.
+
+    Blocks for the first request, then keeps collecting until the batch is
+    full or max_wait seconds have passed. A None request stops the worker.
+    """
+    from app.models.inksight import InkSightModel
+
+    model = InkSightModel.get_instance()
+    model.load()
+    is_mock = model.model.__class__.__name__ == "MockModel"
+    response_queue.put((_READY, {"is_mock": is_mock, "pid": os.getpid()}, None, 0))
+
+    while True:
+        item = request_queue.get()
+        if item is None:
+            break
+
+        batch = [item]
+        stop = False
+        deadline = time.monotonic() + max_wait
+        while len(batch) < max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = request_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+
+        _process_batch(model, batch, response_queue)
+        if stop:
+            break
+
+
+class InkSightWorker:
+    """
+    Client for the InkSight worker process.
+
+    Thread-safe: any number of request threads may submit concurrently;
+    a collector thread resolves futures as batched results come back.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        start_timeout: float = 120.0,
+    ):
+        """
+        Initialize worker client (the process starts on start())
+
+        Args:
+            max_batch_size: Maximum images per model call
+            max_wait_ms: Batching window after the first queued request
+            start_timeout: Seconds to wait for the model to load
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.start_timeout = start_timeout
+        self.is_mock = False
+
+        # spawn: never fork a process that may hold TensorFlow/threads
+        self._ctx = multiprocessing.get_context("spawn")
+        self._process = None
+        self._request_queue = None
+        self._response_queue = None
+        self._collector = None
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending: Dict[int, Future] = {}
+        self._stats = {"requests": 0, "batches": 0, "max_batch_size": 0, "errors": 0}
+
+    def is_running(self) -> bool:
+        """Check if worker process is alive and ready"""
+        return self._process is not None and self._process.is_alive() and self._ready.is_set()
+
+    def start(self) -> None:
+        """
+        Start the worker process and wait until the model is loaded.
+
+        Raises:
+            RuntimeError: If the worker does not become ready in time
+        """
+        if self._process is not None and not self._process.is_alive():
+            # Worker crashed: clean up before restarting
+            self.stop()
+
+        with self._lock:
+            if self._process is not None:
+                return
+            self._stopping.clear()
+            self._ready.clear()
+            self._request_queue = self._ctx.Queue()
+            self._response_queue = self._ctx.Queue()
+            self._process = self._ctx.Process(
+                target=_worker_main,
+                args=(self._request_queue, self._response_queue, self.max_batch_size, self.max_wait),
+                name="inksight-worker",
+                daemon=True,
+            )
+            self._process.start()
+            self._collector = threading.Thread(
+                target=self._collect, name="inksight-collector", daemon=True
+            )
+            self._collector.start()
+
+        deadline = time.monotonic() + self.start_timeout
+        while not self._ready.wait(0.2):
+            if not self._process.is_alive() or time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError("InkSight worker failed to start")
+        logger.info(f"InkSight worker started (pid={self._process.pid}, mock={self.is_mock})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker process and fail any pending requests"""
+        with self._lock:
+            process = self._process
+            if process is None:
+                return
+            self._stopping.set()
+
+        # Lock released: the collector must keep draining responses meanwhile
+        try:
+            self._request_queue.put(None)
+        except Exception:
+            pass
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout)
+
+        if self._collector is not None:
+            self._collector.join(timeout)
+            self._collector = None
+
+        with self._lock:
+            self._process = None
+            self._ready.clear()
+        self._fail_pending("InkSight worker stopped")
+
+    def submit(self, image: np.ndarray) -> Future:
+        """
+        Queue one image for batched prediction.
+
+        Args:
+            image: Input image (H, W, 3) uint8
+
+        Returns:
+            Future resolving to InksightResult
+
+        Raises:
+            RuntimeError: If the worker is not running
+        """
+        if not self.is_running():
+            raise RuntimeError("InkSight worker is not running")
+
+        future: Future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            self._pending[request_id] = future
+            self._stats["requests"] += 1
+        self._request_queue.put((request_id, np.ascontiguousarray(image)))
+        return future
+
+    async def predict(self, image: np.ndarray, timeout: Optional[float] = None):
+        """
+        Await batched prediction for one image.
+
+        Args:
+            image: Input image (H, W, 3) uint8
+            timeout: Optional timeout in seconds
+
+        Returns:
+            InksightResult
+        """
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(image)), timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request/batch counters"""
+        with self._lock:
+            return {**self._stats, "pending": len(self._pending)}
+
+    def _collect(self) -> None:
+        """Collector thread: resolve futures from worker responses"""
+        while not self._stopping.is_set() or self._pending:
+            try:
+                request_id, result, error, batch_size = self._response_queue.get(timeout=0.2)
+            except queue.Empty:
+                if self._process is not None and not self._process.is_alive():
+                    self._fail_pending("InkSight worker exited")
+                    return
+                if self._stopping.is_set():
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+
+            if request_id == _READY:
+                self.is_mock = bool(result.get("is_mock"))
+                self._ready.set()
+                continue
+
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+                if error is not None:
+                    self._stats["errors"] += 1
+                if batch_size:
+                    self._stats["batches"] += 1
+                    self._stats["max_batch_size"] = max(self._stats["max_batch_size"], batch_size)
+
+            if future is None or future.done():
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+
+    def _fail_pending(self, message: str) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(message))
+
+
+_worker: Optional[InkSightWorker] = None
+_worker_lock = threading.Lock()
+
+
+def is_inference_worker_enabled() -> bool:
+    """Whether photo scoring should use the worker (INKSIGHT_WORKER_ENABLED)"""
+    return os.getenv("INKSIGHT_WORKER_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_worker_timeout() -> float:
+    """Per-request timeout in seconds (INKSIGHT_WORKER_TIMEOUT, default 30)"""
+    return float(os.getenv("INKSIGHT_WORKER_TIMEOUT", "30"))
+
+
+def get_inference_worker() -> InkSightWorker:
+    """
+    Get the process-wide InkSight worker, starting it on first use.
+
+    Returns:
+        Running InkSightWorker
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = InkSightWorker(
+                max_batch_size=int(os.getenv("INKSIGHT_BATCH_SIZE", "8")),
+                max_wait_ms=float(os.getenv("INKSIGHT_BATCH_WAIT_MS", "10")),
+            )
+        if not _worker.is_running():
+            _worker.start()
+        return _worker
+
+
+def shutdown_inference_worker() -> None:
+    """Stop the process-wide worker if it was started"""
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+            _worker = None
@@ -16,30 +16,45 @@ from pathlib import Path
 from typing import List, Tuple, Optional, Union
 from pydantic import BaseModel
 import threading
-
-# TensorFlow import (version constrained in requirements.txt)
-try:
-    import tensorflow as tf
-    # Verify TensorFlow version
-    tf_version = tuple(int(x) for x in tf.__version__.split('.')[:2])
-    if not (2, 15) <= tf_version < (2, 18):
-        logging.warning(
-            f"TensorFlow version {tf.__version__} detected. "
-            f"Recommended: 2.15-2.17"
-        )
-except ImportError:
-    tf = None
-    logging.error("TensorFlow not installed. Install: pip install 'tensorflow>=2.15.0,<2.18.0'")
+from functools import lru_cache
 
 from app.models.model_loader import (
     get_inksight_model_path,
     is_model_cached,
     get_huggingface_model_id
 )
+from app.models.model_runtime import create_runtime
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _import_tensorflow():
+    """
+    Import TensorFlow on first use (version constrained in requirements.txt).
+
+    Deferred so that importing the API does not pay TensorFlow's multi-second,
+    multi-hundred-MB import cost; only the photo-scoring path needs it.
+
+    Returns:
+        tensorflow module, or None if not installed
+    """
+    try:
+        import tensorflow as tf
+    except ImportError:
+        logger.error("TensorFlow not installed. Install: pip install 'tensorflow>=2.15.0,<2.18.0'")
+        return None
+
+    # Verify TensorFlow version
+    tf_version = tuple(int(x) for x in tf.__version__.split('.')[:2])
+    if not (2, 15) <= tf_version < (2, 18):
+        logger.warning(
+            f"TensorFlow version {tf.__version__} detected. "
+            f"Recommended: 2.15-2.17"
+        )
+    return tf
+
+
 class InksightResult(BaseModel):
     """Result from InkSight prediction"""
     trajectory: List[Tuple[float, float]]
@@ -66,12 +81,15 @@ class InkSightModel:
 
     def __init__(self):
         # Initialize only once
-        if not hasattr(self, '_initialized'):
-            self.model = None
-            self._is_loaded = False
-            self._model_path = get_inksight_model_path()
-            self._initialized = True
-            logger.info(f"InkSightModel initialized. Cache path: {self._model_path}")
+        with self._lock:
+            if not hasattr(self, '_initialized'):
+                self.model = None
+                self._is_loaded = False
+                self._model_path = get_inksight_model_path()
+                # Guarded loading + bounded inference slots (INKSIGHT_INFERENCE_SLOTS)
+                self.runtime = create_runtime("InkSight", "INKSIGHT")
+                self._initialized = True
+                logger.info(f"InkSightModel initialized. Cache path: {self._model_path}")
 
     @classmethod
     def get_instance(cls) -> 'InkSightModel':
@@ -88,14 +106,15 @@ class InkSightModel:
 
         Downloads model from HuggingFace if not cached.
         Uses TensorFlow native loading (NO ONNX).
+        Thread-safe: concurrent callers wait for a single load.
 
         Falls back to mock model if InkSight is not available.
         """
-        if self.is_loaded():
-            logger.info("Model already loaded")
-            return
+        self.runtime.load_once(self.is_loaded, self._load)
 
-        if tf is None:
+    def _load(self) -> None:
+        """Load model (caller holds the runtime load lock)"""
+        if _import_tensorflow() is None:
             logger.warning("TensorFlow not available, using mock model")
             self._create_mock_model()
             return
@@ -142,8 +161,11 @@ class InkSightModel:
             def __init__(self):
                 self.loaded = True
 
-            def predict(self, image: np.ndarray) -> InksightResult:
-                """Generate simple mock trajectory"""
+            def predict(self, image: np.ndarray) -> Union[InksightResult, List[InksightResult]]:
+                """Generate simple mock trajectory (one result per image for batches)"""
+                if image.ndim == 4:
+                    return [self.predict(img) for img in image]
+
                 # Create a simple left-to-right trajectory
                 height, width = image.shape[:2]
                 num_points = 20
@@ -175,6 +197,9 @@ class InkSightModel:
 
         Returns:
             InksightResult with trajectory in 0-1 normalized coordinates
+
+        Raises:
+            ModelBusyError: If no inference slot frees up in time
         """
         if not self.is_loaded():
             self.load()
@@ -186,7 +211,12 @@ class InkSightModel:
         # Preprocess image
         processed = preprocess_image(image)
 
-        # Run prediction
+        # Run prediction (bounded concurrency)
+        with self.runtime.slot():
+            return self._predict_processed(processed)
+
+    def _predict_processed(self, processed: np.ndarray) -> InksightResult:
+        """Run the model on a preprocessed image (caller holds a slot)"""
         try:
             result = self.model.predict(processed)
 
@@ -212,6 +242,69 @@ class InkSightModel:
                 confidence=0.0
             )
 
+    def predict_batch(
+        self,
+        images: List[Union[np.ndarray, str, Path]]
+    ) -> List[InksightResult]:
+        """
+        Predict trajectories for several images with one model call.
+
+        Images are preprocessed and stacked into a single (N, 256, 256, 3)
+        batch, so throughput scales with batch size rather than request count.
+
+        Args:
+            images: Input images as numpy arrays (H, W, 3) or file paths
+
+        Returns:
+            One InksightResult per input image, in input order
+
+        Raises:
+            ModelBusyError: If no inference slot frees up in time
+        """
+        if not images:
+            return []
+
+        if not self.is_loaded():
+            self.load()
+
+        batch = np.stack([
+            preprocess_image(
+                self._load_image_from_path(image) if isinstance(image, (str, Path)) else image
+            )
+            for image in images
+        ])
+
+        with self.runtime.slot():
+            return self._predict_processed_batch(batch, len(images))
+
+    def _predict_processed_batch(self, batch: np.ndarray, count: int) -> List[InksightResult]:
+        """Run the model on a preprocessed batch (caller holds a slot)"""
+        try:
+            outputs = self.model.predict(batch)
+
+            results = []
+            for output in outputs:
+                # Handle mock model return
+                if isinstance(output, InksightResult):
+                    results.append(output)
+                    continue
+
+                # Handle real model return (per-sample tensor/array)
+                trajectory = self._extract_trajectory(output)
+                results.append(InksightResult(
+                    trajectory=trajectory,
+                    strokes=self._split_into_strokes(trajectory),
+                    confidence=0.85
+                ))
+            return results
+
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            return [
+                InksightResult(trajectory=[(0.5, 0.5)], strokes=[[(0.5, 0.5)]], confidence=0.0)
+                for _ in range(count)
+            ]
+
     def _load_image_from_path(self, path: Union[str, Path]) -> np.ndarray:
         """Load image from file path"""
         from PIL import Image
@@ -235,35 +328,38 @@ class InkSightModel:
         return [trajectory]
 
 
+INPUT_SIZE = (256, 256)
+
+
 def preprocess_image(image: np.ndarray) -> np.ndarray:
     """
     Preprocess image for InkSight model input.
 
+    uint8 input is resized as uint8 and converted to float exactly once
+    (no float -> uint8 -> float round trip); input already at the model
+    size is not resized at all.
+
     Args:
         image: Input image (H, W, 3) uint8
 
     Returns:
         Preprocessed image normalized to model expected format
     """
-    # Convert to float
-    if image.dtype == np.uint8:
-        image = image.astype(np.float32) / 255.0
-
     # Ensure RGB (remove alpha if present)
     if image.shape[-1] == 4:
         image = image[..., :3]
 
-    # Resize to model expected input size (typically 224x224 or 256x256)
-    target_size = (256, 256)
-    from PIL import Image
-    img_pil = Image.fromarray((image * 255).astype(np.uint8))
-    img_resized = img_pil.resize(target_size, Image.LANCZOS)
-    image = np.array(img_resized).astype(np.float32) / 255.0
+    if image.dtype != np.uint8:
+        # Float input in [0, 1]
+        image = (np.clip(image, 0.0, 1.0) * 255).astype(np.uint8)
 
-    # Normalize to [-1, 1] (common for vision models)
-    image = image * 2.0 - 1.0
+    # Resize to model expected input size (typically 224x224 or 256x256)
+    if image.shape[1::-1] != INPUT_SIZE:
+        from PIL import Image
+        image = np.asarray(Image.fromarray(image).resize(INPUT_SIZE, Image.LANCZOS))
 
-    return image
+    # Normalize to [-1, 1] (common for vision models), single conversion
+    return image.astype(np.float32) * np.float32(2.0 / 255.0) - np.float32(1.0)
 
 
 def map_inksight_to_hanzi_1024(
@@ -0,0 +1,369 @@
+"""排行榜（按用户平均分 Top-K）
+
+数据来自随练习记录增量维护的 user_progress_rollup / user_character_rollup
+（sum/count 与 average_score），读取只走 (average_score, 练习次数) 排名索引的前 K 行，
+与 practice_records 的行数无关。
+
+配置（环境变量）：
+- LEADERBOARD_BACKEND：database（默认，读汇总表索引）或 redis（写入后同步到
+  Redis 有序集合，读取 ZREVRANGE；Redis 出错时回退数据库）
+- LEADERBOARD_REFRESH_SECONDS：0（默认）每次读取都是最新；N > 0 时 Top-K
+  结果在进程内缓存 N 秒（允许最多 N 秒的延迟）
+- REDIS_URL：redis 后端的连接地址
+
+异步端点使用 top_async / publish_async：同步 redis 客户端的调用放到线程池，
+Redis 变慢或不可达时不会阻塞事件循环。
+
+两个后端的排序一致：平均分降序，平均分相同按练习次数降序，再按 user_id 降序。
+
+Redis 榜单只有在 sync_to_redis 完整写入后（设置 synced 标记）才会被读取。
+Redis 重启、清空或标记丢失后，榜单里只有之后练习过的用户：此时读取回退数据库，
+并在后台从汇总表重新同步（需要 session_factory）。榜单键不设过期时间，
+volatile-* 淘汰策略不会淘汰它们；不要对该实例使用 allkeys-* 策略。
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.user_progress_db import UserCharacterRollupDB, UserProgressRollupDB
+
+# Redis import (optional backend)
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("database", "redis")
+
+
+class LeaderboardEntry(BaseModel):
+    """排行榜条目"""
+    user_id: str
+    average_score: float
+    practice_count: int
+
+
+class Leaderboard:
+    """
+    Top-K 排行榜。
+
+    Redis 后端：每个榜单一个有序集合（成员 user_id，分数为平均分）加一个
+    记录练习次数的哈希；练习记录提交后由 publish() 写入。sync_to_redis 完整
+    写入后设置 SYNCED_KEY，缺少该标记时 Redis 榜单视为不完整。
+    """
+
+    KEY_PREFIX = "smartpen:leaderboard:v1:"
+    SYNCED_KEY = f"{KEY_PREFIX}synced"
+
+    def __init__(
+        self,
+        backend: str = "database",
+        redis_client: Optional[Any] = None,
+        refresh_seconds: float = 0.0,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ):
+        """
+        Args:
+            backend: "database" 或 "redis"
+            redis_client: 同步 redis 客户端（redis 后端必需）
+            refresh_seconds: Top-K 结果缓存秒数（0 = 不缓存）
+            session_factory: 创建同步会话（Redis 缺少 synced 标记时后台重新
+                同步用；None = 只回退数据库，等待 backfill_rollups 同步）
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown leaderboard backend: {backend}")
+        if backend == "redis" and redis_client is None:
+            raise ValueError("Redis leaderboard backend requires a redis client")
+
+        self.backend = backend
+        self.redis = redis_client
+        self.refresh_seconds = refresh_seconds
+        self.session_factory = session_factory
+        self._cache: Dict[Tuple[Optional[str], int], Tuple[float, List[LeaderboardEntry]]] = {}
+        self._lock = threading.Lock()
+        self._reseed_thread: Optional[threading.Thread] = None
+
+    def _keys(self, character: Optional[str]) -> Tuple[str, str]:
+        board = f"char:{character}" if character else "all"
+        return f"{self.KEY_PREFIX}{board}", f"{self.KEY_PREFIX}{board}:counts"
+
+    def top(self, db: Session, character: Optional[str] = None, limit: int = 10) -> List[LeaderboardEntry]:
+        """
+        获取 Top-K
+
+        Args:
+            db: 数据库会话（数据库后端及 Redis 回退时使用）
+            character: 按字符筛选（None = 全部练习）
+            limit: 返回数量
+
+        Returns:
+            按平均分降序的条目
+        """
+        key = (character, limit)
+        entries = self._get_cached(key)
+        if entries is not None:
+            return entries
+
+        if self.backend == "redis":
+            try:
+                entries = self._top_from_redis(character, limit)
+            except Exception as e:
+                logger.warning(f"Redis leaderboard read failed, using database: {e}")
+        if entries is None:
+            entries = self._top_from_database(db, character, limit)
+
+        self._set_cached(key, entries)
+        return entries
+
+    async def top_async(
+        self, db: AsyncSession, character: Optional[str] = None, limit: int = 10
+    ) -> List[LeaderboardEntry]:
+        """获取 Top-K（异步端点用：Redis 读取在线程池执行，参数同 top）"""
+        key = (character, limit)
+        entries = self._get_cached(key)
+        if entries is not None:
+            return entries
+
+        if self.backend == "redis":
+            try:
+                entries = await asyncio.to_thread(self._top_from_redis, character, limit)
+            except Exception as e:
+                logger.warning(f"Redis leaderboard read failed, using database: {e}")
+        if entries is None:
+            entries = await db.run_sync(self._top_from_database, character, limit)
+
+        self._set_cached(key, entries)
+        return entries
+
+    def _get_cached(self, key: Tuple[Optional[str], int]) -> Optional[List[LeaderboardEntry]]:
+        if self.refresh_seconds <= 0:
+            return None
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def _set_cached(self, key: Tuple[Optional[str], int], entries: List[LeaderboardEntry]) -> None:
+        if self.refresh_seconds > 0:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.refresh_seconds, entries)
+
+    def _top_from_database(self, db: Session, character: Optional[str], limit: int) -> List[LeaderboardEntry]:
+        if character:
+            rows = db.query(
+                UserCharacterRollupDB.user_id,
+                UserCharacterRollupDB.average_score,
+                UserCharacterRollupDB.practice_count,
+            ).filter(
+                UserCharacterRollupDB.character == character
+            ).order_by(
+                UserCharacterRollupDB.average_score.desc(),
+                UserCharacterRollupDB.practice_count.desc(),
+                UserCharacterRollupDB.user_id.desc(),
+            ).limit(limit).all()
+        else:
+            rows = db.query(
+                UserProgressRollupDB.user_id,
+                UserProgressRollupDB.average_score,
+                UserProgressRollupDB.total_practices,
+            ).filter(
+                UserProgressRollupDB.total_practices > 0
+            ).order_by(
+                UserProgressRollupDB.average_score.desc(),
+                UserProgressRollupDB.total_practices.desc(),
+                UserProgressRollupDB.user_id.desc(),
+            ).limit(limit).all()
+
+        return [
+            LeaderboardEntry(user_id=user_id, average_score=float(average), practice_count=count)
+            for user_id, average, count in rows
+        ]
+
+    def _top_from_redis(self, character: Optional[str], limit: int) -> Optional[List[LeaderboardEntry]]:
+        if not self.redis.exists(self.SYNCED_KEY):
+            # 未同步或已丢失（重启 / 清空）：榜单可能只含部分用户，交给数据库
+            self._reseed_in_background()
+            return None
+
+        board_key, counts_key = self._keys(character)
+        members = self.redis.zrevrange(board_key, 0, limit - 1, withscores=True)
+        if not members:
+            return []
+
+        scores = {_to_str(member): float(score) for member, score in members}
+        if len(members) == limit:
+            # 与第 K 名平均分相同的用户可能排在 K 之外：一并取出后按练习次数排序
+            boundary = float(members[-1][1])
+            for member, score in self.redis.zrevrangebyscore(board_key, boundary, boundary, withscores=True):
+                scores[_to_str(member)] = float(score)
+
+        user_ids = list(scores)
+        counts = dict(zip(user_ids, (int(count or 0) for count in self.redis.hmget(counts_key, user_ids))))
+        ranked = sorted(user_ids, key=lambda user_id: (scores[user_id], counts[user_id], user_id), reverse=True)
+        return [
+            LeaderboardEntry(user_id=user_id, average_score=scores[user_id], practice_count=counts[user_id])
+            for user_id in ranked[:limit]
+        ]
+
+    def _reseed_in_background(self) -> None:
+        """在后台线程从汇总表重新同步 Redis（同一时间最多一个）"""
+        if self.session_factory is None:
+            return
+        with self._lock:
+            if self._reseed_thread is not None and self._reseed_thread.is_alive():
+                return
+            self._reseed_thread = threading.Thread(
+                target=self._reseed, name="leaderboard-reseed", daemon=True
+            )
+            self._reseed_thread.start()
+
+    def _reseed(self) -> None:
+        db = self.session_factory()
+        try:
+            written = self.sync_to_redis(db)
+            logger.info(f"Redis leaderboard resynced from rollups ({written} entries)")
+        except Exception as e:
+            logger.warning(f"Redis leaderboard resync failed: {e}")
+        finally:
+            db.close()
+
+    def publish(self, db: Session, user_id: str, character: str) -> None:
+        """
+        练习记录提交后，把该用户的最新平均分写入 Redis 榜单（数据库后端无操作）
+
+        Redis 写入失败只记录日志：数据库汇总仍是权威数据，可用 sync_to_redis 重建。
+        未同步的 Redis 也照常写入，但在 sync_to_redis 完成前不会被读取。
+        """
+        if self.backend != "redis":
+            return
+        self._push(self._rollup_scores(db, [(user_id, character)]))
+
+    async def publish_async(self, db: AsyncSession, pairs: List[Tuple[str, str]]) -> None:
+        """
+        publish 的异步版本：汇总行经 AsyncSession 读取，Redis 写入在线程池执行
+
+        Args:
+            db: 已提交练习记录的异步会话
+            pairs: 新记录的 (user_id, character)
+        """
+        if self.backend != "redis" or not pairs:
+            return
+        scores = await db.run_sync(self._rollup_scores, pairs)
+        await asyncio.to_thread(self._push, scores)
+
+    @staticmethod
+    def _rollup_scores(
+        db: Session, pairs: List[Tuple[str, str]]
+    ) -> List[Tuple[Optional[str], str, float, int]]:
+        """读取 (榜单字符或 None, user_id, 平均分, 练习次数)，每个用户的总榜只取一次"""
+        scores = []
+        for user_id in sorted({user_id for user_id, _ in pairs}):
+            rollup = db.get(UserProgressRollupDB, user_id)
+            if rollup is not None:
+                scores.append((None, user_id, rollup.average_score, rollup.total_practices))
+        for user_id, character in sorted(set(pairs)):
+            char_rollup = db.get(UserCharacterRollupDB, (user_id, character))
+            if char_rollup is not None:
+                scores.append((character, user_id, char_rollup.average_score, char_rollup.practice_count))
+        return scores
+
+    def _push(self, scores: List[Tuple[Optional[str], str, float, int]]) -> None:
+        """写入 Redis（阻塞 I/O；失败只记录日志）"""
+        if not scores:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for character, user_id, average, count in scores:
+                self._add(pipe, character, user_id, average, count)
+            pipe.execute()
+        except Exception as e:
+            users = sorted({user_id for _, user_id, _, _ in scores})
+            logger.warning(f"Redis leaderboard update failed for {users}: {e}")
+
+    def _add(self, pipe, character: Optional[str], user_id: str, average: float, count: int) -> None:
+        board_key, counts_key = self._keys(character)
+        pipe.zadd(board_key, {user_id: average})
+        pipe.hset(counts_key, user_id, count)
+
+    def sync_to_redis(self, db: Session, batch_size: int = 1000) -> int:
+        """从数据库汇总表重建 Redis 榜单并设置 synced 标记，返回写入的条目数"""
+        if self.backend != "redis":
+            return 0
+
+        written = 0
+        pipe = self.redis.pipeline()
+        for rollup in db.query(UserProgressRollupDB).yield_per(batch_size):
+            self._add(pipe, None, rollup.user_id, rollup.average_score, rollup.total_practices)
+            written += 1
+            if written % batch_size == 0:
+                pipe.execute()
+        for char_rollup in db.query(UserCharacterRollupDB).yield_per(batch_size):
+            self._add(
+                pipe, char_rollup.character, char_rollup.user_id,
+                char_rollup.average_score, char_rollup.practice_count,
+            )
+            written += 1
+            if written % batch_size == 0:
+                pipe.execute()
+        # 全部条目写入后才标记为已同步
+        pipe.set(self.SYNCED_KEY, int(time.time()))
+        pipe.execute()
+        return written
+
+    def clear_cache(self) -> None:
+        """清空进程内 Top-K 缓存"""
+        with self._lock:
+            self._cache.clear()
+
+
+def _to_str(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+_shared_leaderboard: Optional[Leaderboard] = None
+_shared_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard() -> Leaderboard:
+    """
+    获取进程共享的排行榜（配置见模块说明）
+
+    LEADERBOARD_BACKEND=redis 但未配置 REDIS_URL 或未安装 redis 时回退数据库后端。
+    Redis 后端缺少 synced 标记时用 SessionLocal 在后台重新同步。
+    """
+    global _shared_leaderboard
+    if _shared_leaderboard is None:
+        with _shared_leaderboard_lock:
+            if _shared_leaderboard is None:
+                backend = os.getenv("LEADERBOARD_BACKEND", "database").strip().lower()
+                redis_client = None
+                session_factory = None
+                if backend == "redis":
+                    url = os.getenv("REDIS_URL")
+                    if url and REDIS_AVAILABLE:
+                        from ..database import SessionLocal
+
+                        redis_client = redis.Redis.from_url(url)
+                        session_factory = SessionLocal
+                    else:
+                        logger.warning("Redis leaderboard needs REDIS_URL and redis; using database")
+                        backend = "database"
+                _shared_leaderboard = Leaderboard(
+                    backend=backend,
+                    redis_client=redis_client,
+                    refresh_seconds=float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "0")),
+                    session_factory=session_factory,
+                )
+    return _shared_leaderboard
@@ -0,0 +1,166 @@
+"""
+Model Runtime - 模型运行时
+
+Concurrency control shared by the InkSight and PaddleOCR singletons:
+- Guarded one-time loading (concurrent first requests load the model once)
+- A bounded number of inference slots (semaphore)
+- Slot wait timeouts, so bursts fail fast instead of piling up in memory
+- Queueing metrics (in flight, waiting, wait time, timeouts)
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOT_TIMEOUT = 30.0
+
+
+class ModelBusyError(TimeoutError):
+    """Raised when no inference slot becomes free within the timeout"""
+
+
+class ModelRuntime:
+    """
+    Load guard and inference slots for one model.
+
+    Thread-safe; one instance per model singleton.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slots: int = 1,
+        slot_timeout: Optional[float] = DEFAULT_SLOT_TIMEOUT,
+    ):
+        """
+        Initialize runtime
+
+        Args:
+            name: Model name (for logs and metrics)
+            slots: Maximum concurrent inferences (must be >= 1)
+            slot_timeout: Default seconds to wait for a slot (None = wait forever)
+        """
+        if slots < 1:
+            raise ValueError("slots must be >= 1")
+        self.name = name
+        self.slots = slots
+        self.slot_timeout = slot_timeout
+        self._load_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(slots)
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, float] = {
+            "loads": 0,
+            "in_flight": 0,
+            "waiting": 0,
+            "max_waiting": 0,
+            "completed": 0,
+            "timeouts": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+    def load_once(self, is_loaded: Callable[[], bool], load: Callable[[], None]) -> None:
+        """
+        Run load() unless the model is already loaded.
+
+        Double-checked under a lock: concurrent callers block until the
+        first load finishes instead of loading the model again.
+
+        Args:
+            is_loaded: Returns True if the model is ready
+            load: Performs the actual load
+        """
+        if is_loaded():
+            return
+        with self._load_lock:
+            if is_loaded():
+                return
+            load()
+            with self._metrics_lock:
+                self._metrics["loads"] += 1
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold one inference slot for the duration of the block.
+
+        Args:
+            timeout: Seconds to wait for a slot (defaults to slot_timeout)
+
+        Raises:
+            ModelBusyError: If no slot frees up in time
+        """
+        timeout = self.slot_timeout if timeout is None else timeout
+        start = time.perf_counter()
+
+        with self._metrics_lock:
+            self._metrics["waiting"] += 1
+            self._metrics["max_waiting"] = max(self._metrics["max_waiting"], self._metrics["waiting"])
+
+        acquired = self._semaphore.acquire(timeout=timeout) if timeout is not None else self._semaphore.acquire()
+        wait_ms = (time.perf_counter() - start) * 1000
+
+        with self._metrics_lock:
+            self._metrics["waiting"] -= 1
+            if acquired:
+                self._metrics["in_flight"] += 1
+                self._metrics["total_wait_ms"] += wait_ms
+                self._metrics["max_wait_ms"] = max(self._metrics["max_wait_ms"], wait_ms)
+            else:
+                self._metrics["timeouts"] += 1
+
+        if not acquired:
+            logger.warning(f"{self.name}: no inference slot free after {timeout}s")
+            raise ModelBusyError(f"{self.name} is busy, try again later")
+
+        try:
+            yield
+        finally:
+            with self._metrics_lock:
+                self._metrics["in_flight"] -= 1
+                self._metrics["completed"] += 1
+            self._semaphore.release()
+
+    def metrics(self) -> Dict[str, float]:
+        """Return a snapshot of load/queueing metrics"""
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+        completed = snapshot["completed"] + snapshot["in_flight"]
+        snapshot["avg_wait_ms"] = round(snapshot["total_wait_ms"] / completed, 3) if completed else 0.0
+        snapshot["slots"] = self.slots
+        return snapshot
+
+
+def create_runtime(name: str, env_prefix: str, max_slots: Optional[int] = None) -> ModelRuntime:
+    """
+    Create runtime configured from environment variables.
+
+    - {env_prefix}_INFERENCE_SLOTS: concurrent inferences (default 1)
+    - MODEL_SLOT_TIMEOUT: seconds to wait for a slot (default 30)
+
+    Args:
+        name: Model name
+        env_prefix: Environment variable prefix, e.g. "INKSIGHT"
+        max_slots: Upper bound for the model's slots (None = no bound). Models
+            whose predictor is not thread-safe pass 1; larger configured
+            values are clamped with a warning.
+
+    Returns:
+        Configured ModelRuntime
+    """
+    slots = int(os.getenv(f"{env_prefix}_INFERENCE_SLOTS", "1"))
+    if max_slots is not None and slots > max_slots:
+        logger.warning(
+            f"{env_prefix}_INFERENCE_SLOTS={slots} exceeds the {name} limit, using {max_slots}"
+        )
+        slots = max_slots
+    return ModelRuntime(
+        name=name,
+        slots=slots,
+        slot_timeout=float(os.getenv("MODEL_SLOT_TIMEOUT", DEFAULT_SLOT_TIMEOUT)),
+    )
@@ -5,25 +5,44 @@ Uses PaddleOCR library to verify user's written character matches expected.
 防止张冠李戴 (prevent misattribution).
 """
 
+import copy
 import logging
+import os
 import numpy as np
 from pathlib import Path
 from typing import List, Tuple, Optional, Union
 from pydantic import BaseModel
 import threading
+from functools import lru_cache
 
-# PaddleOCR import
-try:
-    from paddleocr import PaddleOCR as PaddleOCRBase
-    PADDLEOCR_AVAILABLE = True
-except ImportError:
-    PaddleOCRBase = None
-    PADDLEOCR_AVAILABLE = False
-    logging.warning("PaddleOCR not installed. Install: pip install paddleocr")
+from app.models.model_runtime import create_runtime
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _import_paddleocr():
+    """
+    Import PaddleOCR on first use.
+
+    Deferred so that importing the API does not load PaddlePaddle;
+    only character verification needs it.
+
+    Returns:
+        PaddleOCR class, or None if not installed
+    """
+    try:
+        from paddleocr import PaddleOCR as PaddleOCRBase
+    except ImportError:
+        logger.warning("PaddleOCR not installed. Install: pip install paddleocr")
+        return None
+    return PaddleOCRBase
+
+
+# Candidates kept per recognized image (top_k is capped to this)
+MAX_TOP_K = 10
+
+
 class OCRResult(BaseModel):
     """Result from OCR prediction"""
     text: str
@@ -31,6 +50,50 @@ class OCRResult(BaseModel):
     bbox: List[Tuple[int, int]] = []
 
 
+class CharacterVerification(BaseModel):
+    """Per-cell result of batch character verification"""
+    expected: str
+    text: str
+    confidence: float
+    expected_confidence: float = 0.0  # Recognizer score of the expected character
+    candidates: List[Tuple[str, float]] = []  # Top-k (character, score), best first
+    verified: bool
+
+
+class _TopKDecode:
+    """
+    Wraps the recognizer's CTC decoder to also return top-k candidates.
+
+    TextRecognizer places whatever the decoder returns per image back in
+    input order, so each result becomes (text, score, candidates). A
+    character's score is its peak probability over the CTC time steps.
+
+    Only installed on a per-call copy of the recognizer (see
+    _recognize_batch): TextSystem, used by ocr(), unpacks every recognizer
+    result as (text, score).
+    """
+
+    def __init__(self, decode):
+        self.decode = decode
+        self.character = decode.character
+
+    def __call__(self, preds, *args, **kwargs):
+        results = self.decode(preds, *args, **kwargs)
+        if isinstance(preds, (list, tuple)):
+            preds = preds[-1]
+        preds = np.asarray(preds)
+        if preds.ndim != 3 or preds.shape[0] != len(results):
+            return results
+
+        peak = preds.max(axis=1)
+        peak[:, 0] = 0.0  # CTC blank
+        top = np.argsort(-peak, axis=1)[:, :MAX_TOP_K]
+        return [
+            (text, score, [(self.character[i], float(peak[n, i])) for i in top[n] if peak[n, i] > 0])
+            for n, (text, score) in enumerate(results)
+        ]
+
+
 class PaddleOCRModel:
     """
     PaddleOCR model wrapper for character verification.
@@ -49,11 +112,15 @@ class PaddleOCRModel:
         return cls._instance
 
     def __init__(self):
-        if not hasattr(self, '_initialized'):
-            self.model = None
-            self._is_loaded = False
-            self._initialized = True
-            logger.info("PaddleOCRModel initialized")
+        with self._lock:
+            if not hasattr(self, '_initialized'):
+                self.model = None
+                self._is_loaded = False
+                # Guarded loading + a single inference slot: the Paddle
+                # predictor is not thread-safe, so PADDLEOCR_INFERENCE_SLOTS > 1 is clamped
+                self.runtime = create_runtime("PaddleOCR", "PADDLEOCR", max_slots=1)
+                self._initialized = True
+                logger.info("PaddleOCRModel initialized")
 
     @classmethod
     def get_instance(cls) -> 'PaddleOCRModel':
@@ -68,14 +135,17 @@ class PaddleOCRModel:
         """
         Load PaddleOCR model.
 
+        Thread-safe: concurrent callers wait for a single load.
+
         Args:
             use_gpu: Whether to use GPU acceleration
         """
-        if self.is_loaded():
-            logger.info("Model already loaded")
-            return
+        self.runtime.load_once(self.is_loaded, lambda: self._load(use_gpu))
 
-        if not PADDLEOCR_AVAILABLE:
+    def _load(self, use_gpu: bool) -> None:
+        """Load model (caller holds the runtime load lock)"""
+        PaddleOCRBase = _import_paddleocr()
+        if PaddleOCRBase is None:
             logger.warning("PaddleOCR not available, using mock model")
             self._create_mock_model()
             return
@@ -88,7 +158,8 @@ class PaddleOCRModel:
                 use_angle_cls=True,
                 lang='ch',
                 use_gpu=use_gpu,
-                show_log=False
+                show_log=False,
+                rec_batch_num=int(os.getenv("PADDLEOCR_REC_BATCH_NUM", "32"))
             )
             self._is_loaded = True
             logger.info("PaddleOCR model loaded successfully")
@@ -130,6 +201,9 @@ class PaddleOCRModel:
 
         Returns:
             OCRResult with text and confidence
+
+        Raises:
+            ModelBusyError: If no inference slot frees up in time
         """
         if not self.is_loaded():
             self.load()
@@ -141,7 +215,12 @@ class PaddleOCRModel:
         # Preprocess
         processed = preprocess_ocr_image(image)
 
-        # Run OCR
+        # Run OCR (bounded concurrency)
+        with self.runtime.slot():
+            return self._ocr_processed(processed)
+
+    def _ocr_processed(self, processed: np.ndarray) -> OCRResult:
+        """Run OCR on a preprocessed image (caller holds a slot)"""
         try:
             results = self.model.ocr(processed)
 
@@ -189,6 +268,126 @@ class PaddleOCRModel:
         result = self.ocr(image)
         return verify_character_match(result, expected_char, min_confidence)
 
+    def verify_characters_batch(
+        self,
+        images: List[Union[np.ndarray, str, Path]],
+        expected_chars: Union[str, List[str]],
+        min_confidence: float = 0.7,
+        top_k: int = 5,
+        detect: bool = False
+    ) -> List[CharacterVerification]:
+        """
+        Verify many pre-cropped single-character cells in one call.
+
+        Cells go straight to the text recognizer as one batch: text
+        detection and direction classification are skipped because each
+        crop already holds one upright character.
+
+        Args:
+            images: Cell images (H, W, 3) / (H, W) or file paths
+            expected_chars: One expected character per image (a single
+                character applies to every image)
+            min_confidence: Minimum confidence threshold
+            top_k: Number of candidates returned per cell (max MAX_TOP_K)
+            detect: Run full detection + recognition per image instead
+                (for crops that may contain more than the character)
+
+        Returns:
+            One CharacterVerification per image, in input order
+
+        Raises:
+            ValueError: If expected_chars does not match the number of images
+            ModelBusyError: If no inference slot frees up in time
+        """
+        if isinstance(expected_chars, str):
+            expected_chars = list(expected_chars) if len(expected_chars) > 1 else [expected_chars] * len(images)
+        if len(expected_chars) != len(images):
+            raise ValueError(
+                f"Got {len(expected_chars)} expected characters for {len(images)} images"
+            )
+        if not images:
+            return []
+
+        if not self.is_loaded():
+            self.load()
+
+        processed = [
+            preprocess_ocr_image(
+                self._load_image_from_path(image) if isinstance(image, (str, Path)) else image
+            )
+            for image in images
+        ]
+
+        # One slot for the whole batch
+        with self.runtime.slot():
+            if detect:
+                recognized = [self._single_result(processed_image) for processed_image in processed]
+            else:
+                recognized = self._recognize_batch(processed)
+
+        top_k = max(0, min(top_k, MAX_TOP_K))
+        results = []
+        for expected, (text, confidence, candidates) in zip(expected_chars, recognized):
+            scores = dict(candidates)
+            results.append(CharacterVerification(
+                expected=expected,
+                text=text,
+                confidence=confidence,
+                expected_confidence=scores.get(expected, confidence if text == expected else 0.0),
+                candidates=candidates[:top_k],
+                verified=verify_character_match(
+                    OCRResult(text=text, confidence=confidence), expected, min_confidence
+                ),
+            ))
+        return results
+
+    def _recognize_batch(
+        self,
+        processed: List[np.ndarray]
+    ) -> List[Tuple[str, float, List[Tuple[str, float]]]]:
+        """Recognition-only OCR on preprocessed images (caller holds a slot)"""
+        recognizer = getattr(self.model, "text_recognizer", None)
+        if recognizer is None:
+            # Models without a separate recognizer (mock): one call per image
+            return [self._single_result(image) for image in processed]
+
+        try:
+            rec_res, _ = self._top_k_recognizer(recognizer)(processed)
+        except Exception as e:
+            logger.error(f"Batch OCR failed: {e}")
+            return [("", 0.0, [])] * len(processed)
+
+        recognized = []
+        for entry in rec_res:
+            text, confidence = str(entry[0]), float(entry[1])
+            if len(entry) > 2:
+                candidates = [(str(c), float(p)) for c, p in entry[2]]
+            else:
+                candidates = [(text, confidence)] if text else []
+            recognized.append((text, confidence, candidates))
+        return recognized
+
+    @staticmethod
+    def _top_k_recognizer(recognizer):
+        """
+        Shallow copy of the recognizer whose decoder also returns top-k
+        candidates. The copy shares the predictor; the shared recognizer
+        (and so ocr()) keeps its original decoder.
+        """
+        decode = getattr(recognizer, "postprocess_op", None)
+        if decode is None or not hasattr(decode, "character"):
+            logger.warning("PaddleOCR recognizer has no CTC decoder; top-k candidates disabled")
+            return recognizer
+
+        batch_recognizer = copy.copy(recognizer)
+        batch_recognizer.postprocess_op = _TopKDecode(decode)
+        return batch_recognizer
+
+    def _single_result(self, processed: np.ndarray) -> Tuple[str, float, List[Tuple[str, float]]]:
+        result = self._ocr_processed(processed)
+        candidates = [(result.text, result.confidence)] if result.text else []
+        return result.text, result.confidence, candidates
+
     def _load_image_from_path(self, path: Union[str, Path]) -> np.ndarray:
         """Load image from file path"""
         from PIL import Image
@@ -0,0 +1,83 @@
+"""游标（keyset）分页
+
+按 (created_at, id) 降序翻页：下一页条件为 (created_at, id) < 上一页最后一行，
+配合 (…, created_at, id) 索引时每页代价与翻页深度无关（不使用 OFFSET）。
+
+游标对客户端不透明：URL 安全的 base64 编码，内容为最后一行的 created_at 和 id。
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """编码游标"""
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    解码游标
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def paginate_keyset(
+    query: Query,
+    created_column: Any,
+    id_column: Any,
+    cursor: Optional[str],
+    limit: int,
+    offset: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    按 (created_at, id) 降序取一页
+
+    Args:
+        query: 已加过滤条件的查询
+        created_column: 时间列（如 PracticeRecordDB.created_at）
+        id_column: 主键列
+        cursor: 上一页返回的游标（None = 第一页）
+        limit: 每页数量
+        offset: 兼容旧版页码分页的 OFFSET（提供游标时忽略）
+
+    Returns:
+        (本页行, 下一页游标；没有更多数据时为 None)
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        # 带列类型绑定，保证与列的存储格式一致（SQLite 以字符串比较时间）
+        query = query.filter(
+            tuple_(created_column, id_column)
+            < tuple_(literal(created_at, created_column.type), literal(id, id_column.type))
+        )
+        offset = 0
+
+    # 多取一行判断是否还有下一页
+    query = query.order_by(created_column.desc(), id_column.desc())
+    if offset:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_column.key), getattr(last, id_column.key))
@@ -169,3 +169,76 @@ class ComprehensiveScoreResult(BaseModel):
         None,
         description="错误信息（可选）"
     )
+
+
+class WorksheetCellResult(BaseModel):
+    """Scoring result of one 田字格 cell on a practice sheet"""
+    row: int = Field(
+        ...,
+        ge=0,
+        description="行号（从 0 开始）"
+    )
+    col: int = Field(
+        ...,
+        ge=0,
+        description="列号（从 0 开始）"
+    )
+    character: Optional[str] = Field(
+        None,
+        description="该格应书写的汉字"
+    )
+    box: List[int] = Field(
+        ...,
+        description="格子在矫正后练习纸中的位置 [x, y, w, h]"
+    )
+    status: str = Field(
+        ...,
+        description="scored / empty（未书写）/ skipped（未指定汉字）/ mismatch（字符不符）/ no_strokes / error"
+    )
+    recognized: Optional[str] = Field(
+        None,
+        description="OCR 识别出的汉字（开启验证时）"
+    )
+    ocr_confidence: Optional[float] = Field(
+        None,
+        ge=0,
+        le=1,
+        description="OCR 识别置信度（开启验证时）"
+    )
+    result: Optional[ComprehensiveScoreResult] = Field(
+        None,
+        description="评分结果"
+    )
+    message: Optional[str] = Field(
+        None,
+        description="错误信息（可选）"
+    )
+
+
+class WorksheetScoreResult(BaseModel):
+    """Scoring result of a whole practice sheet"""
+    rows: int = Field(
+        ...,
+        ge=0,
+        description="检测到的行数"
+    )
+    cols: int = Field(
+        ...,
+        ge=0,
+        description="检测到的列数"
+    )
+    cells: List[WorksheetCellResult] = Field(
+        default_factory=list,
+        description="各格结果（按行优先顺序）"
+    )
+    scored_count: int = Field(
+        0,
+        ge=0,
+        description="成功评分的格数"
+    )
+    average_score: Optional[float] = Field(
+        None,
+        ge=0,
+        le=100,
+        description="已评分格子的平均总分"
+    )
@@ -1,9 +1,12 @@
 """用户进度追踪数据模型"""
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from enum import Enum
 
+# 离线记录 practiced_at 允许超前服务器时间的最大时钟偏差
+PRACTICED_AT_MAX_SKEW = timedelta(minutes=5)
+
 
 class PracticeMode(str, Enum):
     """练习模式"""
@@ -60,6 +63,54 @@ class PracticeRecordCreate(BaseModel):
         }
 
 
+class PracticeRecordSyncItem(PracticeRecordCreate):
+    """离线练习记录（批量同步）"""
+    client_record_id: str = Field(
+        ..., min_length=1, max_length=64, description="客户端生成的记录 ID（同一用户内唯一，用于幂等）"
+    )
+    practiced_at: Optional[datetime] = Field(None, description="实际练习时间（缺省为服务器接收时间）")
+
+    @field_validator("practiced_at")
+    @classmethod
+    def validate_not_in_future(cls, v: Optional[datetime]) -> Optional[datetime]:
+        """
+        拒绝未来时间：超前服务器时间超过 PRACTICED_AT_MAX_SKEW 报错，偏差以内截断为当前时间
+
+        未来的 practiced_at 会把汇总的 last_practice_date 推到未来，之后的正常练习都会
+        被当作补录而触发全量重建，连续天数在那之前也一直为 0。不带时区的时间按 UTC 处理。
+        """
+        if v is None:
+            return v
+        now = datetime.now(timezone.utc)
+        aware = v if v.tzinfo is not None else v.replace(tzinfo=timezone.utc)
+        if aware > now + PRACTICED_AT_MAX_SKEW:
+            raise ValueError(f"practiced_at {v.isoformat()} is in the future")
+        if aware > now:
+            return now if v.tzinfo is not None else now.replace(tzinfo=None)
+        return v
+
+
+class PracticeRecordBulkSync(BaseModel):
+    """批量同步请求"""
+    records: List[PracticeRecordSyncItem] = Field(
+        ..., min_length=1, max_length=500, description="离线练习记录"
+    )
+
+
+class PracticeRecordSyncStatus(BaseModel):
+    """单条同步结果"""
+    client_record_id: str
+    id: int = Field(description="服务器记录 ID")
+    duplicate: bool = Field(description="是否为已同步过的重复记录")
+
+
+class PracticeRecordBulkSyncResult(BaseModel):
+    """批量同步结果"""
+    created: int = Field(description="新写入的记录数")
+    duplicates: int = Field(description="已存在而跳过的记录数")
+    records: List[PracticeRecordSyncStatus] = Field(description="各记录结果（按请求顺序）")
+
+
 class PracticeRecordResponse(BaseModel):
     """练习记录响应"""
     id: int
@@ -76,6 +127,7 @@ class PracticeRecordResponse(BaseModel):
     time_spent: float
     stroke_count: int
     score_level: ScoreLevel
+    client_record_id: Optional[str] = None
     created_at: datetime
 
     class Config:
@@ -1,19 +1,33 @@
 """用户进度追踪数据库模型和操作"""
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, JSON, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Dict, Tuple
+from sqlalchemy import (
+    Column, Integer, String, Date, DateTime, Boolean, Float, JSON, ForeignKey, Index,
+    UniqueConstraint, exists, func, insert, tuple_,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, relationship, joinedload
 from pydantic import BaseModel
 
+from ..models.base import Base
+from ..models.pagination import paginate_keyset
 from ..models.user_progress import (
     PracticeRecordCreate,
     PracticeRecordResponse,
+    PracticeRecordSyncItem,
+    PracticeRecordSyncStatus,
     ScoreLevel,
     PracticeGoalCreate,
 )
 
-Base = declarative_base()
+# 汇总表保留的最近得分个数
+RECENT_SCORES_SIZE = 10
+
+# 分析接口默认的每日趋势天数
+ANALYTICS_TREND_DAYS = 30
 
 
 class PracticeRecordDB(Base):
@@ -41,8 +55,19 @@ class PracticeRecordDB(Base):
     stroke_count = Column(Integer, nullable=False)
 
     score_level = Column(String(20), nullable=False)
+    client_record_id = Column(String(64), nullable=True)  # 离线同步幂等键
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "client_record_id", name="uq_practice_records_user_client_record"),
+        # 用户记录列表 / 游标分页：user_id 等值 + (created_at, id) 有序扫描
+        Index("ix_practice_records_user_created", user_id, created_at.desc(), id.desc()),
+        # 用户按字符统计（汇总重建）
+        Index("ix_practice_records_user_character", user_id, character),
+        # 按字符跨用户统计（热门字符 / 排行榜重建）
+        Index("ix_practice_records_character_user", character, user_id),
+    )
+
 
 class PracticeGoalDB(Base):
     """练习目标数据库表"""
@@ -58,12 +83,109 @@ class PracticeGoalDB(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class UserProgressRollupDB(Base):
+    """用户进度汇总表（随练习记录增量维护，/summary 按主键读取）"""
+    __tablename__ = "user_progress_rollup"
+
+    user_id = Column(String(100), primary_key=True)
+    total_practices = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    average_score = Column(Float, nullable=False, default=0.0)  # 排行榜排序键
+    best_score = Column(Integer, nullable=False, default=0)
+    total_time_spent = Column(Float, nullable=False, default=0.0)  # 秒
+    posture_score_sum = Column(Integer, nullable=False, default=0)
+    posture_count = Column(Integer, nullable=False, default=0)
+    grip_correct_count = Column(Integer, nullable=False, default=0)
+    grip_count = Column(Integer, nullable=False, default=0)
+    unique_characters = Column(Integer, nullable=False, default=0)
+    recent_scores = Column(JSON, nullable=False, default=list)  # 最近得分，新的在前
+
+    # 连续练习状态（截至 last_practice_date）
+    current_streak = Column(Integer, nullable=False, default=0)
+    longest_streak = Column(Integer, nullable=False, default=0)
+    last_practice_date = Column(Date, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    characters = relationship(
+        "UserCharacterRollupDB",
+        cascade="all, delete-orphan",
+        order_by="UserCharacterRollupDB.character",
+    )
+
+    __table_args__ = (
+        # 全部练习排行榜：按 (average_score, total_practices, user_id) 有序扫描，无需排序
+        Index("ix_user_progress_rollup_ranking", average_score, total_practices, user_id),
+    )
+
+
+class UserCharacterRollupDB(Base):
+    """用户按字符汇总表"""
+    __tablename__ = "user_character_rollup"
+
+    user_id = Column(String(100), ForeignKey("user_progress_rollup.user_id"), primary_key=True)
+    character = Column(String(1), primary_key=True)
+    practice_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    average_score = Column(Float, nullable=False, default=0.0)
+    best_score = Column(Integer, nullable=False, default=0)
+    last_practiced_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # 按字符排行榜：character 等值 + (average_score, practice_count, user_id) 有序扫描
+        Index(
+            "ix_user_character_rollup_character_ranking",
+            "character", "average_score", "practice_count", "user_id",
+        ),
+    )
+
+
+class DailyUserStatsDB(Base):
+    """用户每日按模式汇总表（/analytics 读取，行数约为 天数 × 模式数）"""
+    __tablename__ = "daily_user_stats"
+
+    user_id = Column(String(100), primary_key=True)
+    date = Column(Date, primary_key=True)
+    mode = Column(String(20), primary_key=True)
+    practice_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+
+    # 评分等级分布
+    excellent_count = Column(Integer, nullable=False, default=0)
+    good_count = Column(Integer, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+    fail_count = Column(Integer, nullable=False, default=0)
+
+
+# 支持 INSERT ... ON CONFLICT DO NOTHING 的方言
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# 评分等级 -> DailyUserStatsDB 计数列
+LEVEL_COLUMNS = {level.value: f"{level.value}_count" for level in ScoreLevel}
+
+
+def _to_utc_naive(value: datetime) -> datetime:
+    """带时区的时间转换为 UTC（created_at 以不带时区的 UTC 存储）"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 class UserProgressCRUD:
     """用户进度 CRUD 操作"""
 
     @staticmethod
-    def create_practice_record(db: Session, obj_in: PracticeRecordCreate) -> PracticeRecordDB:
-        """创建练习记录"""
+    def create_practice_record(
+        db: Session, obj_in: PracticeRecordCreate, publish: bool = True
+    ) -> PracticeRecordDB:
+        """
+        创建练习记录
+
+        记录、汇总表、每日分桶和目标进度在同一事务中更新，只提交一次。
+
+        Args:
+            publish: 提交后同步写入排行榜（异步调用方传 False，自行 publish_async）
+        """
         # 计算评分等级
         score_level = UserProgressCRUD._calculate_score_level(obj_in.total_score)
 
@@ -81,12 +203,469 @@ class UserProgressCRUD:
             time_spent=obj_in.time_spent,
             stroke_count=obj_in.stroke_count,
             score_level=score_level.value,
+            created_at=datetime.utcnow(),
         )
         db.add(db_obj)
+        UserProgressCRUD._apply_to_rollup(db, db_obj.user_id, [db_obj])
+        UserProgressCRUD._apply_goal_increments(
+            db, db_obj.user_id, UserProgressCRUD._goal_increments([db_obj])
+        )
         db.commit()
         db.refresh(db_obj)
+
+        if publish:
+            from ..models.leaderboard import get_leaderboard
+            get_leaderboard().publish(db, db_obj.user_id, db_obj.character)
         return db_obj
 
+    @staticmethod
+    def _apply_to_rollup(db: Session, user_id: str, records: List[PracticeRecordDB]) -> None:
+        """把同一用户的一批新记录累加进用户汇总、字符汇总和每日分桶（调用方负责提交）"""
+        rollup = db.get(UserProgressRollupDB, user_id, with_for_update=True)
+        if rollup is None:
+            db.flush()
+            created = UserProgressCRUD._insert_rollup_if_missing(db, user_id)
+            rollup = db.get(UserProgressRollupDB, user_id, with_for_update=True, populate_existing=True)
+            if created:
+                # 首次练习，或汇总表上线前已有历史：从记录重建（含本批）
+                UserProgressCRUD.rebuild_rollup(db, user_id)
+                return
+            # 并发的首次练习先插入了汇总行（其重建不含本批）：按增量累加
+
+        records = sorted(records, key=lambda r: r.created_at)
+        dates = sorted({r.created_at.date() for r in records})
+        backdated = rollup.last_practice_date is not None and dates[0] < rollup.last_practice_date
+
+        for record in records:
+            rollup.total_practices += 1
+            rollup.score_sum += record.total_score
+            rollup.best_score = max(rollup.best_score, record.total_score)
+            rollup.total_time_spent += record.time_spent
+            if record.posture_score is not None:
+                rollup.posture_score_sum += record.posture_score
+                rollup.posture_count += 1
+            if record.grip_correct is not None:
+                rollup.grip_correct_count += int(record.grip_correct)
+                rollup.grip_count += 1
+        rollup.average_score = rollup.score_sum / rollup.total_practices
+
+        if backdated:
+            # 补录更早的记录（离线同步）：最近得分与连续天数按记录重算
+            db.flush()
+            rollup.recent_scores = UserProgressCRUD._recent_scores(db, user_id)
+            UserProgressCRUD._apply_streak(rollup, UserProgressCRUD._practice_dates(db, user_id))
+        else:
+            new_scores = [r.total_score for r in reversed(records)]
+            rollup.recent_scores = (new_scores + list(rollup.recent_scores))[:RECENT_SCORES_SIZE]
+            for practice_date in dates:
+                UserProgressCRUD._advance_streak(db, rollup, practice_date)
+
+        characters = sorted({r.character for r in records})
+        char_rollups = {
+            c.character: c
+            for c in db.query(UserCharacterRollupDB).filter(
+                UserCharacterRollupDB.user_id == user_id,
+                UserCharacterRollupDB.character.in_(characters),
+            ).with_for_update()
+        }
+        for record in records:
+            char_rollup = char_rollups.get(record.character)
+            if char_rollup is None:
+                char_rollup = char_rollups[record.character] = UserCharacterRollupDB(
+                    user_id=user_id,
+                    character=record.character,
+                    practice_count=0,
+                    score_sum=0,
+                    best_score=0,
+                )
+                rollup.characters.append(char_rollup)
+                rollup.unique_characters += 1
+
+            char_rollup.practice_count += 1
+            char_rollup.score_sum += record.total_score
+            char_rollup.best_score = max(char_rollup.best_score, record.total_score)
+            if char_rollup.last_practiced_at is None or record.created_at > char_rollup.last_practiced_at:
+                char_rollup.last_practiced_at = record.created_at
+        for char_rollup in char_rollups.values():
+            char_rollup.average_score = char_rollup.score_sum / char_rollup.practice_count
+
+        UserProgressCRUD._apply_to_daily_stats(db, user_id, records)
+
+    @staticmethod
+    def _insert_rollup_if_missing(db: Session, user_id: str) -> bool:
+        """
+        插入空的用户汇总行，已存在时不动（INSERT ... ON CONFLICT DO NOTHING）
+
+        两个并发的首次练习只有一个能插入；另一个等待其提交后改为增量更新，
+        不会因主键冲突丢失练习记录。
+
+        Returns:
+            是否由本事务插入
+        """
+        dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if dialect_insert is None:
+            # 其他数据库：普通插入（并发首次练习仍可能主键冲突）
+            db.add(UserProgressRollupDB(user_id=user_id))
+            db.flush()
+            return True
+
+        result = db.execute(
+            dialect_insert(UserProgressRollupDB).values(user_id=user_id).on_conflict_do_nothing(
+                index_elements=[UserProgressRollupDB.user_id]
+            )
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def _apply_to_daily_stats(db: Session, user_id: str, records: List[PracticeRecordDB]) -> None:
+        """把同一用户的一批新记录累加进对应日期、模式的分桶"""
+        keys = sorted({(r.created_at.date(), r.mode) for r in records})
+        buckets = {
+            (b.date, b.mode): b
+            for b in db.query(DailyUserStatsDB).filter(
+                DailyUserStatsDB.user_id == user_id,
+                tuple_(DailyUserStatsDB.date, DailyUserStatsDB.mode).in_(keys),
+            ).with_for_update()
+        }
+        for record in records:
+            key = (record.created_at.date(), record.mode)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = DailyUserStatsDB(
+                    user_id=user_id, date=key[0], mode=key[1],
+                    practice_count=0, score_sum=0,
+                    excellent_count=0, good_count=0, pass_count=0, fail_count=0,
+                )
+                db.add(bucket)
+
+            bucket.practice_count += 1
+            bucket.score_sum += record.total_score
+            column = LEVEL_COLUMNS[record.score_level]
+            setattr(bucket, column, getattr(bucket, column) + 1)
+
+    @staticmethod
+    def sync_practice_records(
+        db: Session, items: List[PracticeRecordSyncItem], publish: bool = True
+    ) -> List[PracticeRecordSyncStatus]:
+        """
+        批量写入离线练习记录（幂等）
+
+        以 (user_id, client_record_id) 去重：已同步过的记录直接返回原 ID。
+        新记录在一个事务内多行插入，汇总表、每日分桶和目标进度按用户合并更新。
+
+        Args:
+            publish: 提交后同步写入排行榜（异步调用方传 False，自行 publish_async）
+
+        Returns:
+            各记录的同步结果（与 items 顺序一致）
+        """
+        try:
+            return UserProgressCRUD._sync_practice_records(db, items, publish)
+        except IntegrityError:
+            # 并发的同一批重试先提交了：回滚后重新判重
+            db.rollback()
+            return UserProgressCRUD._sync_practice_records(db, items, publish)
+
+    @staticmethod
+    def _sync_practice_records(
+        db: Session, items: List[PracticeRecordSyncItem], publish: bool
+    ) -> List[PracticeRecordSyncStatus]:
+        keys = list(dict.fromkeys((item.user_id, item.client_record_id) for item in items))
+        existing = dict(
+            ((user_id, client_id), record_id)
+            for user_id, client_id, record_id in db.query(
+                PracticeRecordDB.user_id,
+                PracticeRecordDB.client_record_id,
+                PracticeRecordDB.id,
+            ).filter(
+                tuple_(PracticeRecordDB.user_id, PracticeRecordDB.client_record_id).in_(keys)
+            )
+        )
+
+        now = datetime.utcnow()
+        new_rows: Dict[Tuple[str, str], Dict] = {}
+        for item in items:
+            key = (item.user_id, item.client_record_id)
+            if key in existing or key in new_rows:
+                continue
+            new_rows[key] = dict(
+                user_id=item.user_id,
+                character=item.character,
+                character_type=item.character_type,
+                custom_character_id=item.custom_character_id,
+                mode=item.mode.value,
+                total_score=item.total_score,
+                stroke_scores=item.stroke_scores,
+                stroke_order_correct=item.stroke_order_correct,
+                posture_score=item.posture_score,
+                grip_correct=item.grip_correct,
+                time_spent=item.time_spent,
+                stroke_count=item.stroke_count,
+                score_level=UserProgressCRUD._calculate_score_level(item.total_score).value,
+                client_record_id=item.client_record_id,
+                created_at=_to_utc_naive(item.practiced_at) if item.practiced_at else now,
+            )
+
+        new_ids: Dict[Tuple[str, str], int] = {}
+        if new_rows:
+            # Core executemany：一条多行 INSERT（psycopg2 为 execute_values），不逐行取回 ID
+            db.execute(insert(PracticeRecordDB), list(new_rows.values()))
+            new_ids = dict(
+                ((user_id, client_id), record_id)
+                for user_id, client_id, record_id in db.query(
+                    PracticeRecordDB.user_id,
+                    PracticeRecordDB.client_record_id,
+                    PracticeRecordDB.id,
+                ).filter(
+                    tuple_(PracticeRecordDB.user_id, PracticeRecordDB.client_record_id).in_(list(new_rows))
+                )
+            )
+
+            # 汇总只读取记录字段，用未加入会话的临时对象承载
+            by_user: Dict[str, List[PracticeRecordDB]] = defaultdict(list)
+            for row in new_rows.values():
+                by_user[row["user_id"]].append(PracticeRecordDB(**row))
+            for user_id, records in by_user.items():
+                UserProgressCRUD._apply_to_rollup(db, user_id, records)
+                UserProgressCRUD._apply_goal_increments(
+                    db, user_id, UserProgressCRUD._goal_increments(records)
+                )
+            db.commit()
+
+            if publish:
+                from ..models.leaderboard import get_leaderboard
+                leaderboard = get_leaderboard()
+                for user_id, character in sorted({(r["user_id"], r["character"]) for r in new_rows.values()}):
+                    leaderboard.publish(db, user_id, character)
+
+        results = []
+        seen = set()
+        for item in items:
+            key = (item.user_id, item.client_record_id)
+            results.append(PracticeRecordSyncStatus(
+                client_record_id=item.client_record_id,
+                id=existing[key] if key in existing else new_ids[key],
+                duplicate=key in existing or key in seen,
+            ))
+            seen.add(key)
+        return results
+
+    @staticmethod
+    def _goal_increments(records: List[PracticeRecordDB]) -> Dict[str, float]:
+        """基础模式记录对各类目标的进度增量"""
+        basic = [r for r in records if r.mode == "basic"]
+        if not basic:
+            return {}
+        return {
+            "daily_score": float(sum(r.total_score for r in basic)),
+            "character_count": float(len(basic)),
+            "time_spent": sum(r.time_spent for r in basic) / 60,  # 分钟
+        }
+
+    @staticmethod
+    def _apply_goal_increments(db: Session, user_id: str, increments: Dict[str, float]) -> None:
+        """一次查询更新用户多类未达成目标的进度（调用方负责提交）"""
+        if not increments:
+            return
+        goals = db.query(PracticeGoalDB).filter(
+            PracticeGoalDB.user_id == user_id,
+            PracticeGoalDB.goal_type.in_(list(increments)),
+            PracticeGoalDB.achieved == False,
+        ).all()
+
+        for goal in goals:
+            goal.current_value += increments[goal.goal_type]
+            if goal.current_value >= goal.target_value:
+                goal.achieved = True
+
+    @staticmethod
+    def _advance_streak(db: Session, rollup: UserProgressRollupDB, practice_date: date) -> None:
+        """O(1) 更新连续练习状态；补录更早日期的记录时才回退到按日期重算"""
+        last = rollup.last_practice_date
+        if last is None or practice_date > last:
+            if last is not None and practice_date == last + timedelta(days=1):
+                rollup.current_streak += 1
+            else:
+                rollup.current_streak = 1
+            rollup.last_practice_date = practice_date
+            rollup.longest_streak = max(rollup.longest_streak, rollup.current_streak)
+        elif practice_date < last:
+            db.flush()
+            UserProgressCRUD._apply_streak(
+                rollup, UserProgressCRUD._practice_dates(db, rollup.user_id)
+            )
+
+    @staticmethod
+    def _practice_dates(db: Session, user_id: str) -> List[date]:
+        """用户所有练习日期（去重，新的在前）"""
+        rows = db.query(func.date(PracticeRecordDB.created_at)).filter(
+            PracticeRecordDB.user_id == user_id
+        ).distinct().order_by(
+            func.date(PracticeRecordDB.created_at).desc()
+        ).all()
+        # SQLite 的 date() 返回字符串
+        return [d if isinstance(d, date) else date.fromisoformat(d) for (d,) in rows]
+
+    @staticmethod
+    def _apply_streak(rollup: UserProgressRollupDB, dates: List[date]) -> None:
+        """由去重日期（新的在前）计算截至最后练习日的当前/最长连续天数"""
+        if not dates:
+            rollup.current_streak = 0
+            rollup.longest_streak = 0
+            rollup.last_practice_date = None
+            return
+
+        current_streak = 1
+        while current_streak < len(dates) and \
+                (dates[current_streak - 1] - dates[current_streak]).days == 1:
+            current_streak += 1
+
+        longest_streak = 1
+        temp_streak = 1
+        for i in range(1, len(dates)):
+            if (dates[i - 1] - dates[i]).days == 1:
+                temp_streak += 1
+                longest_streak = max(longest_streak, temp_streak)
+            else:
+                temp_streak = 1
+
+        rollup.current_streak = current_streak
+        rollup.longest_streak = longest_streak
+        rollup.last_practice_date = dates[0]
+
+    @staticmethod
+    def _backfill_legacy_rollup(db: Session, user_id: str) -> Optional[UserProgressRollupDB]:
+        """
+        读取时发现没有汇总行：只有存在历史记录（汇总表上线前写入）才回填并提交
+
+        没有任何记录的用户只做一次 EXISTS（走 (user_id, created_at) 索引），
+        不在读请求里执行 rebuild_rollup 的聚合扫描和分桶重写。
+        """
+        has_records = db.query(
+            exists().where(PracticeRecordDB.user_id == user_id)
+        ).scalar()
+        if not has_records:
+            return None
+
+        rollup = UserProgressCRUD.rebuild_rollup(db, user_id)
+        db.commit()
+        return rollup
+
+    @staticmethod
+    def rebuild_rollup(db: Session, user_id: str) -> Optional[UserProgressRollupDB]:
+        """从练习记录重建用户汇总（回填/校正用，调用方负责提交）"""
+        stats = db.query(
+            func.count(PracticeRecordDB.id).label("count"),
+            func.sum(PracticeRecordDB.total_score).label("score_sum"),
+            func.max(PracticeRecordDB.total_score).label("max_score"),
+            func.sum(PracticeRecordDB.time_spent).label("total_time"),
+            func.sum(PracticeRecordDB.posture_score).label("posture_sum"),
+            func.count(PracticeRecordDB.posture_score).label("posture_count"),
+            func.sum(func.cast(PracticeRecordDB.grip_correct, Integer)).label("grip_correct"),
+            func.count(PracticeRecordDB.grip_correct).label("grip_count"),
+        ).filter(PracticeRecordDB.user_id == user_id).one()
+
+        rollup = db.get(UserProgressRollupDB, user_id)
+        UserProgressCRUD._rebuild_daily_stats(db, user_id)
+        if not stats.count:
+            if rollup is not None:
+                db.delete(rollup)
+            return None
+
+        char_stats = db.query(
+            PracticeRecordDB.character,
+            func.count(PracticeRecordDB.id),
+            func.sum(PracticeRecordDB.total_score),
+            func.max(PracticeRecordDB.total_score),
+            func.max(PracticeRecordDB.created_at),
+        ).filter(PracticeRecordDB.user_id == user_id).group_by(
+            PracticeRecordDB.character
+        ).all()
+
+        if rollup is None:
+            rollup = UserProgressRollupDB(user_id=user_id)
+            db.add(rollup)
+
+        rollup.total_practices = stats.count
+        rollup.score_sum = int(stats.score_sum or 0)
+        rollup.average_score = rollup.score_sum / rollup.total_practices
+        rollup.best_score = int(stats.max_score or 0)
+        rollup.total_time_spent = float(stats.total_time or 0)
+        rollup.posture_score_sum = int(stats.posture_sum or 0)
+        rollup.posture_count = stats.posture_count
+        rollup.grip_correct_count = int(stats.grip_correct or 0)
+        rollup.grip_count = stats.grip_count
+        rollup.unique_characters = len(char_stats)
+        rollup.recent_scores = UserProgressCRUD._recent_scores(db, user_id)
+        UserProgressCRUD._apply_streak(rollup, UserProgressCRUD._practice_dates(db, user_id))
+        rollup.characters = [
+            UserCharacterRollupDB(
+                user_id=user_id,
+                character=char,
+                practice_count=count,
+                score_sum=int(score_sum),
+                average_score=int(score_sum) / count,
+                best_score=int(best_score),
+                last_practiced_at=last_practiced_at,
+            )
+            for char, count, score_sum, best_score, last_practiced_at in char_stats
+        ]
+        return rollup
+
+    @staticmethod
+    def _recent_scores(db: Session, user_id: str) -> List[int]:
+        """用户最近 RECENT_SCORES_SIZE 次得分（新的在前）"""
+        rows = db.query(PracticeRecordDB.total_score).filter(
+            PracticeRecordDB.user_id == user_id
+        ).order_by(
+            PracticeRecordDB.created_at.desc(), PracticeRecordDB.id.desc()
+        ).limit(RECENT_SCORES_SIZE).all()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _rebuild_daily_stats(db: Session, user_id: str) -> None:
+        """从练习记录重建用户的每日分桶"""
+        db.query(DailyUserStatsDB).filter(
+            DailyUserStatsDB.user_id == user_id
+        ).delete(synchronize_session="fetch")
+
+        day = func.date(PracticeRecordDB.created_at)
+        rows = db.query(
+            day,
+            PracticeRecordDB.mode,
+            PracticeRecordDB.score_level,
+            func.count(PracticeRecordDB.id),
+            func.sum(PracticeRecordDB.total_score),
+        ).filter(PracticeRecordDB.user_id == user_id).group_by(
+            day, PracticeRecordDB.mode, PracticeRecordDB.score_level
+        ).all()
+
+        buckets: Dict[tuple, DailyUserStatsDB] = {}
+        for practice_date, mode, level, count, score_sum in rows:
+            # SQLite 的 date() 返回字符串
+            if not isinstance(practice_date, date):
+                practice_date = date.fromisoformat(practice_date)
+            bucket = buckets.get((practice_date, mode))
+            if bucket is None:
+                bucket = buckets[(practice_date, mode)] = DailyUserStatsDB(
+                    user_id=user_id, date=practice_date, mode=mode,
+                    practice_count=0, score_sum=0,
+                    excellent_count=0, good_count=0, pass_count=0, fail_count=0,
+                )
+            bucket.practice_count += count
+            bucket.score_sum += int(score_sum)
+            setattr(bucket, LEVEL_COLUMNS[level], count)
+        db.add_all(buckets.values())
+
+    @staticmethod
+    def backfill_rollups(db: Session) -> int:
+        """为所有有练习记录的用户重建汇总表，返回处理的用户数"""
+        user_ids = [row[0] for row in db.query(PracticeRecordDB.user_id).distinct().all()]
+        for user_id in user_ids:
+            UserProgressCRUD.rebuild_rollup(db, user_id)
+        db.commit()
+        return len(user_ids)
+
     @staticmethod
     def _calculate_score_level(score: int) -> ScoreLevel:
         """计算评分等级"""
@@ -106,10 +685,25 @@ class UserProgressCRUD:
         character: Optional[str] = None,
         mode: Optional[str] = None,
         days: Optional[int] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100,
-    ) -> tuple[List[PracticeRecordDB], int]:
-        """获取用户练习记录"""
+        skip: int = 0,
+        include_total: bool = False,
+    ) -> tuple[List[PracticeRecordDB], Optional[int], Optional[str]]:
+        """
+        获取用户练习记录（按 created_at, id 降序，游标分页）
+
+        Args:
+            cursor: 上一页返回的游标（优先于 skip）
+            skip: 旧版 OFFSET 分页，仅在未提供游标时使用
+            include_total: 是否额外执行 count()
+
+        Returns:
+            (记录, 总数或 None, 下一页游标或 None)
+
+        Raises:
+            ValueError: 游标格式无效
+        """
         query = db.query(PracticeRecordDB).filter(PracticeRecordDB.user_id == user_id)
 
         if character:
@@ -120,20 +714,27 @@ class UserProgressCRUD:
             since = datetime.utcnow() - timedelta(days=days)
             query = query.filter(PracticeRecordDB.created_at >= since)
 
-        total = query.count()
-        items = query.order_by(PracticeRecordDB.created_at.desc()).offset(skip).limit(limit).all()
+        total = query.count() if include_total else None
+        items, next_cursor = paginate_keyset(
+            query, PracticeRecordDB.created_at, PracticeRecordDB.id, cursor, limit, offset=skip
+        )
 
-        return items, total
+        return items, total, next_cursor
 
     @staticmethod
     def get_progress_summary(db: Session, user_id: str) -> Dict:
-        """获取用户进度汇总"""
-        # 总练习次数
-        total_practices = db.query(PracticeRecordDB).filter(
-            PracticeRecordDB.user_id == user_id
-        ).count()
+        """获取用户进度汇总（按主键读取汇总表，与历史记录条数无关）"""
+        rollup = db.get(
+            UserProgressRollupDB,
+            user_id,
+            options=[joinedload(UserProgressRollupDB.characters)],
+        )
+
+        if rollup is None:
+            # 汇总表上线前的历史数据：首次读取时回填
+            rollup = UserProgressCRUD._backfill_legacy_rollup(db, user_id)
 
-        if total_practices == 0:
+        if rollup is None:
             return {
                 "user_id": user_id,
                 "total_practices": 0,
@@ -147,68 +748,40 @@ class UserProgressCRUD:
                 "grip_correct_rate": None,
             }
 
-        # 统计数据
-        from sqlalchemy import func
-
-        stats = db.query(
-            func.avg(PracticeRecordDB.total_score).label("avg_score"),
-            func.max(PracticeRecordDB.total_score).label("max_score"),
-            func.sum(PracticeRecordDB.time_spent).label("total_time"),
-            func.avg(PracticeRecordDB.posture_score).label("avg_posture"),
-            func.avg(
-                func.cast(PracticeRecordDB.grip_correct, Integer)
-            ).label("avg_grip"),
-        ).filter(PracticeRecordDB.user_id == user_id).first()
-
-        # 不同字符数
-        unique_characters = db.query(PracticeRecordDB.character).filter(
-            PracticeRecordDB.user_id == user_id
-        ).distinct().count()
-
-        # 最近 10 次得分
-        recent_records = db.query(PracticeRecordDB.total_score).filter(
-            PracticeRecordDB.user_id == user_id
-        ).order_by(PracticeRecordDB.created_at.desc()).limit(10).all()
-        recent_scores = [r[0] for r in recent_records]
-
-        # 按字符统计
-        char_stats = db.query(
-            PracticeRecordDB.character,
-            func.count(PracticeRecordDB.id).label("count"),
-            func.avg(PracticeRecordDB.total_score).label("avg_score"),
-        ).filter(PracticeRecordDB.user_id == user_id).group_by(
-            PracticeRecordDB.character
-        ).all()
-
         character_stats = {
-            char: {"count": count, "average_score": float(avg_score)}
-            for char, count, avg_score in char_stats
+            c.character: {
+                "count": c.practice_count,
+                "average_score": c.score_sum / c.practice_count,
+            }
+            for c in rollup.characters
         }
 
         return {
             "user_id": user_id,
-            "total_practices": total_practices,
-            "unique_characters": unique_characters,
-            "average_score": float(stats.avg_score or 0),
-            "best_score": int(stats.max_score or 0),
-            "total_time_spent": float(stats.total_time or 0) / 3600,  # 转换为小时
-            "recent_scores": recent_scores,
+            "total_practices": rollup.total_practices,
+            "unique_characters": rollup.unique_characters,
+            "average_score": rollup.score_sum / rollup.total_practices,
+            "best_score": rollup.best_score,
+            "total_time_spent": rollup.total_time_spent / 3600,  # 转换为小时
+            "recent_scores": list(rollup.recent_scores),
             "character_stats": character_stats,
-            "posture_avg_score": float(stats.avg_posture) if stats.avg_posture else None,
-            "grip_correct_rate": float(stats.avg_grip) * 100 if stats.avg_grip else None,
+            "posture_avg_score": (
+                rollup.posture_score_sum / rollup.posture_count if rollup.posture_count else None
+            ),
+            "grip_correct_rate": (
+                rollup.grip_correct_count / rollup.grip_count * 100 if rollup.grip_count else None
+            ),
         }
 
     @staticmethod
     def get_streak(db: Session, user_id: str) -> Dict:
-        """获取连续练习天数"""
-        # 获取练习日期
-        dates = db.query(func.date(PracticeRecordDB.created_at)).filter(
-            PracticeRecordDB.user_id == user_id
-        ).distinct().order_by(
-            func.date(PracticeRecordDB.created_at).desc()
-        ).all()
+        """获取连续练习天数（读取汇总表中的连续练习状态）"""
+        rollup = db.get(UserProgressRollupDB, user_id)
+        if rollup is None:
+            # 汇总表上线前的历史数据：首次读取时回填
+            rollup = UserProgressCRUD._backfill_legacy_rollup(db, user_id)
 
-        if not dates:
+        if rollup is None or rollup.last_practice_date is None:
             return {
                 "user_id": user_id,
                 "current_streak": 0,
@@ -216,39 +789,91 @@ class UserProgressCRUD:
                 "last_practice_date": None,
             }
 
-        dates = [d[0] for d in dates]
-        last_practice_date = dates[0]
-
-        # 计算当前连续天数
-        current_streak = 0
-        check_date = datetime.utcnow().date()
-
-        for i, date in enumerate(dates):
-            if date == check_date - timedelta(days=i):
-                current_streak += 1
-            else:
-                break
-
-        # 计算最长连续天数
-        longest_streak = 1
-        temp_streak = 1
-
-        for i in range(1, len(dates)):
-            if (dates[i - 1] - dates[i]).days == 1:
-                temp_streak += 1
-            else:
-                longest_streak = max(longest_streak, temp_streak)
-                temp_streak = 1
-
-        longest_streak = max(longest_streak, temp_streak, current_streak)
+        # 当前连续天数只计到今天：今天还没练习则为 0
+        today = datetime.utcnow().date()
+        current_streak = rollup.current_streak if rollup.last_practice_date == today else 0
 
         return {
             "user_id": user_id,
             "current_streak": current_streak,
-            "longest_streak": longest_streak,
-            "last_practice_date": last_practice_date,
+            "longest_streak": max(rollup.longest_streak, current_streak),
+            "last_practice_date": rollup.last_practice_date,
         }
 
+    @staticmethod
+    def get_analytics(db: Session, user_id: str, days: int = ANALYTICS_TREND_DAYS) -> Dict:
+        """获取用户分析数据（模式统计、等级分布、最近 days 天（含今天）的每日趋势），读取每日分桶"""
+        mode_totals = UserProgressCRUD._mode_totals(db, user_id)
+        if not mode_totals and UserProgressCRUD._backfill_legacy_rollup(db, user_id) is not None:
+            # 分桶表上线前的历史数据：首次读取时回填
+            mode_totals = UserProgressCRUD._mode_totals(db, user_id)
+
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        daily_trends = db.query(
+            DailyUserStatsDB.date,
+            func.sum(DailyUserStatsDB.practice_count),
+            func.sum(DailyUserStatsDB.score_sum),
+        ).filter(
+            DailyUserStatsDB.user_id == user_id,
+            DailyUserStatsDB.date >= since,
+        ).group_by(DailyUserStatsDB.date).order_by(DailyUserStatsDB.date).all()
+
+        level_counts = {level: 0 for level in LEVEL_COLUMNS}
+        for row in mode_totals:
+            for level in LEVEL_COLUMNS:
+                level_counts[level] += int(getattr(row, level))
+
+        return {
+            "mode_statistics": [
+                {
+                    "mode": row.mode,
+                    "count": int(row.count),
+                    "average_score": float(row.score_sum) / row.count,
+                }
+                for row in mode_totals
+            ],
+            "level_distribution": [
+                {
+                    "level": level,
+                    "count": count,
+                }
+                for level, count in level_counts.items() if count
+            ],
+            "daily_trends": [
+                {
+                    "date": day.isoformat(),
+                    "count": int(count),
+                    "average_score": float(score_sum) / count,
+                }
+                for day, count, score_sum in daily_trends
+            ],
+        }
+
+    @staticmethod
+    def _mode_totals(db: Session, user_id: str) -> list:
+        """按模式汇总分桶（每行含次数、总分与各等级次数）"""
+        return db.query(
+            DailyUserStatsDB.mode.label("mode"),
+            func.sum(DailyUserStatsDB.practice_count).label("count"),
+            func.sum(DailyUserStatsDB.score_sum).label("score_sum"),
+            *[
+                func.sum(getattr(DailyUserStatsDB, column)).label(level)
+                for level, column in LEVEL_COLUMNS.items()
+            ],
+        ).filter(DailyUserStatsDB.user_id == user_id).group_by(
+            DailyUserStatsDB.mode
+        ).order_by(DailyUserStatsDB.mode).all()
+
+    @staticmethod
+    def get_most_practiced_characters(db: Session, limit: int = 20) -> List[str]:
+        """获取练习次数最多的字符（全体用户）"""
+        rows = db.query(PracticeRecordDB.character).group_by(
+            PracticeRecordDB.character
+        ).order_by(
+            func.count(PracticeRecordDB.id).desc()
+        ).limit(limit).all()
+        return [row[0] for row in rows]
+
     @staticmethod
     def create_goal(db: Session, obj_in: PracticeGoalCreate) -> PracticeGoalDB:
         """创建练习目标"""
@@ -263,18 +888,93 @@ class UserProgressCRUD:
         db.refresh(db_obj)
         return db_obj
 
+    @staticmethod
+    def get_goals(db: Session, user_id: str, achieved_only: bool = False) -> List[PracticeGoalDB]:
+        """获取用户目标（新的在前）"""
+        query = db.query(PracticeGoalDB).filter(PracticeGoalDB.user_id == user_id)
+        if achieved_only:
+            query = query.filter(PracticeGoalDB.achieved == True)
+        return query.order_by(PracticeGoalDB.created_at.desc()).all()
+
     @staticmethod
     def update_goal_progress(db: Session, user_id: str, goal_type: str, increment: float):
         """更新目标进度"""
-        goals = db.query(PracticeGoalDB).filter(
-            PracticeGoalDB.user_id == user_id,
-            PracticeGoalDB.goal_type == goal_type,
-            PracticeGoalDB.achieved == False,
-        ).all()
+        UserProgressCRUD._apply_goal_increments(db, user_id, {goal_type: increment})
+        db.commit()
 
-        for goal in goals:
-            goal.current_value += increment
-            if goal.current_value >= goal.target_value:
-                goal.achieved = True
 
-        db.commit()
+class AsyncUserProgressCRUD:
+    """
+    用户进度异步 CRUD
+
+    通过 AsyncSession.run_sync 复用 UserProgressCRUD 的实现（汇总表、分桶、目标
+    在同一事务中更新的逻辑只有一份）；run_sync 在 greenlet 中执行，数据库 IO
+    由异步驱动完成，不占用线程池线程。
+    """
+
+    @staticmethod
+    async def create_practice_record(db: AsyncSession, obj_in: PracticeRecordCreate) -> PracticeRecordDB:
+        """创建练习记录（提交后经 publish_async 写排行榜，Redis 调用不阻塞事件循环）"""
+        from ..models.leaderboard import get_leaderboard
+
+        db_obj = await db.run_sync(UserProgressCRUD.create_practice_record, obj_in, False)
+        await get_leaderboard().publish_async(db, [(db_obj.user_id, db_obj.character)])
+        return db_obj
+
+    @staticmethod
+    async def sync_practice_records(
+        db: AsyncSession, items: List[PracticeRecordSyncItem]
+    ) -> List[PracticeRecordSyncStatus]:
+        """批量写入离线练习记录（幂等；排行榜同 create_practice_record）"""
+        from ..models.leaderboard import get_leaderboard
+
+        results = await db.run_sync(UserProgressCRUD.sync_practice_records, items, False)
+        created = sorted({
+            (item.user_id, item.character)
+            for item, result in zip(items, results)
+            if not result.duplicate
+        })
+        await get_leaderboard().publish_async(db, created)
+        return results
+
+    @staticmethod
+    async def get_user_records(
+        db: AsyncSession, user_id: str, **kwargs
+    ) -> tuple[List[PracticeRecordDB], Optional[int], Optional[str]]:
+        """获取用户练习记录（参数同 UserProgressCRUD.get_user_records）"""
+        return await db.run_sync(UserProgressCRUD.get_user_records, user_id, **kwargs)
+
+    @staticmethod
+    async def get_progress_summary(db: AsyncSession, user_id: str) -> Dict:
+        """获取用户进度汇总"""
+        return await db.run_sync(UserProgressCRUD.get_progress_summary, user_id)
+
+    @staticmethod
+    async def get_streak(db: AsyncSession, user_id: str) -> Dict:
+        """获取连续练习天数"""
+        return await db.run_sync(UserProgressCRUD.get_streak, user_id)
+
+    @staticmethod
+    async def get_analytics(db: AsyncSession, user_id: str, days: int = ANALYTICS_TREND_DAYS) -> Dict:
+        """获取用户分析数据"""
+        return await db.run_sync(UserProgressCRUD.get_analytics, user_id, days)
+
+    @staticmethod
+    async def get_most_practiced_characters(db: AsyncSession, limit: int = 20) -> List[str]:
+        """获取练习次数最多的字符"""
+        return await db.run_sync(UserProgressCRUD.get_most_practiced_characters, limit)
+
+    @staticmethod
+    async def create_goal(db: AsyncSession, obj_in: PracticeGoalCreate) -> PracticeGoalDB:
+        """创建练习目标"""
+        return await db.run_sync(UserProgressCRUD.create_goal, obj_in)
+
+    @staticmethod
+    async def get_goals(db: AsyncSession, user_id: str, achieved_only: bool = False) -> List[PracticeGoalDB]:
+        """获取用户目标"""
+        return await db.run_sync(UserProgressCRUD.get_goals, user_id, achieved_only)
+
+    @staticmethod
+    async def update_goal_progress(db: AsyncSession, user_id: str, goal_type: str, increment: float):
+        """更新目标进度"""
+        await db.run_sync(UserProgressCRUD.update_goal_progress, user_id, goal_type, increment)
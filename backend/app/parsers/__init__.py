@@ -5,5 +5,6 @@ Exports data loading utilities for external data sources.
 """
 
 from app.parsers.hanzi_writer import HanziWriterLoader
+from app.parsers.character_cache import CharacterCache, LRUCache, get_character_cache
 
-__all__ = ["HanziWriterLoader"]
+__all__ = ["HanziWriterLoader", "CharacterCache", "LRUCache", "get_character_cache"]
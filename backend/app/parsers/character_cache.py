@@ -0,0 +1,269 @@
+"""
+Character Template Cache - 汉字模板缓存
+
+Two-tier cache for Hanzi Writer character templates:
+- L1: in-process LRU (per uvicorn worker)
+- L2: optional shared Redis tier (across workers and backend replicas)
+
+Templates are stored in Redis in the compact Hanzi Writer 1024-grid format
+(JSON + zlib), so one CDN fetch serves every worker in the deployment.
+Configured via REDIS_URL (see deployment/docker-compose.yml).
+"""
+
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.models.character import CharacterData
+
+# Redis import (optional shared tier)
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_SIZE = 512
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache.
+
+    Bounded by entry count; least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_LOCAL_SIZE):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Maximum number of entries (must be >= 1)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached value (marking it recently used) or None"""
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh a value, evicting the oldest entry if full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+def serialize_character(character: CharacterData) -> bytes:
+    """
+    Serialize character template to compact bytes.
+
+    Uses the Hanzi Writer 1024-grid format (integers instead of floats)
+    encoded as minified JSON and zlib-compressed.
+
+    Args:
+        character: Character data to serialize
+
+    Returns:
+        Compressed payload
+    """
+    payload = json.dumps(
+        character.to_hanzi_writer_format(),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return zlib.compress(payload.encode("utf-8"))
+
+
+def deserialize_character(payload: bytes) -> CharacterData:
+    """
+    Deserialize bytes produced by serialize_character.
+
+    Args:
+        payload: Compressed payload
+
+    Returns:
+        CharacterData with normalized coordinates
+
+    Raises:
+        ValueError: If payload is corrupt or invalid
+    """
+    try:
+        data = json.loads(zlib.decompress(payload).decode("utf-8"))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cached character payload: {e}")
+
+    return CharacterData.from_hanzi_writer(data)
+
+
+class CharacterCache:
+    """
+    Two-tier character template cache (local LRU + optional Redis).
+
+    Redis failures never fail a request: they are logged and treated as
+    cache misses so the loader falls back to the CDN.
+    """
+
+    KEY_PREFIX = "smartpen:character:v1:"
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        local_size: int = DEFAULT_LOCAL_SIZE,
+        ttl: Optional[int] = DEFAULT_TTL_SECONDS,
+    ):
+        """
+        Initialize cache
+
+        Args:
+            redis_client: redis.asyncio client (or compatible fake); None for local-only
+            local_size: Maximum number of templates kept in process
+            ttl: Redis expiry in seconds (None = no expiry)
+        """
+        self.redis = redis_client
+        self.ttl = ttl
+        self._local = LRUCache(local_size)
+        self._stats: Dict[str, int] = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "redis_errors": 0,
+        }
+
+    def _key(self, char: str) -> str:
+        return f"{self.KEY_PREFIX}{char}"
+
+    async def get(self, char: str) -> Optional[CharacterData]:
+        """
+        Look up character template
+
+        Args:
+            char: Single Chinese character
+
+        Returns:
+            Cached CharacterData, or None on miss
+        """
+        cached = self._local.get(char)
+        if cached is not None:
+            self._stats["local_hits"] += 1
+            return cached
+
+        if self.redis is not None:
+            try:
+                payload = await self.redis.get(self._key(char))
+                if payload is not None:
+                    character = deserialize_character(payload)
+                    self._local.set(char, character)
+                    self._stats["redis_hits"] += 1
+                    return character
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Redis cache read failed for '{char}': {e}")
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, char: str, character: CharacterData) -> None:
+        """
+        Store character template in both tiers
+
+        Args:
+            char: Single Chinese character
+            character: Template to cache
+        """
+        self._local.set(char, character)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._key(char), serialize_character(character), ex=self.ttl)
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Redis cache write failed for '{char}': {e}")
+
+    def clear_local(self) -> None:
+        """Drop the in-process tier (Redis is left untouched)"""
+        self._local.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and local tier size"""
+        return {**self._stats, "local_size": len(self._local)}
+
+
+def create_redis_client(url: Optional[str] = None) -> Optional[Any]:
+    """
+    Create redis.asyncio client from URL.
+
+    Args:
+        url: Redis URL (defaults to REDIS_URL environment variable)
+
+    Returns:
+        Client instance, or None if no URL is configured or redis is not installed
+    """
+    url = url or os.getenv("REDIS_URL")
+    if not url:
+        return None
+
+    if not REDIS_AVAILABLE:
+        logger.warning("REDIS_URL is set but redis is not installed. Install: pip install redis")
+        return None
+
+    # Client connects lazily on first command
+    return aioredis.from_url(url)
+
+
+_shared_cache: Optional[CharacterCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_character_cache() -> CharacterCache:
+    """
+    Get the process-wide character cache.
+
+    Configuration (environment variables):
+    - REDIS_URL: enables the shared Redis tier
+    - CHARACTER_CACHE_SIZE: local LRU size (default 512)
+    - CHARACTER_CACHE_TTL: Redis expiry in seconds (default 7 days)
+
+    Returns:
+        Shared CharacterCache instance
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = CharacterCache(
+                    redis_client=create_redis_client(),
+                    local_size=int(os.getenv("CHARACTER_CACHE_SIZE", DEFAULT_LOCAL_SIZE)),
+                    ttl=int(os.getenv("CHARACTER_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                )
+    return _shared_cache
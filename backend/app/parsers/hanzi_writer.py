@@ -6,10 +6,11 @@ Converts 1024-grid coordinates to normalized 0-1 coordinates.
 """
 
 import httpx
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
 
 from app.models.character import CharacterData, CharacterSource
+from app.parsers.character_cache import CharacterCache
 
 logger = logging.getLogger(__name__)
 
@@ -32,14 +33,16 @@ class HanziWriterLoader:
     CDN_URL = "https://cdn.jsdelivr.net/npm/hanzi-writer-data@latest/"
 
 
-    def __init__(self, timeout: float = 10.0):
+    def __init__(self, timeout: float = 10.0, cache: Optional[CharacterCache] = None):
         """
         Initialize loader
 
         Args:
             timeout: HTTP request timeout in seconds
+            cache: Optional template cache consulted before the CDN
         """
         self.timeout = timeout
+        self.cache = cache
 
     def _get_cdn_url(self, char: str) -> str:
         """
@@ -70,6 +73,12 @@ class HanziWriterLoader:
             httpx.NetworkError: If network request fails
             ValueError: If CDN response is invalid
         """
+        if self.cache is not None:
+            cached = await self.cache.get(char)
+            if cached is not None:
+                logger.debug(f"Cache hit for character '{char}'")
+                return cached
+
         url = self._get_cdn_url(char)
 
         try:
@@ -104,11 +113,14 @@ class HanziWriterLoader:
             # Pass character string since CDN response doesn't include it
             character = CharacterData.from_hanzi_writer(data, character=char)
             logger.info(f"Successfully loaded character '{char}' with {len(character.strokes)} strokes")
-            return character
         except Exception as e:
             logger.error(f"Failed to parse data for character '{char}': {e}")
             raise ValueError(f"Failed to parse character data: {e}")
 
+        if self.cache is not None:
+            await self.cache.set(char, character)
+        return character
+
     async def batch_load(self, chars: List[str]) -> Dict[str, CharacterData]:
         """
         Load multiple characters in batch
@@ -4,12 +4,18 @@ Preprocessing package - Image preprocessing and skeleton extraction
 P1-T4: OpenCV Preprocessing Pipeline
 P1-T5: Skeleton Extraction (Zhang-Suen)
 P1-T6: Hallucination Suppression Mask
+Skeleton stroke graph (CPU fallback for InkSight trajectories)
+Worksheet segmentation (田字格 practice sheets)
+Photo fingerprint (perceptual hash dedup cache)
 """
 
 from app.preprocessing.image import (
+    decode_image,
     preprocess_image,
     binarize_image,
     detect_corners,
+    detect_corners_from_binary,
+    order_corners,
     apply_perspective_transform,
     crop_to_content,
 )
@@ -18,21 +24,66 @@ from app.preprocessing.skeleton import (
     extract_skeleton,
     zhang_suen_thinning,
     create_proximity_mask,
+    proximity_distance,
     apply_mask,
     validate_trajectory_with_mask,
+    validate_strokes_with_mask,
+    trajectory_keep_mask,
+)
+
+from app.preprocessing.stroke_graph import (
+    classify_skeleton_pixels,
+    skeleton_to_polylines,
+    skeleton_to_strokes,
+    extract_strokes_from_image,
+)
+
+from app.preprocessing.worksheet import (
+    GridCell,
+    rectify_sheet,
+    detect_grid,
+    segment_worksheet,
+)
+
+from app.preprocessing.fingerprint import (
+    perceptual_hash,
+    hamming_distance,
+    PhotoStrokeCache,
+    get_photo_stroke_cache,
 )
 
 __all__ = [
     # Image preprocessing
+    "decode_image",
     "preprocess_image",
     "binarize_image",
     "detect_corners",
+    "detect_corners_from_binary",
+    "order_corners",
     "apply_perspective_transform",
     "crop_to_content",
     # Skeleton extraction
     "extract_skeleton",
     "zhang_suen_thinning",
     "create_proximity_mask",
+    "proximity_distance",
     "apply_mask",
     "validate_trajectory_with_mask",
+    "validate_strokes_with_mask",
+    "trajectory_keep_mask",
+    # Stroke graph
+    "classify_skeleton_pixels",
+    "skeleton_to_polylines",
+    "skeleton_to_strokes",
+    "extract_strokes_from_image",
+    # Worksheet segmentation
+    "GridCell",
+    "rectify_sheet",
+    "detect_grid",
+    "segment_worksheet",
+    # Photo fingerprint
+    "perceptual_hash",
+    "hamming_distance",
+    "PhotoStrokeCache",
+    "get_photo_stroke_cache",
 ]
@@ -0,0 +1,228 @@
+"""
+Photo Fingerprint - 照片指纹与去重缓存
+
+Perceptual hash (pHash) of uploaded photos and a bounded cache mapping
+(user, character, phash) to extracted strokes. Re-uploads of the same photo
+(e.g. after a network error) hash to the same or a nearby value even after
+re-encoding or resizing, so their strokes are served without running
+InkSight again. Entries are scoped by user: one user's strokes are never
+served for another user's photo.
+
+pHash: grayscale, area-downscale to 32x32, 2D DCT, keep the 8x8 lowest
+frequencies and set one bit per coefficient above their median.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.preprocessing.image import OPENCV_AVAILABLE, PIL_AVAILABLE
+
+if OPENCV_AVAILABLE:
+    import cv2
+if PIL_AVAILABLE:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+_DCT_SIZE = 32
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_MAX_DISTANCE = 4
+
+Strokes = List[List[Tuple[float, float]]]
+CacheKey = Tuple[Optional[str], str, int]
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis (rows are frequencies)"""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    basis = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 2:
+        return image
+    return image[..., :3] @ np.array([0.299, 0.587, 0.114])
+
+
+def _area_resize(gray: np.ndarray, size: int) -> np.ndarray:
+    """Downscale to size x size averaging pixel areas"""
+    if OPENCV_AVAILABLE:
+        return cv2.resize(gray.astype(np.float32), (size, size), interpolation=cv2.INTER_AREA)
+    if PIL_AVAILABLE:
+        img = Image.fromarray(gray.astype(np.float32), mode='F')
+        return np.asarray(img.resize((size, size), Image.Resampling.BOX))
+
+    # Nearest sampling as last resort
+    h, w = gray.shape
+    rows = (np.arange(size) * h // size)
+    cols = (np.arange(size) * w // size)
+    return gray[np.ix_(rows, cols)].astype(np.float32)
+
+
+def perceptual_hash(image: np.ndarray, hash_size: int = HASH_SIZE) -> int:
+    """
+    Compute the DCT perceptual hash of an image.
+
+    Args:
+        image: (H, W, 3) RGB or (H, W) grayscale image (any resolution)
+        hash_size: Side of the low-frequency block (hash has hash_size² bits)
+
+    Returns:
+        Hash as a non-negative integer
+    """
+    if hash_size > _DCT_SIZE:
+        raise ValueError(f"hash_size must be <= {_DCT_SIZE}")
+
+    small = _area_resize(_to_gray(image), _DCT_SIZE).astype(np.float64)
+    low = (_DCT @ small @ _DCT.T)[:hash_size, :hash_size].ravel()
+    # DC term is skipped for the median: it only encodes overall brightness
+    bits = low > np.median(low[1:])
+
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
+
+
+class PhotoStrokeCache:
+    """
+    Bounded LRU cache of extracted strokes keyed by (user_id, character, phash).
+
+    Lookups first try the exact hash, then the nearest stored hash for the
+    same user and character within max_distance bits (near-duplicate
+    uploads). The default of 4 of 64 bits covers a re-encoded or resized
+    copy of one photo (typically 0-3 bits apart), while photos of different
+    handwriting land 10+ bits apart. Anonymous uploads (user_id None) share
+    one scope and only match exact hashes, since they may come from
+    different writers.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, max_distance: int = DEFAULT_MAX_DISTANCE):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Maximum number of entries (must be >= 1)
+            max_distance: Maximum Hamming distance for near-duplicate hits
+                (0 = exact hash only)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self._data: "OrderedDict[CacheKey, Strokes]" = OrderedDict()
+        # (user_id, character) -> hashes stored for it (near-duplicate scan)
+        self._by_scope: Dict[Tuple[Optional[str], str], set] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "near_hits": 0, "misses": 0}
+
+    def _find(self, user_id: Optional[str], character: str, phash: int) -> Optional[CacheKey]:
+        key = (user_id, character, phash)
+        if key in self._data:
+            return key
+        if self.max_distance <= 0 or user_id is None:
+            return None
+
+        best, best_distance = None, self.max_distance + 1
+        for stored in self._by_scope.get((user_id, character), ()):
+            distance = hamming_distance(stored, phash)
+            if distance < best_distance:
+                best, best_distance = stored, distance
+        return (user_id, character, best) if best is not None else None
+
+    def get(self, character: str, phash: int, user_id: Optional[str] = None) -> Optional[Strokes]:
+        """
+        Look up strokes for a photo of a character
+
+        Args:
+            character: Character the photo was uploaded for
+            phash: perceptual_hash of the photo
+            user_id: Uploading user (None = anonymous, exact hash only)
+
+        Returns:
+            Copy of the cached strokes, or None on miss
+        """
+        with self._lock:
+            key = self._find(user_id, character, phash)
+            if key is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats["hits" if key[2] == phash else "near_hits"] += 1
+            self._data.move_to_end(key)
+            return [list(stroke) for stroke in self._data[key]]
+
+    def set(self, character: str, phash: int, strokes: Strokes, user_id: Optional[str] = None) -> None:
+        """Store strokes, evicting the least recently used entry if full"""
+        key = (user_id, character, phash)
+        with self._lock:
+            self._data[key] = [list(stroke) for stroke in strokes]
+            self._data.move_to_end(key)
+            self._by_scope.setdefault((user_id, character), set()).add(phash)
+
+            while len(self._data) > self.max_size:
+                (old_user, old_character, old_hash), _ = self._data.popitem(last=False)
+                hashes = self._by_scope[(old_user, old_character)]
+                hashes.discard(old_hash)
+                if not hashes:
+                    del self._by_scope[(old_user, old_character)]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+            self._by_scope.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and cache size"""
+        with self._lock:
+            return {**self._stats, "size": len(self._data)}
+
+
+_shared_cache: Optional[PhotoStrokeCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_photo_stroke_cache() -> Optional[PhotoStrokeCache]:
+    """
+    Get the process-wide photo stroke cache.
+
+    Configuration (environment variables):
+    - PHOTO_CACHE_SIZE: maximum entries (default 256, 0 disables the cache)
+    - PHOTO_CACHE_MAX_DISTANCE: near-duplicate Hamming distance (default 4)
+
+    Returns:
+        Shared PhotoStrokeCache instance, or None if disabled
+    """
+    global _shared_cache
+    size = int(os.getenv("PHOTO_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+    if size <= 0:
+        return None
+
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = PhotoStrokeCache(
+                    max_size=size,
+                    max_distance=int(os.getenv("PHOTO_CACHE_MAX_DISTANCE", DEFAULT_MAX_DISTANCE)),
+                )
+    return _shared_cache
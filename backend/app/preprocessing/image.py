@@ -5,6 +5,7 @@ Perspective transform, binarization, and image normalization.
 P1-T4: OpenCV 预处理管道
 """
 
+import io
 import logging
 import numpy as np
 from typing import Tuple, Optional, List
@@ -18,9 +19,79 @@ except ImportError:
     OPENCV_AVAILABLE = False
     logging.warning("OpenCV not installed. Install: pip install opencv-python")
 
+# PIL import (reduced-size JPEG decoding)
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    PIL_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+def _reduced_size(size: Tuple[int, int], max_size: int) -> Tuple[int, int]:
+    """Scale (W, H) so the longer side is max_size"""
+    w, h = size
+    scale = max_size / max(w, h)
+    return (max(1, round(w * scale)), max(1, round(h * scale)))
+
+
+def decode_image(
+    data: bytes,
+    max_size: Optional[int] = None,
+    grayscale: bool = False
+) -> np.ndarray:
+    """
+    Decode an uploaded photo, downscaling while decoding.
+
+    JPEGs are decoded at 1/2, 1/4 or 1/8 scale straight from the DCT
+    coefficients (PIL draft mode), to the smallest scale still at least the
+    requested size, then resized to fit. A 12 MP phone photo is never
+    materialized at full resolution.
+
+    Args:
+        data: Encoded image bytes
+        max_size: Longest side of the result (None = full resolution)
+        grayscale: Decode to (H, W) grayscale instead of (H, W, 3) RGB
+
+    Returns:
+        uint8 image array
+
+    Raises:
+        ValueError: If the image cannot be decoded
+    """
+    mode = 'L' if grayscale else 'RGB'
+
+    if PIL_AVAILABLE:
+        try:
+            img = Image.open(io.BytesIO(data))
+            if max_size is not None and max(img.size) > max_size:
+                # No-op for formats without reduced decoding (PNG etc.)
+                img.draft(mode, _reduced_size(img.size, max_size))
+            img = img.convert(mode)
+        except Exception as e:
+            raise ValueError(f"Failed to decode image: {e}")
+
+        if max_size is not None and max(img.size) > max_size:
+            img = img.resize(_reduced_size(img.size, max_size), Image.Resampling.LANCZOS)
+        return np.asarray(img)
+
+    if not OPENCV_AVAILABLE:
+        raise ValueError("Failed to decode image: neither PIL nor OpenCV is installed")
+
+    flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+    if image is None:
+        raise ValueError("Failed to decode image")
+    if not grayscale:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    h, w = image.shape[:2]
+    if max_size is not None and max(w, h) > max_size:
+        image = cv2.resize(image, _reduced_size((w, h), max_size), interpolation=cv2.INTER_AREA)
+    return image
+
+
 def preprocess_image(
     image: np.ndarray,
     target_size: Optional[Tuple[int, int]] = None
@@ -137,6 +208,21 @@ def detect_corners(
     # Try to find contours (for document detection)
     binary = binarize_image(gray, method='otsu')
 
+    return detect_corners_from_binary(binary)
+
+
+def detect_corners_from_binary(binary: np.ndarray) -> np.ndarray:
+    """
+    Detect paper corners in an already binarized image.
+
+    Same contour search as detect_corners, without re-binarizing.
+
+    Args:
+        binary: Binary image (0 or 255), paper white
+
+    Returns:
+        Array of corner points (4, 2); image corners if no quadrilateral found
+    """
     # Find contours
     contours, _ = cv2.findContours(
         binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
@@ -155,7 +241,7 @@ def detect_corners(
             return approx.reshape(4, 2).astype(np.float32)
 
     # Fallback: return image corners
-    h, w = image.shape[:2]
+    h, w = binary.shape[:2]
     return np.array([
         [0, 0],
         [w - 1, 0],
@@ -164,6 +250,27 @@ def detect_corners(
     ], dtype=np.float32)
 
 
+def order_corners(corners: np.ndarray) -> np.ndarray:
+    """
+    Order 4 corner points as top-left, top-right, bottom-right, bottom-left.
+
+    Args:
+        corners: Corner points (4, 2) in any order
+
+    Returns:
+        Ordered corners (4, 2) float32
+    """
+    corners = np.asarray(corners, dtype=np.float32).reshape(4, 2)
+    sums = corners.sum(axis=1)
+    diffs = corners[:, 1] - corners[:, 0]
+    return np.array([
+        corners[np.argmin(sums)],   # top-left: smallest x + y
+        corners[np.argmin(diffs)],  # top-right: smallest y - x
+        corners[np.argmax(sums)],   # bottom-right: largest x + y
+        corners[np.argmax(diffs)],  # bottom-left: largest y - x
+    ], dtype=np.float32)
+
+
 def apply_perspective_transform(
     image: np.ndarray,
     src_corners: np.ndarray,
@@ -43,24 +43,151 @@ def extract_skeleton(binary_image: np.ndarray) -> np.ndarray:
     return skeleton
 
 
-def zhang_suen_thinning(binary: np.ndarray, max_iter: int = 100) -> np.ndarray:
+def _build_zhang_suen_lut(iteration_type: int, standard: bool = False) -> np.ndarray:
+    """
+    Precompute the removal decision for every 8-neighborhood code.
+
+    Code bit i (i = 0..7) holds neighbor P2..P9 (see _neighborhood_codes).
+
+    Args:
+        iteration_type: 1 or 2 (sub-iteration)
+        standard: Use the textbook second condition (product == 0)
+
+    Returns:
+        Boolean array (256,): True where the center pixel is removed
+    """
+    lut = np.zeros(256, dtype=bool)
+    for code in range(256):
+        p2, p3, p4, p5, p6, p7, p8, p9 = ((code >> i) & 1 for i in range(8))
+        ring = [p2, p3, p4, p5, p6, p7, p8, p9, p2]
+
+        # A(p1) = number of 0->1 transitions in circular sequence P2->P3->...->P9->P2
+        A = sum(1 for a, b in zip(ring, ring[1:]) if a == 0 and b == 1)
+
+        # B(p1) = number of 1 neighbors
+        B = p2 + p3 + p4 + p5 + p6 + p7 + p8 + p9
+
+        if iteration_type == 1:
+            # P2 * P4 * P6 = 0, P4 * P6 * P8 != 0
+            cond_1 = p2 * p4 * p6 == 0
+            cond_2 = p4 * p6 * p8 != 0
+        else:
+            # P2 * P4 * P8 = 0, P2 * P6 * P8 != 0
+            cond_1 = p2 * p4 * p8 == 0
+            cond_2 = p2 * p6 * p8 != 0
+
+        if standard:
+            cond_2 = not cond_2
+
+        lut[code] = 2 <= B <= 6 and A == 1 and cond_1 and cond_2
+    return lut
+
+
+# Removal lookup tables, one per sub-iteration
+_ZHANG_SUEN_LUTS = (_build_zhang_suen_lut(1), _build_zhang_suen_lut(2))
+_STANDARD_ZHANG_SUEN_LUTS = (
+    _build_zhang_suen_lut(1, standard=True),
+    _build_zhang_suen_lut(2, standard=True),
+)
+
+# Neighbor weights (correlation kernel):
+# P9 P2 P3      128   1   2
+# P8 P1 P4  ->   64   0   4
+# P7 P6 P5       32  16   8
+_NEIGHBOR_WEIGHTS = np.array([
+    [128, 1, 2],
+    [64, 0, 4],
+    [32, 16, 8],
+], dtype=np.float32)
+
+
+def _neighborhood_codes(image: np.ndarray) -> np.ndarray:
+    """
+    Encode each pixel's 3x3 neighborhood as an 8-bit code.
+
+    One 3x3 correlation with power-of-two weights; pixels outside the
+    image count as 0 (same as zero padding).
+
+    Args:
+        image: Binary image (0 or 1), uint8
+
+    Returns:
+        uint8 code image, same shape
+    """
+    if OPENCV_AVAILABLE:
+        return cv2.filter2D(
+            image, -1, _NEIGHBOR_WEIGHTS, borderType=cv2.BORDER_CONSTANT
+        )
+
+    padded = np.pad(image, 1, mode='constant', constant_values=0).astype(np.uint8)
+    h, w = image.shape
+    codes = np.zeros((h, w), dtype=np.uint8)
+    for dy in range(3):
+        for dx in range(3):
+            weight = int(_NEIGHBOR_WEIGHTS[dy, dx])
+            if weight:
+                codes |= padded[dy:dy + h, dx:dx + w] * np.uint8(weight)
+    return codes
+
+
+def _neighbor_offsets(width: int) -> np.ndarray:
+    """Flat-index offsets of P2..P9 (code bits 0..7) in an image of given width"""
+    return np.array([
+        -width,      # P2 (top)
+        -width + 1,  # P3 (top-right)
+        1,           # P4 (right)
+        width + 1,   # P5 (bottom-right)
+        width,       # P6 (bottom)
+        width - 1,   # P7 (bottom-left)
+        -1,          # P8 (left)
+        -width - 1,  # P9 (top-left)
+    ], dtype=np.intp)
+
+
+def _codes_at(flat: np.ndarray, indices: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Neighborhood codes for the given flat indices only (gather, no convolution)"""
+    codes = np.zeros(indices.shape, dtype=np.uint8)
+    for bit, offset in enumerate(offsets):
+        codes |= flat[indices + offset] << np.uint8(bit)
+    return codes
+
+
+def zhang_suen_thinning(binary: np.ndarray, max_iter: int = 100, standard: bool = False) -> np.ndarray:
     """
     Zhang-Suen thinning algorithm for binary images.
 
     Iteratively removes boundary pixels until skeleton is 1-pixel wide.
+    Each neighborhood is encoded as an 8-bit code and the removal decision
+    looked up in a precomputed 256-entry table per sub-iteration.
+
+    Active-front tracking: a pixel's decision only changes when one of its
+    neighbors is removed, so each sub-iteration re-evaluates only foreground
+    pixels next to pixels removed since its previous pass. Later iterations
+    cost proportional to the remaining front, not the image size.
 
     Args:
         binary: Binary image (0 or 1)
         max_iter: Maximum iterations
+        standard: Use the textbook Zhang-Suen conditions (P4*P6*P8 = 0 /
+            P2*P6*P8 = 0), which keep diagonal strokes free of side branches;
+            used for stroke graph extraction
 
     Returns:
         Thinned skeleton (0 or 1)
     """
-    # Make a copy
-    skeleton = binary.copy()
+    luts = _STANDARD_ZHANG_SUEN_LUTS if standard else _ZHANG_SUEN_LUTS
+
+    # Only pixels equal to 1 are foreground (others are never removed).
+    # Zero padding keeps every neighbor offset in bounds.
+    padded = np.pad((binary == 1).astype(np.uint8), 1, mode='constant', constant_values=0)
+    flat = padded.reshape(-1)
+    offsets = _neighbor_offsets(padded.shape[1])
+    # Above this many candidates a whole-image correlation beats gathering
+    dense_threshold = flat.size // 8
 
-    # Pad to avoid boundary issues
-    padded = np.pad(skeleton, 1, mode='constant', constant_values=0)
+    # Candidates per sub-iteration: initially every foreground pixel
+    foreground = np.flatnonzero(flat)
+    pending = [foreground, foreground]
 
     changed = True
     iteration = 0
@@ -70,115 +197,89 @@ def zhang_suen_thinning(binary: np.ndarray, max_iter: int = 100) -> np.ndarray:
         iteration += 1
 
         # Subiteration 1: Remove south-east boundary pixels
-        removed_1 = _zhang_suen_iteration(padded, iteration_type=1)
-        padded = padded ^ removed_1
-
         # Subiteration 2: Remove north-west boundary pixels
-        removed_2 = _zhang_suen_iteration(padded, iteration_type=2)
-        padded = padded ^ removed_2
+        for sub, lut in enumerate(luts):
+            candidates = pending[sub]
+            pending[sub] = np.empty(0, dtype=np.intp)
+            candidates = candidates[flat[candidates] == 1]
+            if candidates.size == 0:
+                continue
+
+            if candidates.size > dense_threshold:
+                codes = _neighborhood_codes(padded).reshape(-1)[candidates]
+            else:
+                codes = _codes_at(flat, candidates, offsets)
+
+            removed = candidates[lut[codes]]
+            if removed.size == 0:
+                continue
 
-        changed = np.any(removed_1) or np.any(removed_2)
+            flat[removed] = 0
+            changed = True
 
-    # Remove padding
-    skeleton = padded[1:-1, 1:-1]
+            # Neighbors of removed pixels are the new front for both sub-iterations
+            front = np.unique((removed[:, np.newaxis] + offsets).reshape(-1))
+            front = front[flat[front] == 1]
+            for other in range(len(pending)):
+                pending[other] = np.union1d(pending[other], front)
 
+    thinned = padded[1:-1, 1:-1]
+    skeleton = binary.copy()
+    skeleton[(binary == 1) & (thinned == 0)] = 0
     return skeleton
 
 
-def _zhang_suen_iteration(binary: np.ndarray, iteration_type: int) -> np.ndarray:
-    """
-    Single iteration of Zhang-Suen algorithm.
+# metric -> (cv2 distance type, mask size); chessboard distance <= r is
+# exactly a (2r+1)² square dilation, euclidean gives round (nib-like) masks
+_DISTANCE_METRICS = {
+    'chessboard': ('DIST_C', 3),
+    'euclidean': ('DIST_L2', 5),
+}
 
-    Args:
-        binary: Padded binary image
-        iteration_type: 1 or 2 (determines which pixels to remove)
 
-    Returns:
-        Boolean mask of pixels to remove
+def proximity_distance(skeleton: np.ndarray, metric: str = 'chessboard') -> np.ndarray:
     """
-    h, w = binary.shape
-
-    # Get 8-neighborhood
-    # P9 P2 P3
-    # P8 P1 P4
-    # P7 P6 P5
-    p1 = binary[1:-1, 1:-1]  # Center
-
-    p2 = binary[0:-2, 1:-1]   # Top
-    p3 = binary[0:-2, 2:]     # Top-right
-    p4 = binary[1:-1, 2:]     # Right
-    p5 = binary[2:, 2:]       # Bottom-right
-    p6 = binary[2:, 1:-1]     # Bottom
-    p7 = binary[2:, 0:-2]     # Bottom-left
-    p8 = binary[1:-1, 0:-2]   # Left
-    p9 = binary[0:-2, 0:-2]   # Top-left
-
-    # Calculate conditions
-    # A(p1) = number of 0->1 transitions in circular sequence P2->P3->...->P9->P2
-    A = (
-        ((p2 == 0) & (p3 == 1)).astype(int) +
-        ((p3 == 0) & (p4 == 1)).astype(int) +
-        ((p4 == 0) & (p5 == 1)).astype(int) +
-        ((p5 == 0) & (p6 == 1)).astype(int) +
-        ((p6 == 0) & (p7 == 1)).astype(int) +
-        ((p7 == 0) & (p8 == 1)).astype(int) +
-        ((p8 == 0) & (p9 == 1)).astype(int) +
-        ((p9 == 0) & (p2 == 1)).astype(int)
-    )
-
-    # B(p1) = number of 1 neighbors
-    B = p2 + p3 + p4 + p5 + p6 + p7 + p8 + p9
-
-    # Conditions common to both iterations
-    # 2 <= B(p1) <= 6
-    cond_B = (B >= 2) & (B <= 6)
-
-    # A(p1) == 1
-    cond_A = (A == 1)
-
-    # p1 == 1 (foreground pixel)
-    cond_p1 = (p1 == 1)
-
-    if iteration_type == 1:
-        # Subiteration 1
-        # P2 * P4 * P6 = 0
-        cond_1 = (p2 * p4 * p6 == 0)
+    Distance of every pixel to the nearest skeleton pixel.
 
-        # P4 * P6 * P8 != 0 (not: P4 * P6 * P8 = 0)
-        cond_2 = ((p4 * p6 * p8) != 0)
+    Thresholding the result at any radius gives the proximity mask, so one
+    transform can serve several radii.
 
-    else:  # iteration_type == 2
-        # Subiteration 2
-        # P2 * P4 * P8 = 0
-        cond_1 = (p2 * p4 * p8 == 0)
-
-        # P2 * P6 * P8 != 0 (not: P2 * P6 * P8 = 0)
-        cond_2 = ((p2 * p6 * p8) != 0)
-
-    # Combine conditions
-    remove_mask = cond_p1 & cond_B & cond_A & cond_1 & cond_2
+    Args:
+        skeleton: Binary skeleton image (0/1 or 0/255)
+        metric: 'chessboard' (square neighborhood) or 'euclidean' (round)
 
-    # Return full-size mask with padding
-    full_mask = np.zeros_like(binary, dtype=bool)
-    full_mask[1:-1, 1:-1] = remove_mask
+    Returns:
+        float32 distance map (large values everywhere if skeleton is empty)
+    """
+    if metric not in _DISTANCE_METRICS:
+        raise ValueError(f"Unknown distance metric: {metric}")
 
-    return full_mask
+    distance_type, mask_size = _DISTANCE_METRICS[metric]
+    # Skeleton pixels become zeros: distanceTransform measures distance to zero
+    background = (skeleton == 0).astype(np.uint8)
+    return cv2.distanceTransform(background, getattr(cv2, distance_type), mask_size)
 
 
 def create_proximity_mask(
     skeleton: np.ndarray,
     radius: int = 5,
-    mask_size: Optional[Tuple[int, int]] = None
+    mask_size: Optional[Tuple[int, int]] = None,
+    metric: str = 'chessboard',
+    scale: float = 1.0,
 ) -> np.ndarray:
     """
     Create proximity mask around skeleton.
 
     Used for hallucination suppression: only allow points near skeleton.
+    Built from a distance transform thresholded at radius, so cost does not
+    grow with radius (large radii for thick-nib pens are as cheap as small).
 
     Args:
         skeleton: Binary skeleton image (0 or 255)
-        radius: Radius around skeleton to include
+        radius: Radius around skeleton to include (pixels at full resolution)
         mask_size: Output mask size (default: same as skeleton)
+        metric: 'chessboard' (same as square dilation) or 'euclidean' (round)
+        scale: Compute at reduced resolution (0 < scale <= 1), then upsample
 
     Returns:
         Binary mask (0 or 255) with dilated skeleton
@@ -187,25 +288,29 @@ def create_proximity_mask(
         logger.warning("OpenCV not available, returning skeleton as mask")
         return skeleton
 
+    if not 0 < scale <= 1:
+        raise ValueError("scale must be in (0, 1]")
+
     # Ensure binary
     if skeleton.max() > 1:
         binary = (skeleton > 127).astype(np.uint8)
     else:
         binary = skeleton.astype(np.uint8)
 
-    # Create kernel for dilation
-    kernel_size = 2 * radius + 1
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
+    h, w = binary.shape[:2]
+    output_size = mask_size if mask_size is not None else (w, h)
 
-    # Dilate skeleton
-    dilated = cv2.dilate(binary, kernel, iterations=1)
+    if scale < 1:
+        small_size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        # Area averaging keeps 1-pixel skeleton lines that nearest-neighbor drops
+        binary = cv2.resize(binary * 255, small_size, interpolation=cv2.INTER_AREA)
+        radius = radius * scale
 
-    # Convert back to 0-255 range
-    mask = (dilated * 255).astype(np.uint8)
+    mask = np.where(proximity_distance(binary, metric) <= radius, 255, 0).astype(np.uint8)
 
     # Resize if needed
-    if mask_size is not None and mask.shape[:2][::-1] != mask_size:
-        mask = cv2.resize(mask, mask_size, interpolation=cv2.INTER_NEAREST)
+    if mask.shape[:2][::-1] != tuple(output_size):
+        mask = cv2.resize(mask, tuple(output_size), interpolation=cv2.INTER_NEAREST)
 
     return mask
 
@@ -258,6 +363,79 @@ def apply_mask(
     return masked.astype(image.dtype)
 
 
+def trajectory_keep_mask(points, mask: np.ndarray) -> np.ndarray:
+    """
+    Vectorized mask lookup for trajectory points.
+
+    One array conversion, one bounds check and one fancy-indexing gather;
+    coordinates map to pixels like int(x * w), int(y * h).
+
+    Args:
+        points: (N, 2) array-like of (x, y) in 0-1 range
+        mask: Binary mask (0 or 255)
+
+    Returns:
+        Boolean array (N,): True where the point lies inside the mask
+    """
+    coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if coords.shape[0] == 0:
+        return np.zeros(0, dtype=bool)
+
+    h, w = mask.shape[:2]
+    # Truncate toward zero, matching int() on each coordinate
+    pixels = np.trunc(coords * (w, h))
+    in_bounds = (
+        (pixels[:, 0] >= 0) & (pixels[:, 0] < w) &
+        (pixels[:, 1] >= 0) & (pixels[:, 1] < h)
+    )
+
+    # Clip so out-of-bounds (and NaN) rows still index safely
+    pixels = np.nan_to_num(pixels, nan=0.0)
+    ix = np.clip(pixels[:, 0], 0, w - 1).astype(np.intp)
+    iy = np.clip(pixels[:, 1], 0, h - 1).astype(np.intp)
+
+    return in_bounds & (mask[iy, ix] > 127)
+
+
+def validate_strokes_with_mask(
+    strokes: List[list],
+    mask: np.ndarray,
+) -> Tuple[List[list], List[np.ndarray]]:
+    """
+    Filter all strokes of a trajectory against the mask in one batch.
+
+    Args:
+        strokes: List of strokes, each a list of (x, y) points in 0-1 range
+        mask: Binary mask (0 or 255)
+
+    Returns:
+        Tuple of (filtered strokes, per-stroke boolean keep masks). The keep
+        masks let callers prune per-point metadata (timestamps, pressure)
+        the same way.
+    """
+    lengths = [len(stroke) for stroke in strokes]
+    total = sum(lengths)
+    if total == 0:
+        return [[] for _ in strokes], [np.zeros(0, dtype=bool) for _ in strokes]
+
+    keep = trajectory_keep_mask(
+        np.concatenate([np.asarray(stroke, dtype=np.float64).reshape(-1, 2) for stroke in strokes]),
+        mask,
+    )
+    keeps = np.split(keep, np.cumsum(lengths)[:-1])
+
+    filtered = [
+        [stroke[i] for i in np.flatnonzero(stroke_keep)]
+        for stroke, stroke_keep in zip(strokes, keeps)
+    ]
+
+    removed = total - int(keep.sum())
+    if removed > 0:
+        logger.debug(f"Removed {removed}/{total} hallucination points from {len(strokes)} strokes")
+
+    return filtered, keeps
+
+
 def validate_trajectory_with_mask(
     trajectory: list,
     mask: np.ndarray,
@@ -267,6 +445,7 @@ def validate_trajectory_with_mask(
     Validate and filter trajectory points using mask.
 
     Removes points that fall outside the masked region (hallucination suppression).
+    Use trajectory_keep_mask() directly to get the per-point boolean mask.
 
     Args:
         trajectory: List of (x, y) points in 0-1 range
@@ -276,32 +455,11 @@ def validate_trajectory_with_mask(
     Returns:
         Filtered trajectory with only valid points
     """
-    if not OPENCV_AVAILABLE:
-        logger.warning("OpenCV not available, returning original trajectory")
-        return trajectory
-
-    h, w = mask.shape[:2]
-
-    valid_points = []
-    removed_count = 0
-
-    for x, y in trajectory:
-        # Convert to image coordinates
-        ix = int(x * w)
-        iy = int(y * h)
-
-        # Check bounds
-        if 0 <= ix < w and 0 <= iy < h:
-            # Check if point is in valid region
-            if mask[iy, ix] > 127:
-                valid_points.append((x, y))
-            else:
-                removed_count += 1
-        else:
-            # Out of bounds
-            removed_count += 1
+    keep = trajectory_keep_mask(trajectory, mask)
+    valid_points = [trajectory[i] for i in np.flatnonzero(keep)]
 
+    removed_count = len(trajectory) - len(valid_points)
     if removed_count > 0:
-        logger.warning(f"Removed {removed_count} hallucination points from trajectory")
+        logger.debug(f"Removed {removed_count} hallucination points from trajectory")
 
     return valid_points
@@ -0,0 +1,382 @@
+"""
+Skeleton Stroke Graph - 骨架笔画图
+
+Turns a 1-pixel wide skeleton into ordered stroke trajectories:
+1. Classify skeleton pixels as endpoints / junctions (crossing number)
+2. Trace pixel chains between them into graph edges (plus closed loops)
+3. Prune short spurs and join edges through junctions (good continuation)
+4. Orient and order strokes (top-to-bottom, left-to-right)
+5. Normalize to 0-1 image coordinates (same convention as InkSight)
+
+CPU-only fallback and cross-check for InkSight trajectory extraction.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.preprocessing.image import preprocess_image
+from app.preprocessing.skeleton import (
+    OPENCV_AVAILABLE,
+    _neighbor_offsets,
+    _neighborhood_codes,
+    zhang_suen_thinning,
+)
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+logger = logging.getLogger(__name__)
+
+Stroke = List[Tuple[float, float]]
+
+# Edge: [start node id, end node id, flat pixel indices from start to end]
+Edge = list
+
+
+def _build_crossing_lut() -> np.ndarray:
+    """
+    Number of 0->1 transitions around the circular sequence P2..P9 per code.
+
+    1 transition: endpoint; 2: path pixel; >= 3: junction. Unlike a plain
+    neighbor count this is not fooled by staircase corners.
+    """
+    lut = np.zeros(256, dtype=np.uint8)
+    for code in range(256):
+        bits = [(code >> i) & 1 for i in range(8)]
+        lut[code] = sum(1 for i in range(8) if bits[i] == 0 and bits[(i + 1) % 8] == 1)
+    return lut
+
+
+_CROSSING_LUT = _build_crossing_lut()
+
+# Neighbor visiting order: 4-connected (P2, P4, P6, P8) before diagonals
+_NEIGHBOR_ORDER = (0, 2, 4, 6, 1, 3, 5, 7)
+
+
+def classify_skeleton_pixels(skeleton: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find endpoints and junctions of a skeleton.
+
+    Args:
+        skeleton: Skeleton image (non-zero = skeleton pixel)
+
+    Returns:
+        Tuple of (endpoints, junctions) boolean masks
+    """
+    image = (skeleton > 0).astype(np.uint8)
+    crossings = _CROSSING_LUT[_neighborhood_codes(image)]
+    on = image == 1
+    return on & (crossings == 1), on & (crossings >= 3)
+
+
+def _label_nodes(is_node: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Node id per flat index (-1 = not a node); 8-adjacent node pixels share one id"""
+    node_id = np.full(is_node.shape, -1, dtype=np.intp)
+    next_id = 0
+    for seed in np.flatnonzero(is_node):
+        if node_id[seed] >= 0:
+            continue
+        node_id[seed] = next_id
+        stack = [seed]
+        while stack:
+            pixel = stack.pop()
+            for offset in offsets:
+                neighbor = pixel + offset
+                if is_node[neighbor] and node_id[neighbor] < 0:
+                    node_id[neighbor] = next_id
+                    stack.append(neighbor)
+        next_id += 1
+    return node_id
+
+
+def _trace(
+    flat: np.ndarray,
+    visited: np.ndarray,
+    node_id: np.ndarray,
+    offsets: np.ndarray,
+    start: int,
+    first: int,
+) -> List[int]:
+    """Follow a pixel chain from node pixel `start` through `first` until a node or dead end"""
+    path = [start, first]
+    prev, current = start, first
+    while node_id[current] < 0:
+        visited[current] = True
+        step = None
+        for k in _NEIGHBOR_ORDER:
+            candidate = current + offsets[k]
+            if candidate == prev or not flat[candidate]:
+                continue
+            if node_id[candidate] >= 0:
+                if node_id[candidate] == node_id[start] and len(path) < 4:
+                    continue  # Still next to the node we started from
+                # Reaching a node ends the chain; prefer it over more path pixels
+                step = candidate
+                break
+            if step is None and not visited[candidate]:
+                step = candidate
+        if step is None:
+            break
+        path.append(step)
+        prev, current = current, step
+    return path
+
+
+def _build_graph(flat: np.ndarray, offsets: np.ndarray, node_id: np.ndarray) -> Tuple[Dict[int, Edge], List[List[int]]]:
+    """Trace all node-to-node edges and node-free closed loops"""
+    visited = np.zeros(flat.shape, dtype=bool)
+    edges: Dict[int, Edge] = {}
+    linked = set()
+
+    for start in np.flatnonzero(node_id >= 0):
+        for k in _NEIGHBOR_ORDER:
+            first = start + offsets[k]
+            if not flat[first] or visited[first]:
+                continue
+            if node_id[first] >= 0:
+                # Directly adjacent nodes: one edge per node pair
+                pair = (min(node_id[start], node_id[first]), max(node_id[start], node_id[first]))
+                if pair[0] == pair[1] or pair in linked:
+                    continue
+                linked.add(pair)
+            path = _trace(flat, visited, node_id, offsets, start, first)
+            end = path[-1]
+            # Dead end without a node (should not happen on clean skeletons): own end id
+            end_id = node_id[end] if node_id[end] >= 0 else -1 - end
+            edges[len(edges)] = [int(node_id[start]), int(end_id), path]
+
+    loops = []
+    for start in np.flatnonzero(flat.astype(bool) & ~visited & (node_id < 0)):
+        if visited[start]:
+            continue
+        visited[start] = True
+        for k in _NEIGHBOR_ORDER:
+            first = start + offsets[k]
+            if flat[first] and not visited[first]:
+                loops.append(_trace(flat, visited, node_id, offsets, start, first) + [start])
+                break
+    return edges, loops
+
+
+def _other_end(edge: Edge, node: int) -> int:
+    return edge[1] if edge[0] == node else edge[0]
+
+
+def _outgoing(edge: Edge, node: int) -> List[int]:
+    """Edge pixels ordered away from the given end node"""
+    return edge[2] if edge[0] == node else edge[2][::-1]
+
+
+def _direction(pixels: List[int], width: int, span: int) -> np.ndarray:
+    """Unit vector from the first pixel towards the pixel `span` steps along"""
+    y0, x0 = divmod(pixels[0], width)
+    y1, x1 = divmod(pixels[min(span, len(pixels) - 1)], width)
+    vector = np.array([x1 - x0, y1 - y0], dtype=float)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def _degrees(edges: Dict[int, Edge]) -> Dict[int, int]:
+    count: Dict[int, int] = {}
+    for a, b, _ in edges.values():
+        count[a] = count.get(a, 0) + 1
+        count[b] = count.get(b, 0) + 1
+    return count
+
+
+def _simplify_graph(edges: Dict[int, Edge], width: int, spur_length: int, max_join_cos: float) -> None:
+    """
+    Prune short spurs and join edges through nodes (in place).
+
+    A spur is an edge from an endpoint to a junction shorter than spur_length.
+    At each node, remaining edges are joined pairwise, most opposite
+    directions first; degree-2 nodes always join.
+    """
+    pruned = True
+    while pruned:
+        pruned = False
+        degree = _degrees(edges)
+        for key, (a, b, pixels) in list(edges.items()):
+            if len(pixels) >= spur_length or a == b:
+                continue
+            if (degree[a] == 1 and degree[b] >= 3) or (degree[b] == 1 and degree[a] >= 3):
+                del edges[key]
+                degree[a] -= 1
+                degree[b] -= 1
+                pruned = True
+
+    next_key = max(edges, default=-1) + 1
+    for node in sorted(_degrees(edges)):
+        while True:
+            incident = [key for key, (a, b, _) in edges.items() if node in (a, b) and a != b]
+            if len(incident) < 2:
+                break
+            directions = {key: _direction(_outgoing(edges[key], node), width, spur_length) for key in incident}
+            cos, first, second = min(
+                (float(directions[i] @ directions[j]), i, j)
+                for n, i in enumerate(incident) for j in incident[n + 1:]
+            )
+            if len(incident) > 2 and cos > max_join_cos:
+                break
+            edge_first, edge_second = edges.pop(first), edges.pop(second)
+            out_first, out_second = _outgoing(edge_first, node), _outgoing(edge_second, node)
+            if out_first[0] == out_second[0]:
+                out_second = out_second[1:]  # Shared node pixel
+            edges[next_key] = [
+                _other_end(edge_first, node),
+                _other_end(edge_second, node),
+                out_first[::-1] + out_second,
+            ]
+            next_key += 1
+
+
+def skeleton_to_polylines(
+    skeleton: np.ndarray,
+    min_length: int = 3,
+    spur_length: Optional[int] = None,
+    max_join_cos: float = -0.7,
+) -> List[List[Tuple[int, int]]]:
+    """
+    Trace a skeleton into pixel polylines.
+
+    Args:
+        skeleton: Skeleton image (non-zero = skeleton pixel)
+        min_length: Drop polylines with fewer pixels
+        spur_length: Prune endpoint-to-junction branches shorter than this
+            (defaults to min_length); about the stroke width works well
+        max_join_cos: Join two edges through a junction only if the cosine of
+            their outgoing directions is at most this (-1 = exactly opposite)
+
+    Returns:
+        List of polylines as (x, y) pixel coordinates
+    """
+    height, width = skeleton.shape[:2]
+    spur_length = min_length if spur_length is None else spur_length
+
+    padded = np.pad((skeleton > 0).astype(np.uint8), 1, mode='constant', constant_values=0)
+    padded_width = padded.shape[1]
+    flat = padded.reshape(-1)
+    offsets = _neighbor_offsets(padded_width)
+
+    endpoints, junctions = classify_skeleton_pixels(padded)
+    node_id = _label_nodes((endpoints | junctions).reshape(-1), offsets)
+
+    edges, loops = _build_graph(flat, offsets, node_id)
+    _simplify_graph(edges, padded_width, spur_length, max_join_cos)
+
+    polylines = []
+    for chain in [edge[2] for edge in edges.values()] + loops:
+        if len(chain) < min_length:
+            continue
+        rows, cols = np.divmod(np.asarray(chain), padded_width)
+        xs = np.clip(cols - 1, 0, width - 1)
+        ys = np.clip(rows - 1, 0, height - 1)
+        polylines.append([(int(x), int(y)) for x, y in zip(xs, ys)])
+    return polylines
+
+
+def _orient(stroke: Stroke) -> Stroke:
+    """Orient a stroke like it is written: left-to-right if horizontal, else top-to-bottom"""
+    (start_x, start_y), (end_x, end_y) = stroke[0], stroke[-1]
+    if abs(end_x - start_x) > abs(end_y - start_y):
+        reverse = end_x < start_x
+    else:
+        reverse = end_y < start_y
+    return stroke[::-1] if reverse else stroke
+
+
+def order_strokes(strokes: List[Stroke], row_tolerance: float = 0.1) -> List[Stroke]:
+    """
+    Order strokes by the basic writing rule: top-to-bottom, then left-to-right.
+
+    Args:
+        strokes: Oriented strokes in 0-1 coordinates
+        row_tolerance: Start points within this vertical band count as one row
+
+    Returns:
+        Ordered strokes
+    """
+    return sorted(strokes, key=lambda s: (round(s[0][1] / row_tolerance), s[0][0]))
+
+
+def skeleton_to_strokes(
+    skeleton: np.ndarray,
+    min_length: int = 3,
+    spur_length: Optional[int] = None,
+    step: int = 1,
+) -> List[Stroke]:
+    """
+    Convert a skeleton into ordered, normalized stroke trajectories.
+
+    Args:
+        skeleton: Skeleton image (non-zero = skeleton pixel)
+        min_length: Minimum polyline length in pixels
+        spur_length: Spur pruning length in pixels (defaults to min_length)
+        step: Keep every step-th pixel (last pixel always kept)
+
+    Returns:
+        Strokes as lists of (x, y) in 0-1 image coordinates,
+        usable by validate_stroke_order and DTW scoring
+    """
+    height, width = skeleton.shape[:2]
+    scale_x = 1.0 / max(width - 1, 1)
+    scale_y = 1.0 / max(height - 1, 1)
+
+    strokes = []
+    for polyline in skeleton_to_polylines(skeleton, min_length=min_length, spur_length=spur_length):
+        points = polyline[::step]
+        if points[-1] != polyline[-1]:
+            points.append(polyline[-1])
+        strokes.append(_orient([(x * scale_x, y * scale_y) for x, y in points]))
+
+    return order_strokes(strokes)
+
+
+def extract_strokes_from_image(
+    image: np.ndarray,
+    max_size: Optional[int] = 256,
+    min_length_ratio: float = 0.05,
+) -> List[Stroke]:
+    """
+    CPU-only stroke extraction from a character photo (dark ink on light paper).
+
+    gray + blur -> Otsu (ink as foreground) -> Zhang-Suen (standard) -> stroke graph.
+    Spurs shorter than twice the estimated stroke width are pruned.
+
+    Args:
+        image: Input image (H, W, 3) or (H, W) uint8
+        max_size: Downscale so the longer side is at most this (None = keep)
+        min_length_ratio: Minimum stroke length relative to the longer side
+
+    Returns:
+        Ordered strokes in 0-1 coordinates (empty if nothing was found)
+    """
+    if not OPENCV_AVAILABLE:
+        logger.warning("OpenCV not available, skeleton stroke extraction disabled")
+        return []
+
+    gray = preprocess_image(image)
+    height, width = gray.shape[:2]
+    if max_size is not None and max(height, width) > max_size:
+        scale = max_size / max(height, width)
+        gray = cv2.resize(
+            gray, (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    _, ink = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if not ink.any() or ink.all():
+        return []
+
+    skeleton = zhang_suen_thinning(ink, standard=True)
+    skeleton_pixels = int(skeleton.sum())
+    if skeleton_pixels == 0:
+        return []
+
+    # Ink area / skeleton length ~ mean stroke width
+    stroke_width = ink.sum() / skeleton_pixels
+    min_length = max(3, int(max(gray.shape) * min_length_ratio))
+    spur_length = max(min_length, int(2 * stroke_width))
+    return skeleton_to_strokes(skeleton, min_length=min_length, spur_length=spur_length, step=2)
@@ -0,0 +1,212 @@
+"""
+Worksheet Segmentation - 田字格练习纸分割
+
+Splits a photo of a whole practice sheet into per-character cells:
+1. Rectify the sheet (detect_corners + apply_perspective_transform)
+2. Detect grid lines (long-kernel morphological opening + projection)
+3. Crop each cell (inset to drop border residue, grid lines removed)
+
+Dashed or light 田 guide lines inside the cells are not treated as cell
+borders (the opening removes dashes); pass rows/cols for sheets with solid
+guide lines.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from app.preprocessing.image import (
+    OPENCV_AVAILABLE,
+    apply_perspective_transform,
+    detect_corners,
+    order_corners,
+)
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+logger = logging.getLogger(__name__)
+
+
+class GridCell(BaseModel):
+    """One worksheet cell (row-major position, box in the rectified sheet)"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    row: int
+    col: int
+    box: Tuple[int, int, int, int]  # x, y, w, h
+    image: np.ndarray
+    has_ink: bool
+
+
+def rectify_sheet(image: np.ndarray) -> np.ndarray:
+    """
+    Warp the photographed sheet to a fronto-parallel rectangle.
+
+    Output size follows the measured side lengths of the detected paper;
+    if no paper quadrilateral is found the image is returned unchanged.
+
+    Args:
+        image: Input image (H, W, 3) RGB or (H, W) grayscale
+
+    Returns:
+        Rectified image
+    """
+    corners = detect_corners(image)
+    h, w = image.shape[:2]
+    full_frame = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]], dtype=np.float32)
+    if np.array_equal(corners, full_frame):
+        return image
+
+    tl, tr, br, bl = order_corners(corners)
+    width = int(round(max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))))
+    height = int(round(max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))))
+    if width < 2 or height < 2:
+        return image
+
+    dst = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    return apply_perspective_transform(image, np.array([tl, tr, br, bl]), dst, (width, height))
+
+
+def _line_positions(profile: np.ndarray, threshold: float) -> List[int]:
+    """Centers of runs where the projection profile reaches threshold"""
+    above = np.flatnonzero(profile >= threshold)
+    if above.size == 0:
+        return []
+    runs = np.split(above, np.flatnonzero(np.diff(above) > 1) + 1)
+    return [int(round(run.mean())) for run in runs]
+
+
+def _intervals(lines: List[int], min_ratio: float = 0.5) -> List[Tuple[int, int]]:
+    """Intervals between consecutive lines, dropping narrow gaps between cells"""
+    intervals = list(zip(lines, lines[1:]))
+    if not intervals:
+        return []
+    widths = np.array([end - start for start, end in intervals])
+    typical = np.median(widths[widths >= widths.max() * min_ratio])
+    return [(start, end) for start, end in intervals if end - start >= typical * min_ratio]
+
+
+def _uniform_intervals(length: int, count: int) -> List[Tuple[int, int]]:
+    edges = np.linspace(0, length, count + 1).round().astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _every_other_if_split(intervals: List[Tuple[int, int]], expected: Optional[int]) -> List[Tuple[int, int]]:
+    """Merge interval pairs when solid 田 center lines doubled the count"""
+    if expected and len(intervals) == 2 * expected:
+        return [(intervals[i][0], intervals[i + 1][1]) for i in range(0, len(intervals), 2)]
+    return intervals
+
+
+def detect_grid(
+    gray: np.ndarray,
+    min_line_ratio: float = 0.5,
+) -> Tuple[List[int], List[int], np.ndarray]:
+    """
+    Detect grid line positions.
+
+    Args:
+        gray: Rectified grayscale sheet
+        min_line_ratio: Fraction of the sheet a line must span
+
+    Returns:
+        Tuple of (x positions of vertical lines, y positions of horizontal
+        lines, grid line mask (0 or 255))
+    """
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    h, w = ink.shape
+
+    # Openings keep only long straight runs: grid lines, not strokes or dashes
+    horizontal = cv2.morphologyEx(
+        ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, w // 20), 1))
+    )
+    vertical = cv2.morphologyEx(
+        ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(3, h // 20)))
+    )
+
+    row_profile = horizontal.sum(axis=1) / 255.0
+    col_profile = vertical.sum(axis=0) / 255.0
+    ys = _line_positions(row_profile, min_line_ratio * w)
+    xs = _line_positions(col_profile, min_line_ratio * h)
+
+    # Long strokes survive the opening too: keep only rows/columns of grid lines
+    horizontal[row_profile < min_line_ratio * w, :] = 0
+    vertical[:, col_profile < min_line_ratio * h] = 0
+    lines = cv2.dilate(cv2.bitwise_or(horizontal, vertical), np.ones((3, 3), np.uint8))
+    return xs, ys, lines
+
+
+def segment_worksheet(
+    image: np.ndarray,
+    rows: Optional[int] = None,
+    cols: Optional[int] = None,
+    rectify: bool = True,
+    margin: float = 0.06,
+    min_ink_ratio: float = 0.005,
+) -> List[GridCell]:
+    """
+    Segment a practice sheet photo into grid cells.
+
+    Args:
+        image: Sheet photo (H, W, 3) RGB or (H, W) grayscale
+        rows: Expected number of rows (used to resolve ambiguous grids)
+        cols: Expected number of columns
+        rectify: Rectify the sheet first
+        margin: Fraction of the cell size trimmed on each side
+        min_ink_ratio: Minimum ink fraction for a cell to count as written
+
+    Returns:
+        Cells in row-major order (cell images are RGB/gray like the input,
+        with grid lines whitened)
+
+    Raises:
+        RuntimeError: If OpenCV is not available
+        ValueError: If no grid is found and rows/cols are not given
+    """
+    if not OPENCV_AVAILABLE:
+        raise RuntimeError("Worksheet segmentation requires OpenCV. Install: pip install opencv-python")
+
+    sheet = rectify_sheet(image) if rectify else image
+    gray = cv2.cvtColor(sheet, cv2.COLOR_RGB2GRAY) if sheet.ndim == 3 else sheet
+    h, w = gray.shape
+
+    xs, ys, lines = detect_grid(gray)
+    col_intervals = _every_other_if_split(_intervals(xs), cols)
+    row_intervals = _every_other_if_split(_intervals(ys), rows)
+
+    if cols and len(col_intervals) != cols:
+        col_intervals = _uniform_intervals(w, cols)
+    if rows and len(row_intervals) != rows:
+        row_intervals = _uniform_intervals(h, rows)
+    if not col_intervals or not row_intervals:
+        raise ValueError("No worksheet grid detected; pass rows and cols")
+
+    # Whiten grid lines so they do not end up as strokes
+    cleaned = sheet.copy()
+    cleaned[lines > 0] = 255
+    _, ink = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    ink[lines > 0] = 0
+
+    cells = []
+    for row, (y0, y1) in enumerate(row_intervals):
+        for col, (x0, x1) in enumerate(col_intervals):
+            inset_x = int((x1 - x0) * margin)
+            inset_y = int((y1 - y0) * margin)
+            cx0, cx1 = x0 + inset_x, x1 - inset_x
+            cy0, cy1 = y0 + inset_y, y1 - inset_y
+            if cx1 <= cx0 or cy1 <= cy0:
+                continue
+            ink_ratio = float(ink[cy0:cy1, cx0:cx1].mean())
+            cells.append(GridCell(
+                row=row,
+                col=col,
+                box=(cx0, cy0, cx1 - cx0, cy1 - cy0),
+                image=cleaned[cy0:cy1, cx0:cx1],
+                has_ink=ink_ratio >= min_ink_ratio,
+            ))
+
+    logger.debug(f"Worksheet segmented into {len(row_intervals)}x{len(col_intervals)} cells")
+    return cells
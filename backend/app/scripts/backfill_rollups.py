@@ -0,0 +1,43 @@
+"""用户进度汇总回填脚本
+
+为已有练习记录的用户重建 user_progress_rollup / user_character_rollup
+（汇总统计与连续练习状态）和 daily_user_stats 每日分桶，并在使用 Redis 排行榜时重建 Redis 榜单。
+汇总表上线后运行一次即可；之后由 create_practice_record 增量维护。
+
+用法: python -m app.scripts.backfill_rollups
+"""
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.custom_character_db import CustomCharacterDB  # noqa: F401  (外键目标表)
+from ..models.leaderboard import get_leaderboard
+from ..models.user_progress_db import UserProgressCRUD
+
+
+def backfill() -> int:
+    """重建所有用户的汇总，返回处理的用户数"""
+    db: Session = SessionLocal()
+    try:
+        count = UserProgressCRUD.backfill_rollups(db)
+        get_leaderboard().sync_to_redis(db)
+        return count
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main():
+    """主函数"""
+    print("=" * 50)
+    print("SmartPen 用户进度汇总回填")
+    print("=" * 50)
+
+    count = backfill()
+
+    print(f"✅ 已回填 {count} 个用户")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,14 @@ from sqlalchemy.orm import Session
 
 from ..database import SessionLocal
 from ..models.custom_character_db import CustomCharacterDB
-from ..models.user_progress_db import PracticeRecordDB, PracticeGoalDB
+from ..models.user_progress_db import (
+    PracticeRecordDB,
+    PracticeGoalDB,
+    UserProgressCRUD,
+    UserProgressRollupDB,
+    UserCharacterRollupDB,
+    DailyUserStatsDB,
+)
 from ..models.custom_character import StrokeData
 from ..models.user_progress import PracticeMode
 
@@ -194,6 +201,10 @@ def generate_all_test_data(
             generate_test_goals(db, user['id'])
             db.commit()
 
+        # 记录直接写入，汇总表需要重建
+        print("重建用户进度汇总...")
+        UserProgressCRUD.backfill_rollups(db)
+
         print(f"\n✓ 测试数据生成完成！")
         print(f"  - {num_users} 个用户")
         print(f"  - {num_characters} 个自定义范字")
@@ -219,7 +230,10 @@ def clear_test_data():
 
         print("清理测试数据...")
 
-        # 清理练习记录
+        # 清理练习记录及其汇总
+        db.query(DailyUserStatsDB).delete()
+        db.query(UserCharacterRollupDB).delete()
+        db.query(UserProgressRollupDB).delete()
         db.query(PracticeRecordDB).delete()
         # 清理练习目标
         db.query(PracticeGoalDB).delete()
@@ -0,0 +1,207 @@
+"""
+Startup Warmup - 启动预热
+
+Runs once in the FastAPI lifespan so the first requests after a deploy do not
+pay for CDN fetches, DTW/SciPy first-call costs or lazy model loading:
+1. Preload practice characters into the template cache
+2. Run one dummy scoring pass to warm the scoring code paths
+3. Optionally load InkSight / PaddleOCR
+
+Configuration (environment variables):
+- WARMUP_ENABLED: run warmup on startup (default true)
+- WARMUP_CHARACTERS: characters to preload, e.g. "永一十" (default: common set)
+- WARMUP_TOP_N: also preload the N most-practiced characters from practice_records (default 0)
+- WARMUP_PRELOAD_MODELS: load InkSight and PaddleOCR during warmup (default false)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from app.parsers.hanzi_writer import HanziWriterLoader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARMUP_CHARACTERS = "永一二三十人大中上下"
+
+# Used when no template could be loaded (e.g. CDN unreachable)
+_SYNTHETIC_STROKES: List[List[Tuple[float, float]]] = [
+    [(0.2, 0.5), (0.5, 0.5), (0.8, 0.5)],
+    [(0.5, 0.2), (0.5, 0.5), (0.5, 0.8)],
+]
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class WarmupState(BaseModel):
+    """Warmup progress, reported by the readiness endpoint"""
+    ready: bool = False
+    running: bool = False
+    characters_loaded: List[str] = Field(default_factory=list)
+    characters_failed: List[str] = Field(default_factory=list)
+    scoring_warmed: bool = False
+    models_loaded: List[str] = Field(default_factory=list)
+    duration_ms: Optional[float] = None
+
+
+# Process-wide state (one per uvicorn worker)
+warmup_state = WarmupState()
+
+
+def get_warmup_characters(db=None, top_n: Optional[int] = None) -> List[str]:
+    """
+    Resolve the list of characters to preload.
+
+    Args:
+        db: Optional SQLAlchemy session used to add the most-practiced characters
+        top_n: Number of most-practiced characters (defaults to WARMUP_TOP_N)
+
+    Returns:
+        Ordered list of unique single characters
+    """
+    configured = os.getenv("WARMUP_CHARACTERS", DEFAULT_WARMUP_CHARACTERS)
+    chars = [c for c in configured if not c.isspace() and c not in ",，"]
+
+    if top_n is None:
+        top_n = int(os.getenv("WARMUP_TOP_N", "0"))
+
+    if db is not None and top_n > 0:
+        from app.models.user_progress_db import UserProgressCRUD
+
+        try:
+            chars = UserProgressCRUD.get_most_practiced_characters(db, limit=top_n) + chars
+        except Exception as e:
+            logger.warning(f"Failed to query most-practiced characters: {e}")
+
+    # De-duplicate, keep order
+    return list(dict.fromkeys(chars))
+
+
+def _warm_scoring(template_strokes: List[List[Tuple[float, float]]]) -> None:
+    """Run the scoring kernels once on a template scored against itself"""
+    from app.algorithms.dtw import calculate_dtw_distance
+    from app.algorithms.resampling import resample_stroke
+    from app.scoring.normalizer import normalize_score
+    from app.scoring.stroke_order import validate_stroke_order
+
+    validate_stroke_order(template_strokes, template_strokes)
+    for stroke in template_strokes:
+        resampled = resample_stroke(stroke, 20)
+        normalize_score(calculate_dtw_distance(resampled, stroke), max_distance=0.5)
+
+
+def _load_models() -> List[str]:
+    """Load the photo-scoring models, returning the names that loaded"""
+    from app.models.inksight import InkSightModel
+    from app.models.paddle_ocr import PaddleOCRModel
+
+    loaded = []
+    for name, model_cls in (("inksight", InkSightModel), ("paddleocr", PaddleOCRModel)):
+        try:
+            model_cls.get_instance().load()
+            loaded.append(name)
+        except Exception as e:
+            logger.warning(f"Warmup failed to load {name}: {e}")
+    return loaded
+
+
+async def run_warmup(
+    loader: HanziWriterLoader,
+    characters: List[str],
+    preload_models: bool = False,
+    state: Optional[WarmupState] = None,
+) -> WarmupState:
+    """
+    Run the warmup phase.
+
+    Failures are logged and recorded but never raised: a cold cache is slower,
+    not broken. The state is marked ready when warmup completes.
+
+    Args:
+        loader: Loader whose cache receives the templates
+        characters: Characters to preload
+        preload_models: Whether to also load InkSight and PaddleOCR
+        state: State object to update (defaults to the process-wide state)
+
+    Returns:
+        Final warmup state
+    """
+    state = state if state is not None else warmup_state
+    state.running = True
+    start = time.perf_counter()
+    template_strokes = None
+
+    for char in characters:
+        try:
+            character = await loader.load_character(char)
+            state.characters_loaded.append(char)
+            if template_strokes is None:
+                template_strokes = [
+                    [(p.x, p.y) for p in median.points] for median in character.medians
+                ]
+        except Exception as e:
+            state.characters_failed.append(char)
+            logger.warning(f"Warmup failed to load character '{char}': {e}")
+
+    try:
+        await asyncio.to_thread(_warm_scoring, template_strokes or _SYNTHETIC_STROKES)
+        state.scoring_warmed = True
+    except Exception as e:
+        logger.warning(f"Warmup scoring pass failed: {e}")
+
+    if preload_models:
+        state.models_loaded = await asyncio.to_thread(_load_models)
+
+    state.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+    state.running = False
+    state.ready = True
+    logger.info(
+        f"Warmup finished in {state.duration_ms}ms: "
+        f"{len(state.characters_loaded)} characters, models={state.models_loaded}"
+    )
+    return state
+
+
+def _characters_from_env() -> List[str]:
+    """Resolve warmup characters, opening a DB session when WARMUP_TOP_N is set"""
+    top_n = int(os.getenv("WARMUP_TOP_N", "0"))
+    if top_n <= 0:
+        return get_warmup_characters(top_n=0)
+
+    try:
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+    except Exception as e:
+        logger.warning(f"Warmup could not open a database session: {e}")
+        return get_warmup_characters(top_n=0)
+
+    try:
+        return get_warmup_characters(db=db, top_n=top_n)
+    finally:
+        db.close()
+
+
+async def warmup_from_env(loader: HanziWriterLoader) -> WarmupState:
+    """Run warmup with environment configuration (used by the app lifespan)"""
+    # The DB query is blocking; keep it off the event loop
+    characters = await asyncio.to_thread(_characters_from_env)
+    return await run_warmup(
+        loader,
+        characters,
+        preload_models=_env_flag("WARMUP_PRELOAD_MODELS", False),
+    )
+
+
+def is_warmup_enabled() -> bool:
+    """Whether the lifespan should run warmup (WARMUP_ENABLED, default true)"""
+    return _env_flag("WARMUP_ENABLED", True)
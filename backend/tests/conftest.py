@@ -0,0 +1,97 @@
+"""
+Shared fixtures - 共享测试夹具
+
+Per-test SQLite database for the DB-backed modules (user progress,
+leaderboard, custom characters), shared by sync sessions and the async API.
+"""
+
+import os
+
+# app.database creates its engine at import time; never point tests at Postgres
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models import custom_character_db  # noqa: F401  (practice_records FK target)
+from app.models import user_progress_db  # noqa: F401
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # File database so the async API client (aiosqlite) sees the same data
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _no_fsync(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA synchronous = OFF")
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def count_queries(engine):
+    """Counts SELECT statements executed inside the with-block"""
+    class Counter:
+        def __init__(self):
+            self.selects = 0
+            self.statements = []
+            self.active = False
+
+        def __enter__(self):
+            self.active = True
+            return self
+
+        def __exit__(self, *exc):
+            self.active = False
+
+    counter = Counter()
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if counter.active:
+            counter.statements.append(statement)
+            if statement.lstrip().upper().startswith("SELECT"):
+                counter.selects += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield counter
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def api_client(engine):
+    """TestClient for the DB-backed routers, bound to the test database via aiosqlite"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.api.custom_characters import router as custom_characters_router
+    from app.api.user_progress import router as user_progress_router
+    from app.database import get_async_database_url, get_async_db
+
+    app = FastAPI()
+    app.include_router(user_progress_router)
+    app.include_router(custom_characters_router)
+    # NullPool: connections never outlive the TestClient's event loop
+    async_engine = create_async_engine(get_async_database_url(str(engine.url)), poolclass=NullPool)
+    Session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as client:
+        yield client
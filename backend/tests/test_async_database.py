@@ -0,0 +1,126 @@
+"""
+Async Database Tests - 异步数据库层测试
+
+Tests for async URL/driver selection, pool configuration and the async
+CRUD variants (run against aiosqlite).
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import database
+from app.database import get_async_database_url
+from app.models.custom_character import CustomCharacterCreate, CustomCharacterUpdate, StrokeData
+from app.models.custom_character_db import AsyncCustomCharacterCRUD
+from app.models.user_progress import PracticeGoalCreate, PracticeRecordCreate
+from app.models.user_progress_db import AsyncUserProgressCRUD
+
+
+class TestAsyncDatabaseUrl:
+    """Test async driver selection"""
+
+    @pytest.mark.parametrize("url, expected", [
+        ("postgresql://u:p@db:5432/smartpen", "postgresql+asyncpg://u:p@db:5432/smartpen"),
+        ("postgresql+psycopg2://u:p@db/smartpen", "postgresql+asyncpg://u:p@db/smartpen"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("sqlite:////data/smartpen.db", "sqlite+aiosqlite:////data/smartpen.db"),
+    ])
+    def test_driver(self, url, expected):
+        assert get_async_database_url(url) == expected
+
+    def test_unsupported_database(self):
+        with pytest.raises(ValueError):
+            get_async_database_url("mysql://u:p@db/smartpen")
+
+    def test_pool_configuration(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_SIZE", "5")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "2")
+        monkeypatch.setenv("DB_POOL_TIMEOUT", "3.5")
+        monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+
+        assert database._pool_kwargs() == {
+            "pool_size": 5,
+            "max_overflow": 2,
+            "pool_timeout": 3.5,
+            "pool_recycle": 600,
+            "pool_pre_ping": True,
+        }
+
+
+@pytest.fixture
+async def async_db(engine):
+    async_engine = create_async_engine(get_async_database_url(str(engine.url)))
+    async with async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)() as session:
+        yield session
+    await async_engine.dispose()
+
+
+def _record(score, character="永"):
+    return PracticeRecordCreate(
+        user_id="u1",
+        character=character,
+        total_score=score,
+        stroke_scores=[score],
+        stroke_order_correct=True,
+        time_spent=60.0,
+        stroke_count=5,
+    )
+
+
+class TestAsyncUserProgressCRUD:
+    """Test async progress CRUD"""
+
+    async def test_record_and_read(self, async_db):
+        await AsyncUserProgressCRUD.create_goal(
+            async_db, PracticeGoalCreate(user_id="u1", goal_type="character_count", target_value=2)
+        )
+        for score in (70, 90, 80):
+            await AsyncUserProgressCRUD.create_practice_record(async_db, _record(score, character="永一"[score % 2]))
+
+        summary = await AsyncUserProgressCRUD.get_progress_summary(async_db, "u1")
+        items, total, cursor = await AsyncUserProgressCRUD.get_user_records(
+            async_db, "u1", limit=2, include_total=True
+        )
+        rest, _, _ = await AsyncUserProgressCRUD.get_user_records(async_db, "u1", cursor=cursor)
+        goals = await AsyncUserProgressCRUD.get_goals(async_db, "u1", achieved_only=True)
+
+        assert summary["total_practices"] == 3
+        assert summary["average_score"] == pytest.approx(80.0)
+        assert [r.total_score for r in items + rest] == [80, 90, 70]
+        assert total == 3
+        assert [g.current_value for g in goals] == [2]  # achieved goals stop counting
+        assert (await AsyncUserProgressCRUD.get_streak(async_db, "u1"))["longest_streak"] == 1
+        assert (await AsyncUserProgressCRUD.get_analytics(async_db, "u1"))["mode_statistics"][0]["count"] == 3
+
+    async def test_visible_to_sync_session(self, async_db, db):
+        await AsyncUserProgressCRUD.create_practice_record(async_db, _record(60))
+
+        from app.models.user_progress_db import UserProgressCRUD
+
+        assert UserProgressCRUD.get_progress_summary(db, "u1")["best_score"] == 60
+
+
+class TestAsyncCustomCharacterCRUD:
+    """Test async custom character CRUD"""
+
+    async def test_lifecycle(self, async_db):
+        created = await AsyncCustomCharacterCRUD.create(async_db, CustomCharacterCreate(
+            char="永",
+            strokes=[StrokeData(points=[(0.1, 0.5), (0.9, 0.5)], order=0)],
+            creator_id="t1",
+            creator_name="王老师",
+            is_public=True,
+        ))
+
+        await AsyncCustomCharacterCRUD.increment_usage(async_db, created.id)
+        updated = await AsyncCustomCharacterCRUD.update(async_db, created, CustomCharacterUpdate(tags=["一年级"]))
+        items, _, _ = await AsyncCustomCharacterCRUD.get_multi(async_db, creator_id="t1")
+        popular = await AsyncCustomCharacterCRUD.get_popular(async_db)
+
+        assert updated.tags == ["一年级"]
+        assert updated.usage_count == 1
+        assert [c.id for c in items] == [created.id]
+        assert [c.id for c in popular] == [created.id]
+
+        await AsyncCustomCharacterCRUD.delete(async_db, created.id)
+        assert await AsyncCustomCharacterCRUD.get(async_db, created.id) is None
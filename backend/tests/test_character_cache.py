@@ -0,0 +1,185 @@
+"""
+Character Cache Tests - 汉字模板缓存测试
+
+Tests for the two-tier (local LRU + Redis) character template cache.
+Redis tier runs against fakeredis, or a local Redis when REDIS_TEST_URL is set.
+"""
+
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.models.character import CharacterData
+from app.parsers.character_cache import (
+    CharacterCache,
+    LRUCache,
+    serialize_character,
+    deserialize_character,
+)
+from app.parsers.hanzi_writer import HanziWriterLoader
+
+
+HANZI_WRITER_DATA = {
+    "strokes": [
+        "M 300 100 Q 350 150 400 200",
+        "M 350 250 Q 400 300 450 350",
+    ],
+    "medians": [
+        [[300, 100], [350, 150], [400, 200]],
+        [[350, 250], [400, 300], [450, 350]],
+    ],
+    "radicals": {"水": {"symbol": "水", "meaning": "water"}},
+}
+
+
+@pytest.fixture
+def character():
+    return CharacterData.from_hanzi_writer(HANZI_WRITER_DATA, character="永")
+
+
+@pytest.fixture
+def redis_client():
+    """Local Redis if REDIS_TEST_URL is set, otherwise in-process fakeredis"""
+    url = os.getenv("REDIS_TEST_URL")
+    if url:
+        redis_asyncio = pytest.importorskip("redis.asyncio")
+        return redis_asyncio.from_url(url)
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeAsyncRedis()
+
+
+def _mock_cdn_response():
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json = MagicMock(return_value=HANZI_WRITER_DATA)
+    mock_response.raise_for_status = MagicMock()
+    return mock_response
+
+
+class TestLRUCache:
+    """Test in-process LRU tier"""
+
+    def test_get_missing_returns_none(self):
+        cache = LRUCache(max_size=2)
+        assert cache.get("永") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" becomes least recently used
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(max_size=0)
+
+
+class TestSerialization:
+    """Test compact template serialization"""
+
+    def test_roundtrip_preserves_template(self, character):
+        restored = deserialize_character(serialize_character(character))
+
+        assert restored.character == character.character
+        assert restored.to_hanzi_writer_format() == character.to_hanzi_writer_format()
+
+    def test_payload_is_compact(self, character):
+        payload = serialize_character(character)
+        assert len(payload) < len(character.model_dump_json())
+
+    def test_corrupt_payload_raises(self):
+        with pytest.raises(ValueError):
+            deserialize_character(b"not a payload")
+
+
+class TestCharacterCache:
+    """Test two-tier cache behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_local_only_cache(self, character):
+        cache = CharacterCache()
+
+        assert await cache.get("永") is None
+        await cache.set("永", character)
+        assert await cache.get("永") is character
+
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_shared_between_instances(self, character, redis_client):
+        """Two workers sharing Redis: second worker hits Redis instead of CDN"""
+        await redis_client.flushdb()
+        worker_a = CharacterCache(redis_client=redis_client)
+        worker_b = CharacterCache(redis_client=redis_client)
+
+        await worker_a.set("永", character)
+        restored = await worker_b.get("永")
+
+        assert restored is not None
+        assert restored.to_hanzi_writer_format() == character.to_hanzi_writer_format()
+        assert worker_b.stats()["redis_hits"] == 1
+
+        # Promoted to local tier
+        assert await worker_b.get("永") is restored
+        assert worker_b.stats()["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_ttl_applied(self, character, redis_client):
+        await redis_client.flushdb()
+        cache = CharacterCache(redis_client=redis_client, ttl=60)
+        await cache.set("永", character)
+
+        ttl = await redis_client.ttl(cache._key("永"))
+        assert 0 < ttl <= 60
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_degrade_to_miss(self, character):
+        broken = MagicMock()
+        broken.get.side_effect = ConnectionError("redis down")
+        broken.set.side_effect = ConnectionError("redis down")
+        cache = CharacterCache(redis_client=broken)
+
+        await cache.set("永", character)  # must not raise
+        cache.clear_local()
+        assert await cache.get("永") is None
+        assert cache.stats()["redis_errors"] == 2
+
+
+class TestLoaderWithCache:
+    """Test HanziWriterLoader consulting the cache before the CDN"""
+
+    @pytest.mark.asyncio
+    async def test_second_load_skips_cdn(self):
+        loader = HanziWriterLoader(cache=CharacterCache())
+
+        with patch("httpx.AsyncClient.get") as mock_get:
+            mock_get.return_value = _mock_cdn_response()
+
+            first = await loader.load_character("永")
+            second = await loader.load_character("永")
+
+            assert mock_get.call_count == 1
+            assert second is first
+
+    @pytest.mark.asyncio
+    async def test_replicas_share_cdn_fetch(self, redis_client):
+        await redis_client.flushdb()
+        replica_a = HanziWriterLoader(cache=CharacterCache(redis_client=redis_client))
+        replica_b = HanziWriterLoader(cache=CharacterCache(redis_client=redis_client))
+
+        with patch("httpx.AsyncClient.get") as mock_get:
+            mock_get.return_value = _mock_cdn_response()
+
+            await replica_a.load_character("永")
+            character = await replica_b.load_character("永")
+
+            assert mock_get.call_count == 1
+            assert len(character.medians) == 2
@@ -0,0 +1,184 @@
+"""
+Custom Character Tests - 自定义范字测试
+
+Tests for custom character CRUD listing, tag search and the list endpoints.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.custom_character import CustomCharacterCreate, CustomCharacterUpdate, StrokeData
+from app.models.custom_character_db import CustomCharacterCRUD, CustomCharacterDB, CustomCharacterTagDB
+
+
+def _create(db, char="永", creator_id="t1", tags=None, is_public=True, created_at=None):
+    obj = CustomCharacterCRUD.create(db, CustomCharacterCreate(
+        char=char,
+        strokes=[StrokeData(points=[(0.1, 0.5), (0.9, 0.5)], order=0)],
+        creator_id=creator_id,
+        creator_name="王老师",
+        tags=tags or [],
+        is_public=is_public,
+    ))
+    if created_at is not None:
+        obj.created_at = created_at
+        db.commit()
+    return obj
+
+
+@pytest.fixture
+def characters(db):
+    base = datetime(2024, 3, 1, 9, 0)
+    return [
+        _create(db, char="永一人大"[i % 4], creator_id=f"t{i % 2}", created_at=base + timedelta(hours=i // 3))
+        for i in range(25)
+    ]
+
+
+class TestListPagination:
+    """Test keyset pagination of custom characters"""
+
+    def test_pages_cover_all(self, db, characters):
+        seen, cursor = [], None
+        while True:
+            items, total, cursor = CustomCharacterCRUD.get_multi(db, cursor=cursor, limit=6)
+            seen.extend(item.id for item in items)
+            if cursor is None:
+                break
+
+        expected = sorted(characters, key=lambda c: (c.created_at, c.id), reverse=True)
+        assert seen == [c.id for c in expected]
+        assert total is None
+
+    def test_filtered_pages(self, db, characters):
+        items, total, cursor = CustomCharacterCRUD.get_multi(db, creator_id="t0", limit=5, include_total=True)
+        rest, _, _ = CustomCharacterCRUD.get_multi(db, creator_id="t0", cursor=cursor, limit=50)
+
+        assert total == 13
+        assert len(items) + len(rest) == 13
+        assert {c.creator_id for c in items + rest} == {"t0"}
+
+    def test_endpoint(self, api_client, characters):
+        first = api_client.get("/api/custom-characters/", params={"page_size": 20})
+        body = first.json()
+        second = api_client.get("/api/custom-characters/", params={
+            "page_size": 20, "cursor": body["next_cursor"], "include_total": True,
+        }).json()
+
+        assert first.status_code == 200
+        assert len(body["items"]) == 20
+        assert body["total"] is None
+        assert len(second["items"]) == 5
+        assert second["next_cursor"] is None
+        assert second["total"] == 25
+
+    def test_endpoint_invalid_cursor(self, api_client):
+        response = api_client.get("/api/custom-characters/", params={"cursor": "garbage"})
+
+        assert response.status_code == 400
+
+
+def _tag_rows(db, character_id):
+    return sorted(
+        row.tag for row in db.query(CustomCharacterTagDB).filter(CustomCharacterTagDB.character_id == character_id)
+    )
+
+
+class TestTagIndex:
+    """Test the custom_character_tags inverted index"""
+
+    def test_create_normalizes_tags(self, db):
+        obj = _create(db, tags=["一年级", " 基础 ", "基础", ""])
+
+        assert _tag_rows(db, obj.id) == ["一年级", "基础"]
+        assert obj.tags == ["一年级", " 基础 ", "基础", ""]
+
+    def test_update_replaces_tags(self, db):
+        obj = _create(db, tags=["一年级", "基础"])
+
+        CustomCharacterCRUD.update(db, obj, CustomCharacterUpdate(tags=["基础", "进阶"]))
+        assert _tag_rows(db, obj.id) == ["基础", "进阶"]
+
+        CustomCharacterCRUD.update(db, obj, CustomCharacterUpdate(is_public=False))
+        assert _tag_rows(db, obj.id) == ["基础", "进阶"]
+
+    def test_delete_removes_tags(self, db):
+        obj = _create(db, tags=["一年级"])
+
+        CustomCharacterCRUD.delete(db, obj.id)
+
+        assert db.query(CustomCharacterTagDB).count() == 0
+
+    def test_search_requires_all_tags(self, db):
+        both = _create(db, tags=["一年级", "基础"])
+        popular = _create(db, tags=["基础", "一年级", "常用"])
+        _create(db, tags=["一年级"])
+        _create(db, tags=["一年级", "基础"], is_public=False)
+        popular.usage_count = 5
+        db.commit()
+
+        result = CustomCharacterCRUD.search_by_tags(db, ["一年级", "基础"])
+
+        assert [c.id for c in result] == [popular.id, both.id]
+
+    def test_tags_match_exactly(self, db):
+        # The old JSON contains() filter matched substrings of the encoded array
+        _create(db, tags=["一年级"])
+
+        assert CustomCharacterCRUD.search_by_tags(db, ["年级"]) == []
+
+    def test_list_filter(self, db):
+        match = _create(db, creator_id="t0", tags=["上册", "基础"])
+        _create(db, creator_id="t1", tags=["上册", "基础"])
+        _create(db, creator_id="t0", tags=["上册"])
+
+        items, total, _ = CustomCharacterCRUD.get_multi(
+            db, creator_id="t0", tags=["基础", "上册"], include_total=True
+        )
+
+        assert [c.id for c in items] == [match.id]
+        assert total == 1
+
+    def test_tag_length_limited(self, db):
+        from pydantic import ValidationError
+
+        obj = _create(db, tags=["长" * 100])
+        assert _tag_rows(db, obj.id) == ["长" * 100]
+
+        with pytest.raises(ValidationError):
+            _create(db, tags=["长" * 101])
+        with pytest.raises(ValidationError):
+            CustomCharacterUpdate(tags=["长" * 101])
+
+    def test_legacy_long_tag_not_indexed(self, db):
+        # Written without the pydantic models (existing data)
+        obj = CustomCharacterDB(
+            char="永", style="custom", strokes=[], creator_id="t1", creator_name="王老师",
+            tags=["一年级", "长" * 101],
+        )
+        db.add(obj)
+        db.commit()
+
+        assert _tag_rows(db, obj.id) == ["一年级"]
+        assert obj.tags == ["一年级", "长" * 101]
+
+    def test_create_endpoint_rejects_long_tag(self, api_client):
+        response = api_client.post("/api/custom-characters/", json={
+            "char": "永",
+            "strokes": [{"points": [[0.1, 0.5], [0.9, 0.5]], "order": 0}],
+            "creator_id": "t1",
+            "creator_name": "王老师",
+            "tags": ["长" * 101],
+        })
+
+        assert response.status_code == 422
+
+    def test_search_endpoint(self, api_client, db):
+        match = _create(db, tags=["一年级", "基础"])
+        _create(db, tags=["一年级"])
+
+        response = api_client.get("/api/custom-characters/search/by-tags", params={"tags": "一年级, 基础"})
+
+        assert response.status_code == 200
+        assert [c["id"] for c in response.json()] == [match.id]
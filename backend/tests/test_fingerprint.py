@@ -0,0 +1,138 @@
+"""
+Photo Fingerprint Tests - 照片指纹测试
+
+Tests for the perceptual hash and the (user, character, phash) stroke cache.
+"""
+
+import pytest
+import numpy as np
+
+cv2 = pytest.importorskip("cv2")
+
+from app.preprocessing.fingerprint import (
+    PhotoStrokeCache,
+    hamming_distance,
+    perceptual_hash,
+)
+
+
+def _photo(lines, size=400, width=20):
+    image = np.full((size, size, 3), 245, dtype=np.uint8)
+    for start, end in lines:
+        cv2.line(image, start, end, (10, 10, 10), width)
+    return image
+
+
+HORIZONTAL = [((50, 200), (350, 200))]
+CROSS = [((50, 150), (350, 150)), ((200, 40), (200, 360))]
+
+
+def _reencode(image, quality=70):
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    assert ok
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+
+class TestPerceptualHash:
+    """Test DCT perceptual hash"""
+
+    def test_hash_is_64_bit(self):
+        assert 0 <= perceptual_hash(_photo(CROSS)) < 2 ** 64
+
+    def test_deterministic_and_gray_equivalent(self):
+        photo = _photo(CROSS)
+        gray = cv2.cvtColor(photo, cv2.COLOR_RGB2GRAY)
+
+        assert perceptual_hash(photo) == perceptual_hash(photo.copy())
+        assert hamming_distance(perceptual_hash(photo), perceptual_hash(gray)) <= 2
+
+    def test_robust_to_resize_and_recompression(self):
+        photo = _photo(CROSS)
+        variant = _reencode(cv2.resize(photo, (256, 256), interpolation=cv2.INTER_AREA))
+
+        assert hamming_distance(perceptual_hash(photo), perceptual_hash(variant)) <= 4
+
+    def test_different_content_far_apart(self):
+        assert hamming_distance(perceptual_hash(_photo(CROSS)), perceptual_hash(_photo(HORIZONTAL))) > 10
+
+    def test_hamming_distance(self):
+        assert hamming_distance(0b1011, 0b0010) == 2
+        assert hamming_distance(5, 5) == 0
+
+
+class TestPhotoStrokeCache:
+    """Test bounded (user, character, phash) cache"""
+
+    STROKES = [[(0.1, 0.5), (0.9, 0.5)]]
+
+    def test_exact_hit(self):
+        cache = PhotoStrokeCache()
+        cache.set("一", 0xABCD, self.STROKES)
+
+        assert cache.get("一", 0xABCD) == self.STROKES
+        assert cache.stats()["hits"] == 1
+
+    def test_near_duplicate_hit(self):
+        cache = PhotoStrokeCache(max_distance=2)
+        cache.set("一", 0b1111_0000, self.STROKES, user_id="u1")
+
+        assert cache.get("一", 0b1111_0011, user_id="u1") == self.STROKES
+        assert cache.get("一", 0b1111_0111, user_id="u1") is None
+        assert cache.stats()["near_hits"] == 1
+
+    def test_user_is_part_of_key(self):
+        cache = PhotoStrokeCache(max_distance=2)
+        cache.set("一", 0b1111_0000, self.STROKES, user_id="u1")
+
+        assert cache.get("一", 0b1111_0000, user_id="u2") is None
+        assert cache.get("一", 0b1111_0001, user_id="u2") is None
+        assert cache.get("一", 0b1111_0000) is None
+
+    def test_anonymous_exact_only(self):
+        cache = PhotoStrokeCache(max_distance=2)
+        cache.set("一", 0b1111_0000, self.STROKES)
+
+        assert cache.get("一", 0b1111_0000) == self.STROKES
+        assert cache.get("一", 0b1111_0001) is None
+
+    def test_character_is_part_of_key(self):
+        cache = PhotoStrokeCache()
+        cache.set("一", 42, self.STROKES)
+
+        assert cache.get("二", 42) is None
+
+    def test_exact_only(self):
+        cache = PhotoStrokeCache(max_distance=0)
+        cache.set("一", 0b10, self.STROKES)
+
+        assert cache.get("一", 0b11) is None
+
+    def test_lru_eviction(self):
+        cache = PhotoStrokeCache(max_size=2, max_distance=0)
+        cache.set("一", 1, self.STROKES)
+        cache.set("二", 2, self.STROKES)
+        cache.get("一", 1)
+        cache.set("三", 3, self.STROKES)
+
+        assert len(cache) == 2
+        assert cache.get("二", 2) is None
+        assert cache.get("一", 1) is not None
+
+    def test_evicted_hash_not_near_matched(self):
+        cache = PhotoStrokeCache(max_size=1, max_distance=4)
+        cache.set("一", 0b1000, self.STROKES, user_id="u1")
+        cache.set("二", 0b1000, self.STROKES, user_id="u1")
+
+        assert cache.get("一", 0b1001, user_id="u1") is None
+
+    def test_returns_copies(self):
+        cache = PhotoStrokeCache()
+        cache.set("一", 1, self.STROKES)
+
+        cache.get("一", 1)[0].append((1.0, 1.0))
+
+        assert cache.get("一", 1) == self.STROKES
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            PhotoStrokeCache(max_size=0)
@@ -0,0 +1,104 @@
+"""
+InkSight Inference Worker Tests - InkSight 推理工作进程测试
+
+Tests for the micro-batching worker process (uses the mock model when
+TensorFlow/InkSight is not installed).
+"""
+
+import asyncio
+import queue
+import pytest
+import numpy as np
+from concurrent.futures import wait
+
+from app.models.inference_worker import InkSightWorker, _process_batch
+from app.models.inksight import InksightResult
+
+
+class _RecordingModel:
+    """Fake model recording batch sizes"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    def predict_batch(self, images):
+        self.batches.append(len(images))
+        if self.fail:
+            raise ValueError("boom")
+        return [
+            InksightResult(trajectory=[(0.1, 0.1)], strokes=[[(0.1, 0.1)]], confidence=float(i))
+            for i in range(len(images))
+        ]
+
+
+class TestProcessBatch:
+    """Test batch execution inside the worker"""
+
+    def test_one_model_call_per_batch(self):
+        model = _RecordingModel()
+        responses = queue.Queue()
+        batch = [(i, np.zeros((8, 8, 3), dtype=np.uint8)) for i in range(3)]
+
+        _process_batch(model, batch, responses)
+
+        assert model.batches == [3]
+        items = [responses.get_nowait() for _ in range(3)]
+        assert [item[0] for item in items] == [0, 1, 2]
+        assert [item[3] for item in items] == [3, 0, 0]  # batch size on first response only
+        assert all(item[2] is None for item in items)
+
+    def test_errors_reported_per_request(self):
+        responses = queue.Queue()
+        batch = [(i, np.zeros((8, 8, 3), dtype=np.uint8)) for i in range(2)]
+
+        _process_batch(_RecordingModel(fail=True), batch, responses)
+
+        items = [responses.get_nowait() for _ in range(2)]
+        assert all(item[1] is None and "boom" in item[2] for item in items)
+
+
+class TestInkSightWorkerClient:
+    """Test client-side validation without a worker process"""
+
+    def test_submit_without_worker_raises(self):
+        worker = InkSightWorker()
+        with pytest.raises(RuntimeError):
+            worker.submit(np.zeros((8, 8, 3), dtype=np.uint8))
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            InkSightWorker(max_batch_size=0)
+
+
+@pytest.mark.slow
+class TestInkSightWorker:
+    """End-to-end tests with a real worker process"""
+
+    @pytest.fixture(scope="class")
+    def worker(self):
+        worker = InkSightWorker(max_batch_size=4, max_wait_ms=200)
+        worker.start()
+        yield worker
+        worker.stop()
+
+    def test_worker_running(self, worker):
+        assert worker.is_running()
+
+    def test_concurrent_requests_are_batched(self, worker):
+        images = [np.full((64, 64, 3), i * 30, dtype=np.uint8) for i in range(8)]
+
+        futures = [worker.submit(image) for image in images]
+        done, not_done = wait(futures, timeout=30)
+
+        assert not not_done
+        assert all(isinstance(f.result(), InksightResult) for f in futures)
+        stats = worker.stats()
+        assert stats["max_batch_size"] > 1
+        assert stats["batches"] < stats["requests"]
+        assert stats["pending"] == 0
+
+    def test_async_predict(self, worker):
+        image = np.zeros((32, 32, 3), dtype=np.uint8)
+        result = asyncio.run(worker.predict(image, timeout=30))
+        assert isinstance(result, InksightResult)
@@ -88,6 +88,46 @@ class TestInkSightModel:
         assert result.strokes is not None
         assert len(result.strokes) >= 1  # At least one stroke
 
+    def test_predict_batch_one_result_per_image(self):
+        """Batch prediction should return results in input order"""
+        model = InkSightModel.get_instance()
+        model.load()
+
+        import numpy as np
+        images = [
+            np.full((64, 64, 3), 255, dtype=np.uint8),
+            np.full((128, 96, 3), 128, dtype=np.uint8),
+            np.zeros((200, 200, 3), dtype=np.uint8),
+        ]
+
+        results = model.predict_batch(images)
+
+        assert len(results) == 3
+        assert all(isinstance(r, InksightResult) for r in results)
+
+    def test_predict_batch_single_model_call(self):
+        """Batch prediction should call the model once with a stacked batch"""
+        from unittest.mock import MagicMock
+        import numpy as np
+
+        model = InkSightModel.get_instance()
+        model.load()
+        original = model.model
+        try:
+            model.model = MagicMock()
+            model.model.predict.return_value = np.zeros((2, 10))
+            results = model.predict_batch([np.zeros((32, 32, 3), dtype=np.uint8)] * 2)
+
+            assert model.model.predict.call_count == 1
+            assert model.model.predict.call_args[0][0].shape == (2, 256, 256, 3)
+            assert len(results) == 2
+        finally:
+            model.model = original
+
+    def test_predict_batch_empty(self):
+        """Empty batch should not touch the model"""
+        assert InkSightModel.get_instance().predict_batch([]) == []
+
 
 class TestInksightResult:
     """Test InksightResult data model"""
@@ -194,6 +234,29 @@ class TestImagePreprocessing:
         assert arr.max() <= 2.0  # Allow for common normalization ranges
         assert arr.min() >= -1.0
 
+    def test_preprocess_image_model_size_input_not_resized(self):
+        """Input already at model size is normalized with a single conversion"""
+        from app.models.inksight import preprocess_image
+
+        import numpy as np
+        test_image = np.random.randint(0, 256, (256, 256, 3), dtype=np.uint8)
+
+        processed = preprocess_image(test_image)
+
+        assert processed.dtype == np.float32
+        np.testing.assert_allclose(processed, test_image / 127.5 - 1.0, atol=1e-6)
+
+    def test_preprocess_image_resizes_and_drops_alpha(self):
+        from app.models.inksight import preprocess_image
+
+        import numpy as np
+        test_image = np.full((300, 200, 4), 255, dtype=np.uint8)
+
+        processed = preprocess_image(test_image)
+
+        assert processed.shape == (256, 256, 3)
+        np.testing.assert_allclose(processed, 1.0)
+
 
 @pytest.mark.slow
 class TestEndToEndInkSight:
@@ -0,0 +1,265 @@
+"""
+Leaderboard Tests - 排行榜测试
+
+Tests for the top-K leaderboard served from the incrementally maintained
+rollup tables (database backend) or Redis sorted sets.
+"""
+
+import asyncio
+
+import pytest
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models import leaderboard as leaderboard_module
+from app.models.leaderboard import Leaderboard
+from app.models.user_progress import PracticeRecordCreate
+from app.models.user_progress_db import UserProgressCRUD
+
+
+def _practice(db, user_id, score, character="永"):
+    UserProgressCRUD.create_practice_record(db, PracticeRecordCreate(
+        user_id=user_id,
+        character=character,
+        total_score=score,
+        stroke_scores=[score],
+        stroke_order_correct=True,
+        time_spent=30.0,
+        stroke_count=5,
+    ))
+
+
+@pytest.fixture
+def practices(db):
+    for user_id, scores in {"a": [90, 70], "b": [95], "c": [60, 60, 60]}.items():
+        for score in scores:
+            _practice(db, user_id, score)
+    _practice(db, "c", 100, character="一")
+    return db
+
+
+class _LoopCheckingRedis:
+    """Redis proxy recording which calls ran on an event-loop thread"""
+
+    def __init__(self, client):
+        self._client = client
+        self.calls = []
+        self.on_loop = []
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def call(*args, **kwargs):
+            self.calls.append(name)
+            try:
+                asyncio.get_running_loop()
+                self.on_loop.append(name)
+            except RuntimeError:
+                pass
+            return method(*args, **kwargs)
+
+        return call
+
+
+@pytest.fixture
+def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis()
+
+
+class TestDatabaseLeaderboard:
+    """Test top-K from the rollup index"""
+
+    def test_top_by_average(self, practices):
+        entries = Leaderboard().top(practices, limit=10)
+
+        assert [(e.user_id, e.average_score, e.practice_count) for e in entries] == [
+            ("b", 95.0, 1), ("a", 80.0, 2), ("c", 70.0, 4),
+        ]
+
+    def test_limit(self, practices):
+        assert [e.user_id for e in Leaderboard().top(practices, limit=2)] == ["b", "a"]
+
+    def test_per_character(self, practices):
+        entries = Leaderboard().top(practices, character="一")
+
+        assert [(e.user_id, e.average_score) for e in entries] == [("c", 100.0)]
+
+    def test_updates_with_new_records(self, practices):
+        board = Leaderboard()
+        _practice(practices, "d", 100)
+
+        assert [e.user_id for e in board.top(practices, limit=2)] == ["d", "b"]
+
+    def test_read_is_single_query(self, practices, count_queries):
+        for i in range(40):
+            _practice(practices, f"user{i}", 50 + i % 40)
+
+        with count_queries as counter:
+            Leaderboard().top(practices, limit=10)
+
+        assert counter.selects == 1
+
+    def test_refresh_window_caches_results(self, practices, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(leaderboard_module.time, "monotonic", lambda: clock[0])
+        board = Leaderboard(refresh_seconds=30)
+
+        first = board.top(practices, limit=1)
+        _practice(practices, "d", 100)
+        cached = board.top(practices, limit=1)
+        clock[0] += 31
+        refreshed = board.top(practices, limit=1)
+
+        assert first[0].user_id == cached[0].user_id == "b"
+        assert refreshed[0].user_id == "d"
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            Leaderboard(backend="memcached")
+
+
+class TestRedisLeaderboard:
+    """Test Redis sorted-set backend"""
+
+    def test_sync_and_read(self, practices, redis_client, count_queries):
+        board = Leaderboard(backend="redis", redis_client=redis_client)
+
+        assert board.sync_to_redis(practices) == 7  # 3 users + 4 user/character pairs
+        with count_queries as counter:
+            entries = board.top(practices, limit=10)
+
+        assert counter.selects == 0
+        assert [(e.user_id, e.average_score, e.practice_count) for e in entries] == [
+            ("b", 95.0, 1), ("a", 80.0, 2), ("c", 70.0, 4),
+        ]
+        assert [e.user_id for e in board.top(practices, character="一")] == ["c"]
+
+    def test_publish_on_new_record(self, db, redis_client, monkeypatch, count_queries):
+        board = Leaderboard(backend="redis", redis_client=redis_client)
+        monkeypatch.setattr(leaderboard_module, "_shared_leaderboard", board)
+        board.sync_to_redis(db)
+
+        _practice(db, "x", 80)
+        _practice(db, "x", 100)
+        _practice(db, "y", 85)
+
+        with count_queries as counter:
+            entries = board.top(db)
+        assert counter.selects == 0
+        assert [(e.user_id, e.average_score, e.practice_count) for e in entries] == [
+            ("x", 90.0, 2), ("y", 85.0, 1),
+        ]
+
+    def test_unsynced_redis_not_served(self, practices, redis_client, monkeypatch):
+        # Redis lost its data: only users who practiced since are in the sorted set
+        board = Leaderboard(backend="redis", redis_client=redis_client)
+        monkeypatch.setattr(leaderboard_module, "_shared_leaderboard", board)
+        _practice(practices, "d", 50)
+
+        entries = board.top(practices, limit=10)
+
+        assert [e.user_id for e in entries] == ["b", "a", "c", "d"]
+
+    def test_missing_marker_reseeds_from_rollups(self, practices, redis_client, engine, count_queries):
+        board = Leaderboard(
+            backend="redis", redis_client=redis_client,
+            session_factory=sessionmaker(bind=engine),
+        )
+
+        assert [e.user_id for e in board.top(practices)] == ["b", "a", "c"]
+        board._reseed_thread.join(timeout=10)
+
+        assert redis_client.exists(Leaderboard.SYNCED_KEY)
+        with count_queries as counter:
+            entries = board.top(practices)
+        assert counter.selects == 0
+        assert [e.user_id for e in entries] == ["b", "a", "c"]
+
+    def test_marker_lost_after_flush(self, practices, redis_client):
+        board = Leaderboard(backend="redis", redis_client=redis_client)
+        board.sync_to_redis(practices)
+        redis_client.flushall()
+        board.publish(practices, "a", "永")
+
+        assert [e.user_id for e in board.top(practices)] == ["b", "a", "c"]
+
+    @pytest.mark.parametrize("limit", [1, 2, 3, 4, 5])
+    def test_ties_ordered_like_database(self, db, redis_client, limit):
+        # Equal averages: more practices first, then user_id descending
+        for user_id, scores in {"p": [80], "q": [80, 80], "r": [80], "s": [90], "t": [70, 90]}.items():
+            for score in scores:
+                _practice(db, user_id, score)
+        board = Leaderboard(backend="redis", redis_client=redis_client)
+        board.sync_to_redis(db)
+
+        from_redis = board.top(db, limit=limit)
+        from_database = Leaderboard().top(db, limit=limit)
+
+        expected = [("s", 1), ("t", 2), ("q", 2), ("r", 1), ("p", 1)][:limit]
+        assert [(e.user_id, e.practice_count) for e in from_database] == expected
+        assert from_redis == from_database
+
+    def test_empty_redis_falls_back_to_database(self, practices, redis_client):
+        board = Leaderboard(backend="redis", redis_client=redis_client)
+
+        assert board.top(practices, limit=1)[0].user_id == "b"
+
+    def test_redis_errors_fall_back_to_database(self, practices):
+        from unittest.mock import MagicMock
+
+        broken = MagicMock()
+        broken.zrevrange.side_effect = ConnectionError("redis down")
+        board = Leaderboard(backend="redis", redis_client=broken)
+
+        assert board.top(practices, limit=1)[0].user_id == "b"
+
+
+class TestLeaderboardEndpoint:
+    """Test GET /api/user-progress/leaderboard"""
+
+    def test_endpoint(self, api_client, monkeypatch):
+        monkeypatch.setattr(leaderboard_module, "_shared_leaderboard", Leaderboard())
+        for user_id, score in (("a", 70), ("b", 90)):
+            api_client.post("/api/user-progress/practice", json={
+                "user_id": user_id,
+                "character": "永",
+                "total_score": score,
+                "stroke_scores": [score],
+                "stroke_order_correct": True,
+                "time_spent": 10.0,
+                "stroke_count": 5,
+            })
+
+        response = api_client.get("/api/user-progress/leaderboard", params={"limit": 5})
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"user_id": "b", "average_score": 90.0, "practice_count": 1},
+            {"user_id": "a", "average_score": 70.0, "practice_count": 1},
+        ]
+
+    def test_redis_calls_off_event_loop(self, api_client, redis_client, monkeypatch):
+        client = _LoopCheckingRedis(redis_client)
+        monkeypatch.setattr(leaderboard_module, "_shared_leaderboard", Leaderboard("redis", client))
+        redis_client.set(Leaderboard.SYNCED_KEY, 1)
+        record = {
+            "user_id": "a",
+            "character": "永",
+            "total_score": 80,
+            "stroke_scores": [80],
+            "stroke_order_correct": True,
+            "time_spent": 10.0,
+            "stroke_count": 5,
+        }
+
+        api_client.post("/api/user-progress/practice", json=record)
+        api_client.post("/api/user-progress/practice/sync", json={"records": [
+            {**record, "user_id": "b", "total_score": 90, "client_record_id": "b-1"},
+        ]})
+        response = api_client.get("/api/user-progress/leaderboard", params={"limit": 5})
+
+        assert [e["user_id"] for e in response.json()] == ["b", "a"]
+        assert client.calls.count("pipeline") == 2
+        assert "zrevrange" in client.calls
+        assert client.on_loop == []
@@ -0,0 +1,131 @@
+"""
+Model Runtime Tests - 模型运行时测试
+
+Tests for guarded one-time loading and bounded inference slots.
+"""
+
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from app.models.model_runtime import ModelRuntime, ModelBusyError, create_runtime
+
+
+class TestLoadOnce:
+    """Test guarded one-time model loading"""
+
+    def test_concurrent_first_requests_load_once(self):
+        runtime = ModelRuntime("test")
+        state = {"loaded": False, "loads": 0}
+
+        def load():
+            time.sleep(0.05)  # Slow load widens the race window
+            state["loads"] += 1
+            state["loaded"] = True
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for _ in range(8):
+                pool.submit(runtime.load_once, lambda: state["loaded"], load)
+
+        assert state["loads"] == 1
+        assert runtime.metrics()["loads"] == 1
+
+    def test_skips_when_already_loaded(self):
+        runtime = ModelRuntime("test")
+        calls = []
+
+        runtime.load_once(lambda: True, lambda: calls.append(1))
+
+        assert calls == []
+
+
+class TestInferenceSlots:
+    """Test bounded concurrency and timeouts"""
+
+    def test_concurrency_bounded_by_slots(self):
+        runtime = ModelRuntime("test", slots=2)
+        active = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def infer():
+            with runtime.slot():
+                with lock:
+                    active["now"] += 1
+                    active["max"] = max(active["max"], active["now"])
+                time.sleep(0.02)
+                with lock:
+                    active["now"] -= 1
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            for _ in range(6):
+                pool.submit(infer)
+
+        metrics = runtime.metrics()
+        assert active["max"] == 2
+        assert metrics["completed"] == 6
+        assert metrics["in_flight"] == 0
+        assert metrics["waiting"] == 0
+        assert metrics["max_waiting"] >= 1
+
+    def test_timeout_raises_model_busy(self):
+        runtime = ModelRuntime("test", slots=1)
+        release = threading.Event()
+        holding = threading.Event()
+
+        def hold():
+            with runtime.slot():
+                holding.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        holding.wait(5)
+        try:
+            with pytest.raises(ModelBusyError):
+                with runtime.slot(timeout=0.05):
+                    pass
+        finally:
+            release.set()
+            holder.join()
+
+        assert runtime.metrics()["timeouts"] == 1
+
+    def test_slot_released_on_error(self):
+        runtime = ModelRuntime("test", slots=1)
+
+        with pytest.raises(ValueError):
+            with runtime.slot():
+                raise ValueError("inference failed")
+
+        with runtime.slot(timeout=0.1):
+            pass
+        assert runtime.metrics()["completed"] == 2
+
+    def test_invalid_slots(self):
+        with pytest.raises(ValueError):
+            ModelRuntime("test", slots=0)
+
+    def test_create_runtime_from_env(self, monkeypatch):
+        monkeypatch.setenv("TESTMODEL_INFERENCE_SLOTS", "3")
+        monkeypatch.setenv("MODEL_SLOT_TIMEOUT", "2.5")
+
+        runtime = create_runtime("test", "TESTMODEL")
+
+        assert runtime.slots == 3
+        assert runtime.slot_timeout == 2.5
+
+    def test_create_runtime_clamps_to_max_slots(self, monkeypatch):
+        monkeypatch.setenv("TESTMODEL_INFERENCE_SLOTS", "4")
+
+        runtime = create_runtime("test", "TESTMODEL", max_slots=1)
+
+        assert runtime.slots == 1
+
+    def test_paddleocr_runtime_single_slot(self, monkeypatch):
+        from app.models.paddle_ocr import PaddleOCRModel
+
+        monkeypatch.setenv("PADDLEOCR_INFERENCE_SLOTS", "4")
+        monkeypatch.setattr(PaddleOCRModel, "_instance", None)
+
+        assert PaddleOCRModel().runtime.slots == 1
@@ -188,3 +188,174 @@ class TestEndToEndOCR:
         assert result is not None
         assert hasattr(result, 'text')
         assert hasattr(result, 'confidence')
+
+
+class _FakeCTCDecode:
+    """Greedy CTC decoder over a tiny charset (index 0 is blank)"""
+
+    character = ["blank", "永", "水", "一"]
+
+    def __call__(self, preds):
+        results = []
+        for probs in preds:
+            best = probs.argmax(axis=1)
+            chars = [self.character[i] for i in best if i != 0]
+            results.append(("".join(dict.fromkeys(chars)), float(probs.max(axis=1).mean())))
+        return results
+
+
+class _FakeTextRecognizer:
+    """
+    Mimics PaddleOCR's TextRecognizer: sorts images by width, runs them in
+    chunks and puts decoder output back in input order. The image's pixel
+    value selects the class (1 = 永 with 水 runner-up, 3 = 一).
+    """
+
+    def __init__(self, batch_num=2):
+        self.postprocess_op = _FakeCTCDecode()
+        self.batch_num = batch_num
+        self.calls = []  # Shared with copies of the recognizer
+
+    def __call__(self, img_list):
+        self.calls.append(len(img_list))
+        indices = np.argsort([img.shape[1] for img in img_list])
+        rec_res = [None] * len(img_list)
+        for beg in range(0, len(img_list), self.batch_num):
+            chunk = indices[beg:beg + self.batch_num]
+            preds = np.zeros((len(chunk), 4, 4), dtype=np.float32)
+            preds[:, :, 0] = 1.0
+            for n, i in enumerate(chunk):
+                cls = int(img_list[i][0, 0, 0])
+                preds[n, 1] = 0.0
+                preds[n, 1, cls] = 0.9
+                if cls == 1:
+                    preds[n, 1, 2] = 0.1
+                    preds[n, 2, 2] = 0.3
+                    preds[n, 2, 0] = 0.7
+            for rno, result in enumerate(self.postprocess_op(preds)):
+                rec_res[chunk[rno]] = result
+        return rec_res, 0.0
+
+
+class TestBatchVerification:
+    """Test verify_characters_batch"""
+
+    @pytest.fixture
+    def recognizer_model(self, monkeypatch):
+        from types import SimpleNamespace
+
+        model = PaddleOCRModel.get_instance()
+        recognizer = _FakeTextRecognizer()
+        monkeypatch.setattr(model, "model", SimpleNamespace(text_recognizer=recognizer))
+        monkeypatch.setattr(model, "_is_loaded", True)
+        return model, recognizer
+
+    @staticmethod
+    def _cell(cls, width):
+        return np.full((48, width, 3), cls, dtype=np.uint8)
+
+    def test_one_recognizer_call_in_input_order(self, recognizer_model):
+        model, recognizer = recognizer_model
+        images = [self._cell(1, 60), self._cell(3, 40), self._cell(1, 50), self._cell(3, 70)]
+
+        results = model.verify_characters_batch(images, ["永", "一", "水", "一"])
+
+        assert recognizer.calls == [4]
+        assert [r.text for r in results] == ["永", "一", "永", "一"]
+        assert [r.verified for r in results] == [True, True, False, True]
+
+    def test_top_k_candidates(self, recognizer_model):
+        model, _ = recognizer_model
+
+        result = model.verify_characters_batch([self._cell(1, 48)], "水", top_k=2)[0]
+
+        assert [c for c, _ in result.candidates] == ["永", "水"]
+        assert result.candidates[0][1] == pytest.approx(0.9)
+        assert result.expected_confidence == pytest.approx(0.3)
+        assert not result.verified
+
+    def test_shared_decoder_untouched(self, recognizer_model):
+        model, recognizer = recognizer_model
+        decode = recognizer.postprocess_op
+
+        model.verify_characters_batch([self._cell(1, 48)], "永")
+
+        assert recognizer.postprocess_op is decode
+        (entry,), _ = recognizer([self._cell(1, 48)])
+        assert len(entry) == 2  # (text, score), as TextSystem expects
+
+    def test_single_expected_character_applies_to_all(self, recognizer_model):
+        model, _ = recognizer_model
+
+        results = model.verify_characters_batch([self._cell(3, 48)] * 3, "一")
+
+        assert [r.expected for r in results] == ["一"] * 3
+        assert all(r.verified for r in results)
+
+    def test_length_mismatch(self, recognizer_model):
+        model, _ = recognizer_model
+
+        with pytest.raises(ValueError):
+            model.verify_characters_batch([self._cell(1, 48)] * 3, ["永", "一"])
+
+    def test_empty_batch(self):
+        assert PaddleOCRModel.get_instance().verify_characters_batch([], []) == []
+
+    def test_mock_model_falls_back_per_image(self):
+        model = PaddleOCRModel.get_instance()
+        model._create_mock_model()
+
+        results = model.verify_characters_batch([np.full((64, 64), 255, dtype=np.uint8)] * 2, "永")
+
+        assert len(results) == 2
+        assert all(isinstance(r.verified, bool) for r in results)
+
+
+class _FakeTextDetector:
+    """One text box covering the whole image"""
+
+    def __call__(self, img):
+        h, w = img.shape[:2]
+        return np.array([[[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]]], dtype=np.float32), 0.0
+
+
+class TestFullOCRAfterBatchVerification:
+    """ocr() goes through PaddleOCR's own TextSystem, which unpacks (text, score)"""
+
+    @pytest.fixture
+    def text_system_model(self, monkeypatch, tmp_path):
+        from types import SimpleNamespace
+
+        paddleocr = pytest.importorskip("paddleocr")
+        from paddleocr.ppocr.postprocess.rec_postprocess import CTCLabelDecode
+
+        keys = tmp_path / "keys.txt"
+        keys.write_text("永\n水\n一\n", encoding="utf-8")
+        recognizer = _FakeTextRecognizer()
+        recognizer.postprocess_op = CTCLabelDecode(character_dict_path=str(keys))
+
+        # Real PaddleOCR/TextSystem code paths without downloading model weights
+        system = paddleocr.PaddleOCR.__new__(paddleocr.PaddleOCR)
+        system.text_detector = _FakeTextDetector()
+        system.text_recognizer = recognizer
+        system.use_angle_cls = False
+        system.drop_score = 0.5
+        system.page_num = 0
+        system.args = SimpleNamespace(det_box_type="quad", save_crop_res=False)
+
+        model = PaddleOCRModel.get_instance()
+        monkeypatch.setattr(model, "model", system)
+        monkeypatch.setattr(model, "_is_loaded", True)
+        return model
+
+    def test_ocr_and_verify_after_batch(self, text_system_model):
+        model = text_system_model
+        cell = np.full((64, 64, 3), 1, dtype=np.uint8)
+
+        batch = model.verify_characters_batch([cell], "永", top_k=2)[0]
+        result = model.ocr(cell)
+
+        assert [c for c, _ in batch.candidates] == ["永", "水"]
+        assert result.text == "永"
+        assert result.confidence == pytest.approx(0.9)
+        assert model.verify_character(cell, "永")
@@ -0,0 +1,28 @@
+"""
+Pagination Tests - 游标分页测试
+
+Tests for the opaque (created_at, id) keyset cursor.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.models.pagination import decode_cursor, encode_cursor
+
+
+class TestCursor:
+    """Test cursor encoding"""
+
+    def test_round_trip(self):
+        created_at = datetime(2024, 3, 1, 9, 30, 15, 123456)
+
+        cursor = encode_cursor(created_at, 42)
+
+        assert decode_cursor(cursor) == (created_at, 42)
+        assert "=" not in cursor
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bnVsbA", "WyJ4IiwxXQ"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
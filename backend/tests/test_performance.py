@@ -5,8 +5,12 @@ Tests for scoring engine performance benchmarks.
 Following TDD principles with RED-GREEN-REFACTOR cycle.
 """
 
+import json
+import subprocess
+import sys
 import pytest
 import time
+from pathlib import Path
 from typing import List, Tuple
 
 from app.algorithms.resampling import resample_stroke
@@ -194,6 +198,78 @@ class TestEndToEndPerformance:
         assert order_result.is_valid
 
 
+class TestPracticeRecordingPerformance:
+    """Benchmark the practice-record write path (record + rollups + goals)"""
+
+    def test_one_commit_per_record_fast(self, engine, db):
+        """Recording a practice should commit once and take < 20ms per record"""
+        from sqlalchemy import event
+
+        from app.models.user_progress import PracticeGoalCreate, PracticeRecordCreate
+        from app.models.user_progress_db import UserProgressCRUD
+
+        for goal_type in ("daily_score", "character_count", "time_spent"):
+            UserProgressCRUD.create_goal(
+                db, PracticeGoalCreate(user_id="bench", goal_type=goal_type, target_value=1e9)
+            )
+
+        commits = []
+
+        def on_commit(conn):
+            commits.append(conn)
+
+        event.listen(engine, "commit", on_commit)
+        try:
+            num_records = 200
+            start = time.perf_counter()
+            for i in range(num_records):
+                UserProgressCRUD.create_practice_record(db, PracticeRecordCreate(
+                    user_id="bench",
+                    character="永一人大小"[i % 5],
+                    total_score=60 + i % 40,
+                    stroke_scores=[80],
+                    stroke_order_correct=True,
+                    time_spent=30.0,
+                    stroke_count=5,
+                ))
+            per_record = (time.perf_counter() - start) / num_records
+        finally:
+            event.remove(engine, "commit", on_commit)
+
+        assert len(commits) / num_records == 1, f"{len(commits) / num_records:.1f} commits per record"
+        assert per_record < 0.02, f"Recording took {per_record * 1000:.2f}ms per record, expected < 20ms"
+
+
+class TestImportPerformance:
+    """Guard API cold-start: importing app.main must not pull in heavy ML stacks"""
+
+    HEAVY_MODULES = ("tensorflow", "transformers", "torch", "paddle", "paddleocr")
+
+    def test_app_main_import_fast_and_lazy(self):
+        """app.main import should be fast (< 3s) and defer TensorFlow/PaddleOCR"""
+        # Fresh interpreter so modules cached by other tests don't hide the cost
+        script = (
+            "import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            "import app.main\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"heavy = [m for m in {self.HEAVY_MODULES!r} if m in sys.modules]\n"
+            "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+        )
+        backend_dir = Path(__file__).resolve().parents[1]
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=backend_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        assert result["heavy"] == [], f"Heavy modules imported eagerly: {result['heavy']}"
+        assert result["elapsed"] < 3.0, f"app.main import took {result['elapsed']:.2f}s, expected < 3s"
+
+
 @pytest.mark.parametrize("num_strokes", [3, 5, 8, 10])
 def test_scaling_with_stroke_count(num_strokes):
     """Test performance scaling with stroke count"""
@@ -13,6 +13,7 @@ import numpy as np
 from pathlib import Path
 
 from app.preprocessing.image import (
+    decode_image,
     preprocess_image,
     binarize_image,
     apply_perspective_transform,
@@ -22,6 +23,10 @@ from app.preprocessing.skeleton import (
     extract_skeleton,
     zhang_suen_thinning,
     create_proximity_mask,
+    proximity_distance,
+    validate_trajectory_with_mask,
+    validate_strokes_with_mask,
+    trajectory_keep_mask,
 )
 
 
@@ -162,6 +167,318 @@ class TestSkeletonExtraction:
         assert np.sum(mask_large > 0) > np.sum(mask_small > 0)
 
 
+def _reference_zhang_suen(binary: np.ndarray, max_iter: int = 100) -> np.ndarray:
+    """Slice-based Zhang-Suen (previous implementation), used as ground truth"""
+
+    def sub_iteration(img, iteration_type):
+        p1 = img[1:-1, 1:-1]
+        p2, p3, p4 = img[0:-2, 1:-1], img[0:-2, 2:], img[1:-1, 2:]
+        p5, p6, p7 = img[2:, 2:], img[2:, 1:-1], img[2:, 0:-2]
+        p8, p9 = img[1:-1, 0:-2], img[0:-2, 0:-2]
+        ring = [p2, p3, p4, p5, p6, p7, p8, p9, p2]
+        A = sum(((a == 0) & (b == 1)).astype(int) for a, b in zip(ring, ring[1:]))
+        B = p2 + p3 + p4 + p5 + p6 + p7 + p8 + p9
+        if iteration_type == 1:
+            cond_1, cond_2 = (p2 * p4 * p6 == 0), (p4 * p6 * p8 != 0)
+        else:
+            cond_1, cond_2 = (p2 * p4 * p8 == 0), (p2 * p6 * p8 != 0)
+        full = np.zeros_like(img, dtype=bool)
+        full[1:-1, 1:-1] = (p1 == 1) & (B >= 2) & (B <= 6) & (A == 1) & cond_1 & cond_2
+        return full
+
+    padded = np.pad(binary.copy(), 1, mode='constant', constant_values=0)
+    changed, iteration = True, 0
+    while changed and iteration < max_iter:
+        iteration += 1
+        removed_1 = sub_iteration(padded, 1)
+        padded = padded ^ removed_1
+        removed_2 = sub_iteration(padded, 2)
+        padded = padded ^ removed_2
+        changed = np.any(removed_1) or np.any(removed_2)
+    return padded[1:-1, 1:-1]
+
+
+class TestZhangSuenLookupTable:
+    """Lookup-table thinning must be bit-identical to the slice-based algorithm"""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_reference_on_random_blobs(self, seed):
+        rng = np.random.default_rng(seed)
+        binary = (rng.random((60, 70)) < 0.6).astype(np.uint8)
+
+        expected = _reference_zhang_suen(binary)
+        thinned = zhang_suen_thinning(binary)
+
+        assert thinned.dtype == expected.dtype
+        np.testing.assert_array_equal(thinned, expected)
+
+    def test_matches_reference_on_character_shape(self):
+        binary = np.zeros((100, 100), dtype=np.uint8)
+        binary[40:60, 20:80] = 1  # Horizontal
+        binary[20:80, 40:60] = 1  # Vertical
+
+        np.testing.assert_array_equal(zhang_suen_thinning(binary), _reference_zhang_suen(binary))
+
+    def test_matches_reference_with_max_iter(self):
+        binary = np.zeros((60, 60), dtype=np.uint8)
+        binary[10:50, 10:50] = 1
+
+        np.testing.assert_array_equal(
+            zhang_suen_thinning(binary, max_iter=2), _reference_zhang_suen(binary, max_iter=2)
+        )
+
+    def test_matches_reference_without_opencv(self, monkeypatch):
+        import app.preprocessing.skeleton as skeleton_module
+
+        monkeypatch.setattr(skeleton_module, "OPENCV_AVAILABLE", False)
+        rng = np.random.default_rng(42)
+        binary = (rng.random((40, 50)) < 0.6).astype(np.uint8)
+
+        np.testing.assert_array_equal(zhang_suen_thinning(binary), _reference_zhang_suen(binary))
+
+    def test_matches_reference_touching_border(self):
+        """Active front must handle strokes running into the image edge"""
+        binary = np.zeros((50, 50), dtype=np.uint8)
+        binary[:, 20:30] = 1
+        binary[0:10, :] = 1
+
+        np.testing.assert_array_equal(zhang_suen_thinning(binary), _reference_zhang_suen(binary))
+
+    def test_active_front_shrinks(self, monkeypatch):
+        """Later iterations evaluate only pixels next to the removed boundary"""
+        import app.preprocessing.skeleton as skeleton_module
+
+        evaluated = []
+        original = skeleton_module._codes_at
+
+        def counting_codes_at(flat, indices, offsets):
+            evaluated.append(indices.size)
+            return original(flat, indices, offsets)
+
+        monkeypatch.setattr(skeleton_module, "_codes_at", counting_codes_at)
+        binary = np.zeros((200, 200), dtype=np.uint8)
+        binary[90:110, 10:190] = 1  # Thin bar in a large image
+
+        skeleton = zhang_suen_thinning(binary)
+
+        np.testing.assert_array_equal(skeleton, _reference_zhang_suen(binary))
+        assert evaluated[-1] < evaluated[0]
+        assert max(evaluated[2:]) < binary.sum()
+
+
+
+def _reference_validate_trajectory(trajectory, mask):
+    """Per-point loop (previous implementation) used as reference"""
+    h, w = mask.shape[:2]
+    valid = []
+    for x, y in trajectory:
+        ix, iy = int(x * w), int(y * h)
+        if 0 <= ix < w and 0 <= iy < h and mask[iy, ix] > 127:
+            valid.append((x, y))
+    return valid
+
+
+class TestTrajectoryMaskValidation:
+    """Vectorized hallucination suppression"""
+
+    @pytest.fixture
+    def mask(self):
+        mask = np.zeros((100, 120), dtype=np.uint8)
+        mask[40:60, 10:110] = 255
+        return mask
+
+    def test_matches_reference_loop(self, mask):
+        rng = np.random.default_rng(0)
+        trajectory = [tuple(p) for p in rng.uniform(-0.2, 1.2, (500, 2))]
+        trajectory += [(-0.001, 0.5), (0.999, 0.5), (1.0, 0.5), (0.5, 0.4), (0.5, 0.6)]
+
+        assert validate_trajectory_with_mask(trajectory, mask) == _reference_validate_trajectory(trajectory, mask)
+
+    def test_keep_mask_matches_filter(self, mask):
+        trajectory = [(0.5, 0.5), (0.5, 0.1), (2.0, 0.5), (0.2, 0.45)]
+
+        valid = validate_trajectory_with_mask(trajectory, mask)
+        keep = trajectory_keep_mask(trajectory, mask)
+
+        assert valid == [(0.5, 0.5), (0.2, 0.45)]
+        assert keep.tolist() == [True, False, False, True]
+
+    def test_empty_trajectory(self, mask):
+        assert validate_trajectory_with_mask([], mask) == []
+
+    def test_batch_over_strokes(self, mask):
+        strokes = [
+            [(0.1, 0.5), (0.5, 0.5), (0.5, 0.9)],
+            [],
+            [(0.5, 0.1), (0.9, 0.45)],
+        ]
+
+        filtered, keeps = validate_strokes_with_mask(strokes, mask)
+
+        assert filtered == [[(0.1, 0.5), (0.5, 0.5)], [], [(0.9, 0.45)]]
+        assert [k.tolist() for k in keeps] == [[True, True, False], [], [False, True]]
+
+        # Keep masks prune associated per-point metadata
+        timestamps = [np.array([0, 10, 20]), np.array([]), np.array([30, 40])]
+        assert [t[k].tolist() for t, k in zip(timestamps, keeps)] == [[0, 10], [], [40]]
+
+    def test_batch_matches_per_stroke_calls(self, mask):
+        rng = np.random.default_rng(1)
+        strokes = [[tuple(p) for p in rng.uniform(0, 1, (n, 2))] for n in (5, 30, 1, 12)]
+
+        filtered, _ = validate_strokes_with_mask(strokes, mask)
+
+        assert filtered == [validate_trajectory_with_mask(stroke, mask) for stroke in strokes]
+
+    def test_no_warning_logged(self, mask, caplog):
+        import logging
+
+        with caplog.at_level(logging.WARNING):
+            validate_trajectory_with_mask([(0.5, 0.1)] * 10, mask)
+
+        assert not caplog.records
+
+
+
+class TestDistanceTransformProximityMask:
+    """Distance-transform proximity mask"""
+
+    @pytest.mark.parametrize("radius", [0, 1, 5, 17])
+    def test_chessboard_matches_square_dilation(self, radius):
+        cv2 = pytest.importorskip("cv2")
+        rng = np.random.default_rng(radius)
+        skeleton = np.where(rng.random((120, 90)) < 0.01, 255, 0).astype(np.uint8)
+
+        kernel = np.ones((2 * radius + 1, 2 * radius + 1), np.uint8)
+        expected = cv2.dilate((skeleton > 127).astype(np.uint8), kernel) * 255
+
+        np.testing.assert_array_equal(create_proximity_mask(skeleton, radius=radius), expected)
+
+    def test_euclidean_is_round(self):
+        pytest.importorskip("cv2")
+        skeleton = np.zeros((101, 101), dtype=np.uint8)
+        skeleton[50, 50] = 255
+
+        mask = create_proximity_mask(skeleton, radius=30, metric="euclidean")
+
+        assert mask[50, 80] == 255
+        assert mask[50 + 25, 50 + 25] == 0  # Corner of the square is outside the disk
+        assert abs(np.sum(mask > 0) - np.pi * 30 ** 2) < 0.05 * np.pi * 30 ** 2
+
+    def test_reduced_resolution(self):
+        pytest.importorskip("cv2")
+        skeleton = np.zeros((400, 400), dtype=np.uint8)
+        skeleton[200, 20:380] = 255
+
+        full = create_proximity_mask(skeleton, radius=20)
+        reduced = create_proximity_mask(skeleton, radius=20, scale=0.25)
+
+        assert reduced.shape == full.shape
+        # Thin skeleton survives downscaling; mask agrees up to block edges
+        assert reduced[200, 200] == 255 and reduced[200 + 15, 200] == 255
+        assert reduced[200 + 40, 200] == 0
+        assert np.mean(reduced == full) > 0.97
+
+    def test_mask_size(self):
+        pytest.importorskip("cv2")
+        skeleton = np.zeros((100, 100), dtype=np.uint8)
+        skeleton[50, :] = 255
+
+        assert create_proximity_mask(skeleton, radius=3, mask_size=(200, 150)).shape == (150, 200)
+
+    def test_distance_map_serves_several_radii(self):
+        pytest.importorskip("cv2")
+        skeleton = np.zeros((60, 60), dtype=np.uint8)
+        skeleton[30, 10:50] = 255
+
+        distance = proximity_distance(skeleton)
+
+        for radius in (2, 8):
+            np.testing.assert_array_equal(
+                np.where(distance <= radius, 255, 0), create_proximity_mask(skeleton, radius=radius)
+            )
+
+    def test_invalid_arguments(self):
+        pytest.importorskip("cv2")
+        skeleton = np.zeros((10, 10), dtype=np.uint8)
+
+        with pytest.raises(ValueError):
+            create_proximity_mask(skeleton, scale=0)
+        with pytest.raises(ValueError):
+            proximity_distance(skeleton, metric="manhattan")
+
+    def test_empty_skeleton(self):
+        pytest.importorskip("cv2")
+        mask = create_proximity_mask(np.zeros((50, 50), dtype=np.uint8), radius=10)
+
+        assert not mask.any()
+
+
+
+def _jpeg_bytes(width, height):
+    import io
+    from PIL import Image
+
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    image[height // 3:height // 2, width // 4:3 * width // 4] = 0
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class TestDecodeImage:
+    """Downscale-on-decode for uploaded photos"""
+
+    def test_full_resolution(self):
+        pytest.importorskip("PIL")
+        decoded = decode_image(_jpeg_bytes(320, 240))
+
+        assert decoded.shape == (240, 320, 3)
+        assert decoded.dtype == np.uint8
+
+    def test_downscales_to_max_size(self):
+        pytest.importorskip("PIL")
+        decoded = decode_image(_jpeg_bytes(4000, 3000), max_size=512)
+
+        assert decoded.shape == (384, 512, 3)
+        # Content survives: dark bar in the upper middle
+        assert decoded[150, 256].mean() < 50 and decoded[300, 256].mean() > 200
+
+    def test_grayscale(self):
+        pytest.importorskip("PIL")
+        assert decode_image(_jpeg_bytes(800, 600), max_size=400, grayscale=True).shape == (300, 400)
+
+    def test_jpeg_never_materialized_at_full_size(self, monkeypatch):
+        """Draft mode reduces the decode size before any pixel is decoded"""
+        JpegImagePlugin = pytest.importorskip("PIL.JpegImagePlugin")
+
+        loaded_sizes = []
+        original_load = JpegImagePlugin.JpegImageFile.load
+
+        def recording_load(self):
+            loaded_sizes.append(self.size)
+            return original_load(self)
+
+        monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "load", recording_load)
+        decode_image(_jpeg_bytes(4000, 3000), max_size=512)
+
+        assert loaded_sizes
+        assert max(max(size) for size in loaded_sizes) <= 1000  # 1/4 scale decode
+
+    def test_png_is_downscaled(self):
+        import io
+        PIL_Image = pytest.importorskip("PIL.Image")
+
+        buffer = io.BytesIO()
+        PIL_Image.fromarray(np.zeros((600, 900, 3), dtype=np.uint8)).save(buffer, format="PNG")
+
+        assert decode_image(buffer.getvalue(), max_size=300).shape == (200, 300, 3)
+
+    def test_invalid_bytes(self):
+        with pytest.raises(ValueError):
+            decode_image(b"not an image")
+
+
 class TestIntegration:
     """Integration tests for preprocessing pipeline"""
 
@@ -0,0 +1,235 @@
+"""
+Query Plan Tests - 查询计划回归测试
+
+Runs the hot progress / custom-character queries and asserts (via EXPLAIN)
+that they are served by the composite indexes instead of full scans or
+sorts. Always runs on SQLite; set TEST_POSTGRES_URL to also check a
+PostgreSQL database (tables are created in a throwaway schema).
+
+Also checks that the Alembic migrations produce the same indexes as the
+models (and backfill the custom-character tag index) when alembic is
+installed.
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.base import Base
+from app.models.custom_character_db import CustomCharacterCRUD
+from app.models.leaderboard import Leaderboard
+from app.models.user_progress_db import PracticeRecordDB, UserProgressCRUD
+
+
+def _sqlite_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine, lambda: None
+
+
+def _postgres_engine():
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    pytest.importorskip("psycopg2")
+
+    schema = f"plan_test_{uuid.uuid4().hex[:8]}"
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    Base.metadata.create_all(engine)
+
+    def drop():
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        engine.dispose()
+
+    return engine, drop
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def plan_db(request):
+    engine, drop = _sqlite_engine() if request.param == "sqlite" else _postgres_engine()
+    session = sessionmaker(bind=engine, autoflush=False)()
+
+    base = datetime(2024, 3, 1, 9, 0)
+    session.add_all(
+        PracticeRecordDB(
+            user_id=f"u{i % 20}", character="永一人大小"[i % 5], total_score=50 + i % 50,
+            stroke_scores=[80], stroke_order_correct=True, time_spent=10.0, stroke_count=5,
+            score_level="pass", created_at=base + timedelta(minutes=i),
+        )
+        for i in range(400)
+    )
+    session.commit()
+    UserProgressCRUD.backfill_rollups(session)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    yield engine, session
+
+    session.close()
+    drop()
+
+
+def _plans(engine, fn):
+    """Run fn() and return the EXPLAIN output of every SELECT it executed"""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # Tiny tables: make the planner prefer any usable index
+            conn.execute(text("SET enable_seqscan = off"))
+            for statement, parameters in captured:
+                rows = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+                plans.append(json.dumps(rows))
+        else:
+            for statement, parameters in captured:
+                rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                plans.append("\n".join(row[-1] for row in rows))
+    return plans
+
+
+def _assert_uses(plan, index, sorted_by_index=True):
+    assert index in plan, f"expected {index} in plan:\n{plan}"
+    if sorted_by_index:
+        assert "TEMP B-TREE" not in plan and '"Sort"' not in plan, f"unexpected sort in plan:\n{plan}"
+
+
+class TestHotQueryPlans:
+    """Hot queries must use their composite indexes"""
+
+    def test_record_listing_pages(self, plan_db):
+        engine, db = plan_db
+        _, _, cursor = UserProgressCRUD.get_user_records(db, "u3", limit=5)
+
+        first, deep = _plans(engine, lambda: (
+            UserProgressCRUD.get_user_records(db, "u3", limit=5),
+            UserProgressCRUD.get_user_records(db, "u3", cursor=cursor, limit=5),
+        ))
+
+        _assert_uses(first, "ix_practice_records_user_created")
+        _assert_uses(deep, "ix_practice_records_user_created")
+
+    def test_rollup_rebuild_per_character(self, plan_db):
+        engine, db = plan_db
+
+        plans = _plans(engine, lambda: UserProgressCRUD.rebuild_rollup(db, "u3"))
+        db.rollback()
+
+        assert any("ix_practice_records_user_character" in plan for plan in plans), "\n\n".join(plans)
+
+    def test_most_practiced_characters(self, plan_db):
+        engine, db = plan_db
+
+        (plan,) = _plans(engine, lambda: UserProgressCRUD.get_most_practiced_characters(db))
+
+        assert "ix_practice_records_character" in plan, plan
+
+    def test_summary_without_rollup_checks_index(self, plan_db):
+        engine, db = plan_db
+
+        plans = _plans(engine, lambda: UserProgressCRUD.get_progress_summary(db, "nobody"))
+
+        # EXISTS on practice_records instead of rebuilding the rollup
+        assert any("ix_practice_records_user_" in plan for plan in plans), "\n\n".join(plans)
+
+    def test_character_leaderboard(self, plan_db):
+        engine, db = plan_db
+
+        (plan,) = _plans(engine, lambda: Leaderboard().top(db, character="永", limit=5))
+
+        _assert_uses(plan, "ix_user_character_rollup_character_ranking")
+
+    def test_global_leaderboard(self, plan_db):
+        engine, db = plan_db
+
+        (plan,) = _plans(engine, lambda: Leaderboard().top(db, limit=5))
+
+        _assert_uses(plan, "ix_user_progress_rollup_ranking")
+
+    def test_custom_character_listing_by_creator(self, plan_db):
+        engine, db = plan_db
+
+        (plan,) = _plans(engine, lambda: CustomCharacterCRUD.get_multi(db, creator_id="t1", limit=5))
+
+        _assert_uses(plan, "ix_custom_characters_creator_created")
+
+    def test_custom_character_tag_search(self, plan_db):
+        engine, db = plan_db
+
+        (plan,) = _plans(engine, lambda: CustomCharacterCRUD.search_by_tags(db, ["一年级", "基础"]))
+
+        # One primary-key lookup per tag, never a scan of either table
+        assert plan.count("custom_character_tags") >= 2, plan
+        assert "SCAN custom_character" not in plan and '"Seq Scan"' not in plan, plan
+
+
+class TestMigrations:
+    """Alembic migrations must build the schema the models declare"""
+
+    def test_upgrade_matches_models(self, tmp_path, monkeypatch):
+        # The backend's own alembic/ directory imports as a namespace package
+        pytest.importorskip("alembic.command")
+        from alembic import command
+        from alembic.config import Config
+
+        backend_dir = Path(__file__).resolve().parents[1]
+        url = f"sqlite:///{tmp_path / 'migrated.db'}"
+        monkeypatch.setenv("DATABASE_URL", url)
+        config = Config(str(backend_dir / "alembic.ini"))
+        config.set_main_option("script_location", str(backend_dir / "alembic"))
+
+        command.upgrade(config, "head")
+
+        migrated = inspect(create_engine(url))
+        expected = inspect(_sqlite_engine()[0])
+        assert set(migrated.get_table_names()) - {"alembic_version"} == set(expected.get_table_names())
+        for table in expected.get_table_names():
+            assert {i["name"] for i in migrated.get_indexes(table)} == \
+                {i["name"] for i in expected.get_indexes(table)}, table
+
+        command.downgrade(config, "base")
+        assert set(inspect(create_engine(url)).get_table_names()) == {"alembic_version"}
+
+    def test_tag_index_backfill(self, tmp_path, monkeypatch):
+        pytest.importorskip("alembic.command")
+        from alembic import command
+        from alembic.config import Config
+
+        backend_dir = Path(__file__).resolve().parents[1]
+        url = f"sqlite:///{tmp_path / 'migrated.db'}"
+        monkeypatch.setenv("DATABASE_URL", url)
+        config = Config(str(backend_dir / "alembic.ini"))
+        config.set_main_option("script_location", str(backend_dir / "alembic"))
+
+        command.upgrade(config, "0002_progress_composite_indexes")
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO custom_characters (id, char, style, strokes, creator_id, creator_name, tags) "
+                "VALUES (1, '永', 'custom', '[]', 't1', '王老师', :tags)"
+            ), {"tags": json.dumps(["一年级", " 基础", "基础", "长" * 101])})
+        command.upgrade(config, "head")
+
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT tag, character_id FROM custom_character_tags ORDER BY tag")).all()
+        assert [tuple(row) for row in rows] == [("一年级", 1), ("基础", 1)]
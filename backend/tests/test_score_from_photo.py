@@ -1,8 +1,16 @@
 import base64
+import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 
 from app.main import app
+from app.preprocessing import fingerprint
+
+
+@pytest.fixture(autouse=True)
+def _fresh_photo_cache(monkeypatch):
+    # Each test starts with an empty photo stroke cache
+    monkeypatch.setattr(fingerprint, "_shared_cache", None)
 
 
 def _blank_png_bytes() -> bytes:
@@ -29,3 +37,188 @@ def test_score_from_photo_no_strokes_detected():
     assert response.status_code == 422
     data = response.json()
     assert data["detail"]["error_type"] == "no_strokes_detected"
+
+
+def test_score_from_photo_model_busy():
+    from app.models.model_runtime import ModelBusyError
+
+    client = TestClient(app)
+    image_bytes = _blank_png_bytes()
+
+    with patch("app.api.scoring._extract_user_strokes_from_photo") as mock_extract:
+        mock_extract.side_effect = ModelBusyError("InkSight is busy")
+        response = client.post(
+            "/api/score/from_photo",
+            files={"image": ("blank.png", image_bytes, "image/png")},
+            data={"character": "永"},
+        )
+
+    assert response.status_code == 503
+    assert response.json()["detail"]["error_type"] == "model_busy"
+
+
+def _ink_line_png_bytes() -> bytes:
+    import io
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (200, 200), "white")
+    ImageDraw.Draw(img).line([(30, 100), (170, 100)], fill="black", width=12)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_extract_falls_back_to_skeleton_strokes(monkeypatch):
+    from app.api.scoring import _extract_user_strokes_from_photo
+
+    monkeypatch.delenv("INKSIGHT_WORKER_ENABLED", raising=False)
+    monkeypatch.setenv("SKELETON_FALLBACK_ENABLED", "true")
+
+    with patch("app.models.inksight.InkSightModel.predict") as mock_predict:
+        mock_predict.side_effect = RuntimeError("model unavailable")
+        with patch("app.models.inksight.InkSightModel.load"):
+            strokes = _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+
+    assert strokes is not None
+    assert len(strokes) == 1
+    assert strokes[0][0][0] < strokes[0][-1][0]
+
+
+def test_extract_fallback_disabled(monkeypatch):
+    from app.api.scoring import _extract_user_strokes_from_photo
+
+    monkeypatch.delenv("INKSIGHT_WORKER_ENABLED", raising=False)
+    monkeypatch.setenv("SKELETON_FALLBACK_ENABLED", "false")
+
+    with patch("app.models.inksight.InkSightModel.predict") as mock_predict:
+        mock_predict.side_effect = RuntimeError("model unavailable")
+        with patch("app.models.inksight.InkSightModel.load"):
+            assert _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一") is None
+
+
+def test_busy_model_uses_skeleton_fallback(monkeypatch):
+    from app.api.scoring import _extract_user_strokes_from_photo
+    from app.models.model_runtime import ModelBusyError
+
+    monkeypatch.delenv("INKSIGHT_WORKER_ENABLED", raising=False)
+    monkeypatch.setenv("SKELETON_FALLBACK_ENABLED", "true")
+
+    with patch("app.models.inksight.InkSightModel.predict") as mock_predict:
+        mock_predict.side_effect = ModelBusyError("InkSight is busy")
+        with patch("app.models.inksight.InkSightModel.load"):
+            strokes = _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+
+    assert strokes and len(strokes) == 1
+
+
+def _ink_line_jpeg_bytes(size: int) -> bytes:
+    import io
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(_ink_line_png_bytes())).resize((size, size))
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def test_duplicate_upload_skips_model(monkeypatch):
+    from app.api.scoring import _extract_user_strokes_from_photo
+    from app.models.inksight import InksightResult
+
+    monkeypatch.delenv("INKSIGHT_WORKER_ENABLED", raising=False)
+    monkeypatch.delenv("PHOTO_CACHE_SIZE", raising=False)
+
+    model_strokes = [[(0.1, 0.5), (0.5, 0.5), (0.9, 0.5)]]
+    with patch("app.models.inksight.InkSightModel.get_instance") as mock_instance:
+        mock_predict = mock_instance.return_value.predict
+        mock_predict.return_value = InksightResult(
+            trajectory=model_strokes[0], strokes=model_strokes, confidence=0.9
+        )
+        first = _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一", "user_1")
+        # Same photo re-encoded at another size: near-duplicate hash
+        second = _extract_user_strokes_from_photo(_ink_line_jpeg_bytes(320), "一", "user_1")
+        other_character = _extract_user_strokes_from_photo(_ink_line_png_bytes(), "二", "user_1")
+
+    assert first == second == model_strokes
+    assert other_character == model_strokes
+    assert mock_predict.call_count == 2
+
+
+def test_duplicate_cache_scoped_by_user(monkeypatch):
+    from app.api.scoring import _extract_user_strokes_from_photo
+    from app.models.inksight import InksightResult
+
+    monkeypatch.delenv("INKSIGHT_WORKER_ENABLED", raising=False)
+    monkeypatch.delenv("PHOTO_CACHE_SIZE", raising=False)
+
+    model_strokes = [[(0.1, 0.5), (0.5, 0.5), (0.9, 0.5)]]
+    with patch("app.models.inksight.InkSightModel.get_instance") as mock_instance:
+        mock_predict = mock_instance.return_value.predict
+        mock_predict.return_value = InksightResult(
+            trajectory=model_strokes[0], strokes=model_strokes, confidence=0.9
+        )
+        _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一", "user_1")
+        # Another user's photos of the same character run the model
+        _extract_user_strokes_from_photo(_ink_line_jpeg_bytes(320), "一", "user_2")
+        _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一", "user_2")
+        # Anonymous uploads do not see users' entries
+        _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+
+    assert mock_predict.call_count == 3
+
+
+def test_busy_fallback_not_cached(monkeypatch):
+    from app.api.scoring import _extract_user_strokes_from_photo
+    from app.models.model_runtime import ModelBusyError
+
+    monkeypatch.delenv("INKSIGHT_WORKER_ENABLED", raising=False)
+    monkeypatch.setenv("SKELETON_FALLBACK_ENABLED", "true")
+
+    with patch("app.models.inksight.InkSightModel.get_instance") as mock_instance:
+        mock_predict = mock_instance.return_value.predict
+        mock_predict.side_effect = ModelBusyError("InkSight is busy")
+        _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+        _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+
+    assert mock_predict.call_count == 2
+
+
+def test_failure_fallback_not_cached(monkeypatch):
+    from app.api.scoring import _extract_user_strokes_from_photo
+    from app.models.inksight import InksightResult
+
+    monkeypatch.delenv("INKSIGHT_WORKER_ENABLED", raising=False)
+    monkeypatch.delenv("PHOTO_CACHE_SIZE", raising=False)
+    monkeypatch.setenv("SKELETON_FALLBACK_ENABLED", "true")
+
+    model_strokes = [[(0.1, 0.5), (0.5, 0.5), (0.9, 0.5)]]
+    with patch("app.models.inksight.InkSightModel.get_instance") as mock_instance:
+        mock_predict = mock_instance.return_value.predict
+        mock_predict.side_effect = RuntimeError("model unavailable")
+        degraded = _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+
+        # Model recovers: the retry must reach it instead of the cached fallback
+        mock_predict.side_effect = None
+        mock_predict.return_value = InksightResult(
+            trajectory=model_strokes[0], strokes=model_strokes, confidence=0.9
+        )
+        recovered = _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+
+    assert degraded and degraded != model_strokes
+    assert recovered == model_strokes
+    assert mock_predict.call_count == 2
+
+
+def test_cache_disabled(monkeypatch):
+    from app.api.scoring import _extract_user_strokes_from_photo
+
+    monkeypatch.delenv("INKSIGHT_WORKER_ENABLED", raising=False)
+    monkeypatch.setenv("PHOTO_CACHE_SIZE", "0")
+
+    with patch("app.models.inksight.InkSightModel.get_instance") as mock_instance:
+        mock_predict = mock_instance.return_value.predict
+        mock_predict.side_effect = RuntimeError("model unavailable")
+        _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+        _extract_user_strokes_from_photo(_ink_line_png_bytes(), "一")
+
+    assert mock_predict.call_count == 2
@@ -0,0 +1,193 @@
+"""
+Skeleton Stroke Graph Tests - 骨架笔画图测试
+
+Tests for endpoint/junction classification, chain tracing and the
+CPU-only stroke extraction used as InkSight fallback.
+"""
+
+import pytest
+import numpy as np
+
+cv2 = pytest.importorskip("cv2")
+
+from app.preprocessing.skeleton import zhang_suen_thinning
+from app.preprocessing.stroke_graph import (
+    classify_skeleton_pixels,
+    skeleton_to_polylines,
+    skeleton_to_strokes,
+    extract_strokes_from_image,
+)
+from app.scoring.stroke_order import validate_stroke_order
+
+
+def _draw(lines, size=400, width=20):
+    """White paper with black ink lines"""
+    image = np.full((size, size, 3), 255, dtype=np.uint8)
+    for start, end in lines:
+        cv2.line(image, start, end, (0, 0, 0), width)
+    return image
+
+
+class TestClassifySkeletonPixels:
+    """Test endpoint and junction detection"""
+
+    def test_line_has_two_endpoints(self):
+        skeleton = np.zeros((20, 20), dtype=np.uint8)
+        skeleton[10, 2:18] = 1
+
+        endpoints, junctions = classify_skeleton_pixels(skeleton)
+
+        assert endpoints.sum() == 2
+        assert endpoints[10, 2] and endpoints[10, 17]
+        assert junctions.sum() == 0
+
+    def test_cross_has_junction(self):
+        skeleton = np.zeros((21, 21), dtype=np.uint8)
+        skeleton[10, 2:19] = 1
+        skeleton[2:19, 10] = 1
+
+        endpoints, junctions = classify_skeleton_pixels(skeleton)
+
+        assert endpoints.sum() == 4
+        assert junctions[10, 10]
+
+    def test_staircase_is_not_junction(self):
+        skeleton = np.zeros((10, 10), dtype=np.uint8)
+        for i in range(2, 8):
+            skeleton[i, i] = 1
+            skeleton[i, i + 1] = 1
+
+        _, junctions = classify_skeleton_pixels(skeleton)
+
+        assert junctions.sum() == 0
+
+
+class TestSkeletonToPolylines:
+    """Test chain tracing and graph simplification"""
+
+    def test_line_is_one_ordered_polyline(self):
+        skeleton = np.zeros((20, 30), dtype=np.uint8)
+        skeleton[10, 3:27] = 1
+
+        polylines = skeleton_to_polylines(skeleton)
+
+        assert len(polylines) == 1
+        xs = [x for x, _ in polylines[0]]
+        assert len(xs) == 24
+        assert xs == sorted(xs) or xs == sorted(xs, reverse=True)
+
+    def test_cross_joins_opposite_branches(self):
+        skeleton = np.zeros((41, 41), dtype=np.uint8)
+        skeleton[20, 5:36] = 1
+        skeleton[5:36, 20] = 1
+
+        polylines = skeleton_to_polylines(skeleton)
+
+        assert len(polylines) == 2
+        assert sorted(len(p) for p in polylines) == [31, 31]
+
+    def test_short_spur_pruned(self):
+        skeleton = np.zeros((30, 40), dtype=np.uint8)
+        skeleton[15, 3:37] = 1
+        skeleton[12:15, 20] = 1  # 3-pixel spur
+
+        polylines = skeleton_to_polylines(skeleton, spur_length=5)
+
+        assert len(polylines) == 1
+        assert len(polylines[0]) == 34
+
+    def test_closed_loop(self):
+        skeleton = np.zeros((40, 40), dtype=np.uint8)
+        cv2.rectangle(skeleton, (10, 10), (30, 30), 1, 1)
+
+        polylines = skeleton_to_polylines(skeleton)
+
+        assert len(polylines) == 1
+        assert len(polylines[0]) >= 80
+
+    def test_empty_skeleton(self):
+        assert skeleton_to_polylines(np.zeros((10, 10), dtype=np.uint8)) == []
+
+
+class TestSkeletonToStrokes:
+    """Test normalization, orientation and ordering"""
+
+    def test_strokes_normalized_and_oriented(self):
+        skeleton = np.zeros((101, 101), dtype=np.uint8)
+        skeleton[50, 10:91] = 1
+
+        strokes = skeleton_to_strokes(skeleton)
+
+        assert len(strokes) == 1
+        (start_x, start_y), (end_x, end_y) = strokes[0][0], strokes[0][-1]
+        assert start_x == pytest.approx(0.1)
+        assert end_x == pytest.approx(0.9)
+        assert start_y == pytest.approx(0.5)
+        assert end_y == pytest.approx(0.5)
+
+    def test_strokes_ordered_top_to_bottom(self):
+        skeleton = np.zeros((101, 101), dtype=np.uint8)
+        skeleton[80, 10:91] = 1
+        skeleton[20, 30:71] = 1
+
+        strokes = skeleton_to_strokes(skeleton)
+
+        assert [round(s[0][1], 1) for s in strokes] == [0.2, 0.8]
+
+    def test_step_keeps_last_point(self):
+        skeleton = np.zeros((20, 30), dtype=np.uint8)
+        skeleton[10, 3:27] = 1
+
+        strokes = skeleton_to_strokes(skeleton, step=5)
+
+        assert strokes[0][-1][0] == pytest.approx(26 / 29)
+        assert len(strokes[0]) == 6
+
+
+class TestExtractStrokesFromImage:
+    """Test full CPU-only extraction on synthetic characters"""
+
+    @pytest.mark.parametrize("lines,expected", [
+        ([((50, 200), (350, 200))], 1),                                  # 一
+        ([((50, 150), (350, 150)), ((200, 40), (200, 360))], 2),         # 十
+        ([((100, 120), (300, 120)), ((50, 300), (350, 300))], 2),        # 二
+        ([((200, 60), (80, 340)), ((190, 150), (330, 340))], 2),         # 人
+    ])
+    def test_stroke_count(self, lines, expected):
+        assert len(extract_strokes_from_image(_draw(lines))) == expected
+
+    def test_matches_template_stroke_order(self):
+        template = [
+            [(0.25, 0.3), (0.5, 0.3), (0.75, 0.3)],
+            [(0.12, 0.75), (0.5, 0.75), (0.88, 0.75)],
+        ]
+        strokes = extract_strokes_from_image(_draw([((100, 120), (300, 120)), ((50, 300), (350, 300))]))
+
+        result = validate_stroke_order(strokes, template)
+
+        assert result.stroke_count_match
+        assert result.is_valid
+
+    def test_blank_image_has_no_strokes(self):
+        assert extract_strokes_from_image(np.full((100, 100, 3), 255, dtype=np.uint8)) == []
+
+    def test_large_photo_downscaled(self):
+        image = _draw([((500, 2000), (3500, 2000))], size=4000, width=150)
+
+        strokes = extract_strokes_from_image(image)
+
+        assert len(strokes) == 1
+        assert strokes[0][0][0] < 0.2 and strokes[0][-1][0] > 0.8
+
+
+class TestStandardThinning:
+    """Textbook conditions keep diagonal strokes free of side branches"""
+
+    def test_diagonal_has_two_endpoints(self):
+        binary = np.zeros((200, 200), dtype=np.uint8)
+        cv2.line(binary, (30, 30), (170, 170), 1, 12)
+
+        skeleton = zhang_suen_thinning(binary, standard=True)
+        endpoints, _ = classify_skeleton_pixels(skeleton)
+
+        assert endpoints.sum() == 2
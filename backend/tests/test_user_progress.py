@@ -0,0 +1,741 @@
+"""
+User Progress Tests - 用户进度测试
+
+Tests for practice record CRUD and the incrementally maintained
+per-user / per-character rollup tables.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.user_progress import PracticeGoalCreate, PracticeRecordCreate, PracticeRecordSyncItem
+from app.models.user_progress_db import (
+    DailyUserStatsDB,
+    PracticeGoalDB,
+    PracticeRecordDB,
+    UserCharacterRollupDB,
+    UserProgressCRUD,
+    UserProgressRollupDB,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls datetime.utcnow() inside user_progress_db"""
+    import app.models.user_progress_db as module
+
+    class FakeDatetime(datetime):
+        now_value = datetime(2024, 3, 10, 12, 0)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now_value
+
+    monkeypatch.setattr(module, "datetime", FakeDatetime)
+    return FakeDatetime
+
+
+def _record(user_id="u1", character="永", score=80, **kwargs):
+    data = dict(
+        user_id=user_id,
+        character=character,
+        total_score=score,
+        stroke_scores=[score],
+        stroke_order_correct=True,
+        time_spent=60.0,
+        stroke_count=5,
+    )
+    data.update(kwargs)
+    return PracticeRecordCreate(**data)
+
+
+def _summary_from_records(db, user_id):
+    """Reference summary rebuilt from the full history"""
+    UserProgressCRUD.rebuild_rollup(db, user_id)
+    db.commit()
+    return UserProgressCRUD.get_progress_summary(db, user_id)
+
+
+class TestProgressRollup:
+    """Test rollup maintained by create_practice_record"""
+
+    def test_empty_user(self, db):
+        summary = UserProgressCRUD.get_progress_summary(db, "nobody")
+
+        assert summary["total_practices"] == 0
+        assert summary["character_stats"] == {}
+        assert db.get(UserProgressRollupDB, "nobody") is None
+
+    def test_rollup_updated_with_record(self, db):
+        UserProgressCRUD.create_practice_record(db, _record(score=70, posture_score=80, grip_correct=True))
+        UserProgressCRUD.create_practice_record(db, _record(score=90, posture_score=60, grip_correct=False))
+        UserProgressCRUD.create_practice_record(db, _record(character="一", score=50))
+
+        summary = UserProgressCRUD.get_progress_summary(db, "u1")
+
+        assert summary["total_practices"] == 3
+        assert summary["unique_characters"] == 2
+        assert summary["average_score"] == pytest.approx(70.0)
+        assert summary["best_score"] == 90
+        assert summary["total_time_spent"] == pytest.approx(180 / 3600)
+        assert summary["recent_scores"] == [50, 90, 70]
+        assert summary["character_stats"] == {
+            "一": {"count": 1, "average_score": 50.0},
+            "永": {"count": 2, "average_score": 80.0},
+        }
+        assert summary["posture_avg_score"] == pytest.approx(70.0)
+        assert summary["grip_correct_rate"] == pytest.approx(50.0)
+
+    def test_insert_rollup_if_missing(self, db):
+        assert UserProgressCRUD._insert_rollup_if_missing(db, "u1")
+        assert not UserProgressCRUD._insert_rollup_if_missing(db, "u1")
+        assert db.query(UserProgressRollupDB).count() == 1
+
+    def test_concurrent_first_practice(self, engine, db, monkeypatch):
+        from sqlalchemy import event
+        from sqlalchemy.orm import sessionmaker
+
+        other = sessionmaker(bind=engine, autoflush=False)()
+        fired = []
+        inserted = []
+        insert_rollup = UserProgressCRUD._insert_rollup_if_missing
+
+        def record_insert(session, user_id):
+            inserted.append(insert_rollup(session, user_id))
+            return inserted[-1]
+
+        monkeypatch.setattr(UserProgressCRUD, "_insert_rollup_if_missing", staticmethod(record_insert))
+
+        def other_request_commits_first(conn, cursor, statement, parameters, context, executemany):
+            # Runs right after this session found no rollup row
+            if not fired and "FROM user_progress_rollup" in statement:
+                fired.append(True)
+                UserProgressCRUD.create_practice_record(other, _record(score=60))
+
+        event.listen(engine, "after_cursor_execute", other_request_commits_first)
+        try:
+            UserProgressCRUD.create_practice_record(db, _record(character="一", score=90))
+        finally:
+            event.remove(engine, "after_cursor_execute", other_request_commits_first)
+            other.close()
+
+        summary = UserProgressCRUD.get_progress_summary(db, "u1")
+        assert fired
+        # The other request inserted the rollup row; this one updated it incrementally
+        assert inserted == [True, False]
+        assert db.query(PracticeRecordDB).count() == 2
+        assert summary["total_practices"] == 2
+        assert summary["average_score"] == pytest.approx(75.0)
+        assert summary["character_stats"] == {
+            "一": {"count": 1, "average_score": 90.0},
+            "永": {"count": 1, "average_score": 60.0},
+        }
+
+    def test_recent_scores_bounded(self, db):
+        for score in range(60, 75):
+            UserProgressCRUD.create_practice_record(db, _record(score=score))
+
+        summary = UserProgressCRUD.get_progress_summary(db, "u1")
+
+        assert summary["recent_scores"] == list(range(74, 64, -1))
+
+    def test_matches_full_recompute(self, db):
+        scores = [55, 91, 78, 64, 88, 100, 42]
+        for i, score in enumerate(scores):
+            UserProgressCRUD.create_practice_record(
+                db, _record(character="永一人"[i % 3], score=score, posture_score=score if i % 2 else None)
+            )
+        incremental = UserProgressCRUD.get_progress_summary(db, "u1")
+
+        assert _summary_from_records(db, "u1") == incremental
+
+    def test_users_isolated(self, db):
+        UserProgressCRUD.create_practice_record(db, _record(user_id="a", score=90))
+        UserProgressCRUD.create_practice_record(db, _record(user_id="b", score=30))
+
+        assert UserProgressCRUD.get_progress_summary(db, "a")["best_score"] == 90
+        assert UserProgressCRUD.get_progress_summary(db, "b")["best_score"] == 30
+
+    def test_summary_is_single_query(self, db, count_queries):
+        for i in range(30):
+            UserProgressCRUD.create_practice_record(db, _record(character="永一人"[i % 3], score=60 + i))
+        db.expire_all()
+
+        with count_queries as counter:
+            summary = UserProgressCRUD.get_progress_summary(db, "u1")
+
+        assert summary["total_practices"] == 30
+        assert counter.selects == 1
+
+    def test_history_before_rollup_is_backfilled(self, db):
+        # Records written without the rollup (existing data)
+        for score in (60, 80):
+            db.add(PracticeRecordDB(
+                user_id="old", character="永", total_score=score, stroke_scores=[score],
+                stroke_order_correct=True, time_spent=30.0, stroke_count=5, score_level="pass",
+            ))
+        db.commit()
+
+        UserProgressCRUD.create_practice_record(db, _record(user_id="old", score=100))
+        summary = UserProgressCRUD.get_progress_summary(db, "old")
+
+        assert summary["total_practices"] == 3
+        assert summary["average_score"] == pytest.approx(80.0)
+        assert summary["character_stats"]["永"]["count"] == 3
+
+    def test_backfill_rollups(self, db):
+        for user_id in ("x", "y"):
+            db.add(PracticeRecordDB(
+                user_id=user_id, character="一", total_score=75, stroke_scores=[75],
+                stroke_order_correct=True, time_spent=10.0, stroke_count=1, score_level="pass",
+            ))
+        db.commit()
+
+        assert UserProgressCRUD.backfill_rollups(db) == 2
+        assert db.get(UserProgressRollupDB, "x").total_practices == 1
+        assert db.get(UserCharacterRollupDB, ("y", "一")).best_score == 75
+
+    def test_rebuild_replaces_existing_rollup(self, db):
+        UserProgressCRUD.create_practice_record(db, _record(score=40))
+        record = UserProgressCRUD.create_practice_record(db, _record(character="一", score=90))
+        db.delete(record)
+        db.commit()
+
+        UserProgressCRUD.rebuild_rollup(db, "u1")
+        db.commit()
+        summary = UserProgressCRUD.get_progress_summary(db, "u1")
+
+        assert summary["total_practices"] == 1
+        assert list(summary["character_stats"]) == ["永"]
+
+
+class TestStreak:
+    """Test streak state maintained with each record"""
+
+    def _practice_on(self, db, clock, day, user_id="u1"):
+        clock.now_value = datetime(2024, 3, 1, 9, 0) + timedelta(days=day)
+        UserProgressCRUD.create_practice_record(db, _record(user_id=user_id))
+
+    def _today(self, clock, day):
+        clock.now_value = datetime(2024, 3, 1, 20, 0) + timedelta(days=day)
+
+    def test_no_practice(self, db, clock):
+        streak = UserProgressCRUD.get_streak(db, "u1")
+
+        assert streak["current_streak"] == 0
+        assert streak["last_practice_date"] is None
+
+    def test_consecutive_days(self, db, clock):
+        for day in (0, 1, 1, 2, 3):
+            self._practice_on(db, clock, day)
+
+        streak = UserProgressCRUD.get_streak(db, "u1")
+
+        assert streak["current_streak"] == 4
+        assert streak["longest_streak"] == 4
+        assert streak["last_practice_date"] == datetime(2024, 3, 4).date()
+
+    def test_gap_resets_current_keeps_longest(self, db, clock):
+        for day in (0, 1, 2, 5, 6):
+            self._practice_on(db, clock, day)
+
+        streak = UserProgressCRUD.get_streak(db, "u1")
+
+        assert streak["current_streak"] == 2
+        assert streak["longest_streak"] == 3
+
+    def test_current_streak_zero_when_not_practiced_today(self, db, clock):
+        for day in (0, 1):
+            self._practice_on(db, clock, day)
+        self._today(clock, 3)
+
+        streak = UserProgressCRUD.get_streak(db, "u1")
+
+        assert streak["current_streak"] == 0
+        assert streak["longest_streak"] == 2
+
+    def test_streak_update_needs_no_date_scan(self, db, clock, count_queries):
+        for day in range(20):
+            self._practice_on(db, clock, day)
+
+        with count_queries as counter:
+            self._practice_on(db, clock, 20)
+
+        # Rollup, character rollup, daily bucket and goal lookups, refresh of the new record
+        assert counter.selects <= 5
+        assert UserProgressCRUD.get_streak(db, "u1")["current_streak"] == 21
+
+    def test_out_of_order_record_recomputes(self, db, clock):
+        for day in (0, 1, 3):
+            self._practice_on(db, clock, day)
+        # Late-synced record fills the gap
+        db.add(PracticeRecordDB(
+            user_id="u1", character="永", total_score=80, stroke_scores=[80],
+            stroke_order_correct=True, time_spent=1.0, stroke_count=1, score_level="good",
+            created_at=datetime(2024, 3, 3, 9, 0),
+        ))
+        rollup = db.get(UserProgressRollupDB, "u1")
+        UserProgressCRUD._advance_streak(db, rollup, datetime(2024, 3, 3).date())
+        db.commit()
+
+        streak = UserProgressCRUD.get_streak(db, "u1")
+
+        assert streak["current_streak"] == 4
+        assert streak["longest_streak"] == 4
+
+    def test_backfill_matches_incremental(self, db, clock):
+        for day in (0, 1, 2, 4, 5, 6, 7, 9):
+            self._practice_on(db, clock, day)
+        incremental = UserProgressCRUD.get_streak(db, "u1")
+
+        UserProgressCRUD.backfill_rollups(db)
+
+        assert UserProgressCRUD.get_streak(db, "u1") == incremental
+        assert incremental["longest_streak"] == 4
+
+
+class TestDailyStats:
+    """Test daily_user_stats buckets read by the analytics endpoint"""
+
+    def _practice_on(self, db, clock, day, **kwargs):
+        clock.now_value = datetime(2024, 3, 1, 9, 0) + timedelta(days=day)
+        UserProgressCRUD.create_practice_record(db, _record(**kwargs))
+
+    def _history(self, db, clock):
+        self._practice_on(db, clock, 0, score=95)
+        self._practice_on(db, clock, 0, score=85)
+        self._practice_on(db, clock, 0, score=50, mode="expert")
+        self._practice_on(db, clock, 2, score=70)
+        self._practice_on(db, clock, 40, score=65)
+
+    def test_buckets_updated_with_record(self, db, clock):
+        self._history(db, clock)
+
+        bucket = db.get(DailyUserStatsDB, ("u1", datetime(2024, 3, 1).date(), "basic"))
+        assert bucket.practice_count == 2
+        assert bucket.score_sum == 180
+        assert (bucket.excellent_count, bucket.good_count, bucket.pass_count, bucket.fail_count) == (1, 1, 0, 0)
+        assert db.query(DailyUserStatsDB).count() == 4
+
+    def test_analytics(self, db, clock):
+        self._history(db, clock)
+        clock.now_value = datetime(2024, 4, 10, 20, 0)
+
+        analytics = UserProgressCRUD.get_analytics(db, "u1")
+
+        assert analytics["mode_statistics"] == [
+            {"mode": "basic", "count": 4, "average_score": pytest.approx(78.75)},
+            {"mode": "expert", "count": 1, "average_score": 50.0},
+        ]
+        assert analytics["level_distribution"] == [
+            {"level": "excellent", "count": 1},
+            {"level": "good", "count": 1},
+            {"level": "pass", "count": 2},
+            {"level": "fail", "count": 1},
+        ]
+        # Only the last 30 days
+        assert analytics["daily_trends"] == [
+            {"date": "2024-04-10", "count": 1, "average_score": 65.0},
+        ]
+
+    def test_trends_merge_modes(self, db, clock):
+        self._history(db, clock)
+        clock.now_value = datetime(2024, 3, 5, 12, 0)
+
+        trends = UserProgressCRUD.get_analytics(db, "u1")["daily_trends"]
+
+        assert trends[:2] == [
+            {"date": "2024-03-01", "count": 3, "average_score": pytest.approx(230 / 3)},
+            {"date": "2024-03-03", "count": 1, "average_score": 70.0},
+        ]
+
+    def test_analytics_reads_no_records(self, db, clock, count_queries):
+        for day in range(60):
+            for _ in range(3):
+                self._practice_on(db, clock, day, score=60 + day % 40)
+
+        with count_queries as counter:
+            analytics = UserProgressCRUD.get_analytics(db, "u1")
+
+        assert len(analytics["daily_trends"]) == 30
+        assert analytics["daily_trends"][0]["date"] == "2024-03-31"
+        assert counter.selects == 2
+        assert "practice_records" not in " ".join(counter.statements)
+
+    def test_rebuild_matches_incremental(self, db, clock):
+        self._history(db, clock)
+        clock.now_value = datetime(2024, 4, 10, 20, 0)
+        incremental = UserProgressCRUD.get_analytics(db, "u1")
+
+        UserProgressCRUD.backfill_rollups(db)
+
+        assert UserProgressCRUD.get_analytics(db, "u1") == incremental
+
+    def test_history_before_buckets_is_backfilled(self, db, clock):
+        db.add(PracticeRecordDB(
+            user_id="old", character="永", total_score=92, stroke_scores=[92],
+            stroke_order_correct=True, time_spent=30.0, stroke_count=5, score_level="excellent",
+            mode="timed", created_at=datetime(2024, 3, 10, 8, 0),
+        ))
+        db.commit()
+
+        analytics = UserProgressCRUD.get_analytics(db, "old")
+
+        assert analytics["mode_statistics"] == [{"mode": "timed", "count": 1, "average_score": 92.0}]
+        assert analytics["daily_trends"][0]["date"] == "2024-03-10"
+
+    def test_empty_user(self, db):
+        assert UserProgressCRUD.get_analytics(db, "nobody") == {
+            "mode_statistics": [],
+            "level_distribution": [],
+            "daily_trends": [],
+        }
+
+    def test_user_without_records_not_rebuilt(self, db, count_queries, monkeypatch):
+        def fail(*args):
+            raise AssertionError("rebuild_rollup ran in a read request")
+
+        monkeypatch.setattr(UserProgressCRUD, "rebuild_rollup", staticmethod(fail))
+
+        with count_queries as counter:
+            UserProgressCRUD.get_analytics(db, "nobody")
+            UserProgressCRUD.get_progress_summary(db, "nobody")
+            UserProgressCRUD.get_streak(db, "nobody")
+
+        # Each read (analytics reads buckets twice) plus one EXISTS on practice_records
+        assert counter.selects == 7
+        assert sum("EXISTS" in statement for statement in counter.statements) == 3
+        assert not any("daily_user_stats" in statement and "DELETE" in statement
+                       for statement in counter.statements)
+
+    def test_endpoint(self, api_client):
+        api_client.post("/api/user-progress/practice", json={
+            "user_id": "api", "character": "永", "total_score": 88, "stroke_scores": [88],
+            "stroke_order_correct": True, "time_spent": 20.0, "stroke_count": 5,
+        })
+
+        response = api_client.get("/api/user-progress/analytics", params={"user_id": "api"})
+
+        assert response.status_code == 200
+        assert response.json()["mode_statistics"] == [{"mode": "basic", "count": 1, "average_score": 88.0}]
+        assert response.json()["level_distribution"] == [{"level": "good", "count": 1}]
+
+
+class TestGoalProgress:
+    """Test goal progress applied in the practice-record transaction"""
+
+    def _goals(self, db, user_id="u1"):
+        for goal_type, target in (("daily_score", 150), ("character_count", 5), ("time_spent", 10)):
+            UserProgressCRUD.create_goal(db, PracticeGoalCreate(user_id=user_id, goal_type=goal_type, target_value=target))
+
+    def test_basic_record_updates_all_goal_types(self, db):
+        self._goals(db)
+
+        UserProgressCRUD.create_practice_record(db, _record(score=80, time_spent=120.0))
+        UserProgressCRUD.create_practice_record(db, _record(score=90, time_spent=60.0))
+
+        goals = {g.goal_type: g for g in db.query(PracticeGoalDB)}
+        assert goals["daily_score"].current_value == 170
+        assert goals["daily_score"].achieved
+        assert goals["character_count"].current_value == 2
+        assert goals["time_spent"].current_value == pytest.approx(3.0)
+        assert not goals["time_spent"].achieved
+
+    def test_other_modes_do_not_count(self, db):
+        self._goals(db)
+
+        UserProgressCRUD.create_practice_record(db, _record(mode="expert"))
+
+        assert all(g.current_value == 0 for g in db.query(PracticeGoalDB))
+
+    def test_goals_loaded_once(self, db, count_queries):
+        self._goals(db)
+        UserProgressCRUD.create_practice_record(db, _record())
+
+        with count_queries as counter:
+            UserProgressCRUD.create_practice_record(db, _record())
+
+        goal_selects = [s for s in counter.statements if "FROM practice_goals" in s]
+        assert len(goal_selects) == 1
+
+    def test_failure_rolls_back_record(self, db, monkeypatch):
+        self._goals(db)
+
+        def fail(*args):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(UserProgressCRUD, "_apply_goal_increments", fail)
+        with pytest.raises(RuntimeError):
+            UserProgressCRUD.create_practice_record(db, _record())
+        db.rollback()
+
+        assert db.query(PracticeRecordDB).count() == 0
+        assert db.get(UserProgressRollupDB, "u1") is None
+
+
+def _sync_item(client_id, day=0, user_id="u1", **kwargs):
+    data = _record(user_id=user_id, **kwargs).model_dump()
+    return PracticeRecordSyncItem(
+        **data,
+        client_record_id=client_id,
+        practiced_at=datetime(2024, 3, 1, 9, 0) + timedelta(days=day, minutes=len(client_id)),
+    )
+
+
+class TestBulkSync:
+    """Test idempotent bulk ingest of offline practice records"""
+
+    def test_creates_records_and_rollups(self, db, clock):
+        items = [
+            _sync_item(f"r{i}", day=i // 3, character="永一人"[i % 3], score=50 + i * 3, mode="basic" if i % 2 else "timed")
+            for i in range(12)
+        ]
+
+        results = UserProgressCRUD.sync_practice_records(db, items)
+
+        assert [r.client_record_id for r in results] == [item.client_record_id for item in items]
+        assert not any(r.duplicate for r in results)
+        assert db.query(PracticeRecordDB).count() == 12
+        clock.now_value = datetime(2024, 3, 4, 20, 0)
+        incremental = (
+            UserProgressCRUD.get_progress_summary(db, "u1"),
+            UserProgressCRUD.get_streak(db, "u1"),
+            UserProgressCRUD.get_analytics(db, "u1"),
+        )
+        UserProgressCRUD.backfill_rollups(db)
+        assert incremental == (
+            UserProgressCRUD.get_progress_summary(db, "u1"),
+            UserProgressCRUD.get_streak(db, "u1"),
+            UserProgressCRUD.get_analytics(db, "u1"),
+        )
+        assert incremental[1]["current_streak"] == 4
+
+    def test_retry_is_idempotent(self, db):
+        items = [_sync_item(f"r{i}", score=70) for i in range(5)]
+        first = UserProgressCRUD.sync_practice_records(db, items)
+
+        second = UserProgressCRUD.sync_practice_records(db, items + [_sync_item("r5", score=90)])
+
+        assert [r.id for r in second[:5]] == [r.id for r in first]
+        assert all(r.duplicate for r in second[:5])
+        assert not second[5].duplicate
+        summary = UserProgressCRUD.get_progress_summary(db, "u1")
+        assert summary["total_practices"] == 6
+        assert summary["best_score"] == 90
+
+    def test_duplicates_within_request(self, db):
+        results = UserProgressCRUD.sync_practice_records(db, [_sync_item("same"), _sync_item("same")])
+
+        assert [r.duplicate for r in results] == [False, True]
+        assert results[0].id == results[1].id
+        assert db.query(PracticeRecordDB).count() == 1
+
+    def test_client_ids_scoped_per_user(self, db):
+        results = UserProgressCRUD.sync_practice_records(
+            db, [_sync_item("r1", user_id="a"), _sync_item("r1", user_id="b")]
+        )
+
+        assert not any(r.duplicate for r in results)
+
+    def test_backdated_records_after_online_practice(self, db, clock):
+        clock.now_value = datetime(2024, 3, 5, 12, 0)
+        UserProgressCRUD.create_practice_record(db, _record(score=99))
+
+        UserProgressCRUD.sync_practice_records(
+            db, [_sync_item(f"r{day}", day=day, score=60 + day) for day in range(4)]
+        )
+        streak = UserProgressCRUD.get_streak(db, "u1")
+        summary = UserProgressCRUD.get_progress_summary(db, "u1")
+
+        assert streak["current_streak"] == 5
+        assert summary["recent_scores"] == [99, 63, 62, 61, 60]
+
+    def test_future_practiced_at_rejected(self):
+        from pydantic import ValidationError
+
+        with pytest.raises(ValidationError):
+            PracticeRecordSyncItem(
+                **_record().model_dump(),
+                client_record_id="future",
+                practiced_at=datetime.now(timezone.utc) + timedelta(days=2),
+            )
+
+    def test_clock_skew_clamped(self, db, monkeypatch):
+        # Within the allowed skew: stored as "now", so the streak and later practices stay on the fast path
+        item = PracticeRecordSyncItem(
+            **_record().model_dump(),
+            client_record_id="skewed",
+            practiced_at=datetime.utcnow() + timedelta(minutes=2),
+        )
+        assert item.practiced_at <= datetime.utcnow()
+
+        UserProgressCRUD.sync_practice_records(db, [item])
+        rebuilds = []
+        monkeypatch.setattr(
+            UserProgressCRUD, "rebuild_rollup", staticmethod(lambda db, user_id: rebuilds.append(user_id))
+        )
+        UserProgressCRUD.create_practice_record(db, _record(score=90))
+        streak = UserProgressCRUD.get_streak(db, "u1")
+
+        assert rebuilds == []
+        assert streak["current_streak"] == 1
+        assert streak["last_practice_date"] == datetime.utcnow().date()
+
+    def test_endpoint_rejects_future_record(self, api_client):
+        practiced_at = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+        response = api_client.post("/api/user-progress/practice/sync", json={"records": [{
+            "user_id": "api", "character": "永", "total_score": 80, "stroke_scores": [80],
+            "stroke_order_correct": True, "time_spent": 20.0, "stroke_count": 5,
+            "client_record_id": "future", "practiced_at": practiced_at,
+        }]})
+
+        assert response.status_code == 422
+        api_client.post("/api/user-progress/practice", json={
+            "user_id": "api", "character": "永", "total_score": 80, "stroke_scores": [80],
+            "stroke_order_correct": True, "time_spent": 20.0, "stroke_count": 5,
+        })
+        streak = api_client.get("/api/user-progress/streak", params={"user_id": "api"}).json()
+        assert streak["current_streak"] == 1
+        assert streak["last_practice_date"].startswith(datetime.utcnow().date().isoformat())
+
+    def test_single_insert_statement(self, db, count_queries):
+        items = [_sync_item(f"r{i}", character="永一"[i % 2]) for i in range(200)]
+
+        with count_queries as counter:
+            UserProgressCRUD.sync_practice_records(db, items)
+
+        inserts = [s for s in counter.statements if s.lstrip().upper().startswith("INSERT INTO PRACTICE_RECORDS")]
+        assert len(inserts) == 1
+        assert db.query(PracticeRecordDB).count() == 200
+
+    def test_goals_updated_in_aggregate(self, db):
+        for goal_type, target in (("daily_score", 500), ("character_count", 3), ("time_spent", 100)):
+            UserProgressCRUD.create_goal(db, PracticeGoalCreate(user_id="u1", goal_type=goal_type, target_value=target))
+
+        UserProgressCRUD.sync_practice_records(db, [
+            _sync_item("r1", score=80),
+            _sync_item("r2", score=90),
+            _sync_item("r3", score=70, mode="expert"),
+        ])
+
+        goals = {g.goal_type: g for g in db.query(PracticeGoalDB)}
+        assert goals["daily_score"].current_value == 170
+        assert goals["character_count"].current_value == 2
+        assert goals["time_spent"].current_value == pytest.approx(2.0)
+        assert not any(g.achieved for g in goals.values())
+
+    def test_endpoint(self, api_client):
+        payload = {"records": [
+            {
+                "user_id": "api", "character": "永", "total_score": 80, "stroke_scores": [80],
+                "stroke_order_correct": True, "time_spent": 20.0, "stroke_count": 5,
+                "client_record_id": f"c{i}", "practiced_at": "2024-03-01T09:00:00+08:00",
+            }
+            for i in range(3)
+        ]}
+
+        first = api_client.post("/api/user-progress/practice/sync", json=payload)
+        retry = api_client.post("/api/user-progress/practice/sync", json=payload)
+
+        assert first.status_code == 200
+        assert (first.json()["created"], first.json()["duplicates"]) == (3, 0)
+        assert (retry.json()["created"], retry.json()["duplicates"]) == (0, 3)
+        records = api_client.get("/api/user-progress/practice", params={"user_id": "api"}).json()
+        assert {r["client_record_id"] for r in records} == {"c0", "c1", "c2"}
+        assert records[0]["created_at"].startswith("2024-03-01T01:00:00")
+
+    def test_endpoint_rejects_oversized_batch(self, api_client):
+        record = {
+            "user_id": "api", "character": "永", "total_score": 80, "stroke_scores": [80],
+            "stroke_order_correct": True, "time_spent": 20.0, "stroke_count": 5,
+        }
+        payload = {"records": [dict(record, client_record_id=str(i)) for i in range(501)]}
+
+        assert api_client.post("/api/user-progress/practice/sync", json=payload).status_code == 422
+
+
+class TestRecordPagination:
+    """Test keyset pagination of practice records"""
+
+    def _records(self, db, clock, count=45):
+        for i in range(count):
+            # Several records per timestamp: ties are broken by id
+            clock.now_value = datetime(2024, 3, 1, 9, 0) + timedelta(minutes=i // 4)
+            UserProgressCRUD.create_practice_record(db, _record(character="永一"[i % 2], score=i))
+
+    def _all_pages(self, db, **kwargs):
+        pages, cursor = [], None
+        while True:
+            items, _, cursor = UserProgressCRUD.get_user_records(db, "u1", cursor=cursor, **kwargs)
+            pages.append(items)
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_all_records_in_order(self, db, clock):
+        self._records(db, clock)
+
+        pages = self._all_pages(db, limit=10)
+        records = [r for page in pages for r in page]
+
+        assert [len(page) for page in pages] == [10, 10, 10, 10, 5]
+        assert [r.total_score for r in records] == list(range(44, -1, -1))
+
+    def test_filters_apply_to_pages(self, db, clock):
+        self._records(db, clock)
+
+        records = [r for page in self._all_pages(db, character="一", limit=7) for r in page]
+
+        assert len(records) == 22
+        assert {r.character for r in records} == {"一"}
+
+    def test_total_is_optional(self, db, clock, count_queries):
+        self._records(db, clock, count=5)
+
+        with count_queries as counter:
+            items, total, cursor = UserProgressCRUD.get_user_records(db, "u1", limit=10)
+
+        assert (len(items), total, cursor) == (5, None, None)
+        assert counter.selects == 1
+        assert UserProgressCRUD.get_user_records(db, "u1", include_total=True)[1] == 5
+
+    def test_deep_page_seeks_by_key(self, db, clock, count_queries):
+        self._records(db, clock)
+        _, _, cursor = UserProgressCRUD.get_user_records(db, "u1", limit=40)
+
+        with count_queries as counter:
+            items, _, _ = UserProgressCRUD.get_user_records(db, "u1", cursor=cursor, limit=40)
+
+        assert len(items) == 5
+        assert "(practice_records.created_at, practice_records.id) < (" in counter.statements[0]
+
+    def test_legacy_skip(self, db, clock):
+        self._records(db, clock, count=10)
+
+        items, _, cursor = UserProgressCRUD.get_user_records(db, "u1", skip=8, limit=5)
+
+        assert [r.total_score for r in items] == [1, 0]
+        assert cursor is None
+
+    def test_invalid_cursor(self, db):
+        with pytest.raises(ValueError):
+            UserProgressCRUD.get_user_records(db, "u1", cursor="garbage")
+
+    def test_endpoint_cursor_header(self, api_client):
+        for score in range(5):
+            api_client.post("/api/user-progress/practice", json={
+                "user_id": "api", "character": "永", "total_score": score, "stroke_scores": [score],
+                "stroke_order_correct": True, "time_spent": 10.0, "stroke_count": 5,
+            })
+
+        first = api_client.get("/api/user-progress/practice", params={"user_id": "api", "limit": 3})
+        second = api_client.get("/api/user-progress/practice", params={
+            "user_id": "api", "limit": 3, "cursor": first.headers["X-Next-Cursor"], "include_total": True,
+        })
+
+        assert [r["total_score"] for r in first.json()] == [4, 3, 2]
+        assert [r["total_score"] for r in second.json()] == [1, 0]
+        assert "X-Next-Cursor" not in second.headers
+        assert second.headers["X-Total-Count"] == "5"
+        bad = api_client.get("/api/user-progress/practice", params={"user_id": "api", "cursor": "garbage"})
+        assert bad.status_code == 400
@@ -0,0 +1,155 @@
+"""
+Startup Warmup Tests - 启动预热测试
+
+Tests for the lifespan warmup phase and readiness reporting.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi.testclient import TestClient
+
+from app.models.character import CharacterData
+from app.warmup import WarmupState, run_warmup, get_warmup_characters, warmup_from_env, warmup_state
+
+
+@pytest.fixture
+def mock_loader():
+    """Loader returning a two-stroke character, failing for '错'"""
+    character = CharacterData.from_hanzi_writer(
+        {
+            "strokes": ["M 0 0", "M 1 1"],
+            "medians": [[[200, 500], [800, 500]], [[500, 200], [500, 800]]],
+        },
+        character="十",
+    )
+
+    async def load_character(char):
+        if char == "错":
+            raise ValueError("not found")
+        return character
+
+    loader = MagicMock()
+    loader.load_character = AsyncMock(side_effect=load_character)
+    return loader
+
+
+class TestGetWarmupCharacters:
+    """Test warmup character list resolution"""
+
+    def test_configured_characters(self, monkeypatch):
+        monkeypatch.setenv("WARMUP_CHARACTERS", "永, 一，十永")
+        assert get_warmup_characters() == ["永", "一", "十"]
+
+    def test_top_practiced_characters_first(self, monkeypatch):
+        monkeypatch.setenv("WARMUP_CHARACTERS", "永")
+        db = MagicMock()
+        rows = db.query.return_value.group_by.return_value.order_by.return_value
+        rows.limit.return_value.all.return_value = [("大",), ("永",)]
+
+        assert get_warmup_characters(db=db, top_n=2) == ["大", "永"]
+
+
+class TestRunWarmup:
+    """Test warmup execution"""
+
+    @pytest.mark.asyncio
+    async def test_loads_characters_and_warms_scoring(self, mock_loader):
+        state = await run_warmup(mock_loader, ["十", "错"], state=WarmupState())
+
+        assert state.ready
+        assert not state.running
+        assert state.characters_loaded == ["十"]
+        assert state.characters_failed == ["错"]
+        assert state.scoring_warmed
+        assert state.models_loaded == []
+        assert state.duration_ms is not None
+
+    @pytest.mark.asyncio
+    async def test_scoring_warmed_without_templates(self, mock_loader):
+        state = await run_warmup(mock_loader, ["错"], state=WarmupState())
+
+        assert state.ready
+        assert state.scoring_warmed
+
+    @pytest.mark.asyncio
+    async def test_preload_models(self, mock_loader):
+        state = await run_warmup(mock_loader, [], preload_models=True, state=WarmupState())
+
+        assert set(state.models_loaded) == {"inksight", "paddleocr"}
+
+
+class TestWarmupFromEnv:
+    """Test the lifespan entry point"""
+
+    @pytest.mark.asyncio
+    async def test_preloads_most_practiced_from_database(self, engine, db, mock_loader, monkeypatch):
+        import app.database
+        from sqlalchemy.orm import sessionmaker
+        from app.models.user_progress_db import PracticeRecordDB
+
+        db.add_all(
+            PracticeRecordDB(
+                user_id="u1", character=char, total_score=80, stroke_scores=[80],
+                stroke_order_correct=True, time_spent=10.0, stroke_count=3, score_level="good",
+            )
+            for char in "大大大人"
+        )
+        db.commit()
+
+        sessions = []
+        factory = sessionmaker(bind=engine)
+
+        def session_local():
+            sessions.append(factory())
+            return sessions[-1]
+
+        monkeypatch.setattr(app.database, "SessionLocal", session_local)
+        monkeypatch.setenv("WARMUP_CHARACTERS", "永")
+        monkeypatch.setenv("WARMUP_TOP_N", "2")
+        monkeypatch.setattr("app.warmup.warmup_state", WarmupState())
+
+        state = await warmup_from_env(mock_loader)
+
+        assert [call.args[0] for call in mock_loader.load_character.await_args_list] == ["大", "人", "永"]
+        assert state.characters_loaded == ["大", "人", "永"]
+        assert len(sessions) == 1
+
+    @pytest.mark.asyncio
+    async def test_skips_database_without_top_n(self, mock_loader, monkeypatch):
+        import app.database
+
+        monkeypatch.setattr(app.database, "SessionLocal", MagicMock(side_effect=AssertionError))
+        monkeypatch.setenv("WARMUP_CHARACTERS", "永")
+        monkeypatch.delenv("WARMUP_TOP_N", raising=False)
+        monkeypatch.setattr("app.warmup.warmup_state", WarmupState())
+
+        await warmup_from_env(mock_loader)
+
+        assert [call.args[0] for call in mock_loader.load_character.await_args_list] == ["永"]
+
+
+class TestReadiness:
+    """Test liveness vs readiness endpoints"""
+
+    def test_ready_when_warmup_disabled(self, monkeypatch):
+        from app.main import app
+
+        monkeypatch.setenv("WARMUP_ENABLED", "false")
+        monkeypatch.setattr(warmup_state, "ready", False)
+
+        with TestClient(app) as client:
+            assert client.get("/health").json() == {"status": "healthy", "ready": True}
+            response = client.get("/health/ready")
+            assert response.status_code == 200
+            assert response.json()["status"] == "ready"
+
+    def test_not_ready_before_warmup(self, monkeypatch):
+        from app.main import app
+
+        monkeypatch.setattr(warmup_state, "ready", False)
+        client = TestClient(app)  # lifespan not started
+
+        assert client.get("/health").status_code == 200
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
@@ -0,0 +1,289 @@
+"""
+Worksheet Segmentation Tests - 田字格练习纸分割测试
+
+Tests for grid detection, cell cropping and whole-sheet scoring.
+"""
+
+import asyncio
+
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, patch
+
+cv2 = pytest.importorskip("cv2")
+
+from fastapi.testclient import TestClient
+
+from app.api.scoring import _loader
+from app.main import app
+from app.models.posture import ComprehensiveScoreResult
+from app.preprocessing.stroke_graph import extract_strokes_from_image
+from app.preprocessing.worksheet import segment_worksheet
+
+
+def _make_sheet(rows=3, cols=4, cell=120, gap=0, written=None):
+    """White sheet with a rows x cols 田字格 grid (dashed guides); written maps (row, col) -> 一/十"""
+    written = written or {}
+    width = cols * cell + (cols - 1) * gap + 80
+    height = rows * cell + (rows - 1) * gap + 80
+    sheet = np.full((height, width, 3), 250, dtype=np.uint8)
+    for r in range(rows):
+        for c in range(cols):
+            x, y = 40 + c * (cell + gap), 40 + r * (cell + gap)
+            cv2.rectangle(sheet, (x, y), (x + cell, y + cell), (30, 30, 30), 2)
+            for t in range(0, cell, 12):
+                cv2.line(sheet, (x + t, y + cell // 2), (x + t + 5, y + cell // 2), (200, 120, 120), 1)
+                cv2.line(sheet, (x + cell // 2, y + t), (x + cell // 2, y + t + 5), (200, 120, 120), 1)
+            char = written.get((r, c))
+            if char in ("一", "十"):
+                cv2.line(sheet, (x + 20, y + 50), (x + 100, y + 52), (0, 0, 0), 8)
+            if char == "十":
+                cv2.line(sheet, (x + 60, y + 15), (x + 58, y + 105), (0, 0, 0), 8)
+    return sheet
+
+
+def _on_desk(sheet):
+    """Photograph the sheet in perspective on a dark desk"""
+    h, w = sheet.shape[:2]
+    desk = np.full((h + 300, w + 300, 3), 50, dtype=np.uint8)
+    src = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    dst = np.float32([[150, 140], [w + 160, 170], [w + 130, h + 150], [120, h + 130]])
+    matrix = cv2.getPerspectiveTransform(src, dst)
+    return cv2.warpPerspective(
+        sheet, matrix, (desk.shape[1], desk.shape[0]), dst=desk, borderMode=cv2.BORDER_TRANSPARENT
+    )
+
+
+def _encode(image):
+    ok, buffer = cv2.imencode(".png", image[..., ::-1])
+    assert ok
+    return buffer.tobytes()
+
+
+WRITTEN = {(0, 0): "一", (1, 2): "十", (2, 3): "十"}
+
+
+class TestSegmentWorksheet:
+    """Test grid detection and cell cropping"""
+
+    def test_flat_sheet(self):
+        cells = segment_worksheet(_make_sheet(written=WRITTEN), rectify=False)
+
+        assert len(cells) == 12
+        assert [(c.row, c.col) for c in cells[:5]] == [(0, 0), (0, 1), (0, 2), (0, 3), (1, 0)]
+        assert {(c.row, c.col) for c in cells if c.has_ink} == set(WRITTEN)
+
+    def test_photo_in_perspective(self):
+        cells = segment_worksheet(_on_desk(_make_sheet(written=WRITTEN)))
+
+        assert len(cells) == 12
+        assert {(c.row, c.col) for c in cells if c.has_ink} == set(WRITTEN)
+
+    def test_cells_separated_by_gaps(self):
+        cells = segment_worksheet(_make_sheet(rows=2, cols=3, gap=20), rectify=False)
+
+        assert len(cells) == 6
+        widths = {c.box[2] for c in cells}
+        assert max(widths) - min(widths) <= 2
+
+    def test_grid_lines_removed_from_cells(self):
+        cells = segment_worksheet(_make_sheet(written=WRITTEN), rectify=False)
+        by_position = {(c.row, c.col): c for c in cells}
+
+        assert len(extract_strokes_from_image(by_position[(0, 0)].image)) == 1
+        assert len(extract_strokes_from_image(by_position[(1, 2)].image)) == 2
+
+    def test_expected_shape_without_grid(self):
+        blank = np.full((300, 400, 3), 250, dtype=np.uint8)
+
+        cells = segment_worksheet(blank, rows=2, cols=2, rectify=False)
+
+        assert len(cells) == 4
+        assert not any(c.has_ink for c in cells)
+
+    def test_no_grid_raises(self):
+        with pytest.raises(ValueError):
+            segment_worksheet(np.full((300, 400, 3), 250, dtype=np.uint8), rectify=False)
+
+
+def _score(total):
+    return ComprehensiveScoreResult(
+        total_score=total,
+        handwriting_score=total,
+        posture_score=100.0,
+        grade="良好",
+        feedback="",
+    )
+
+
+class TestScoreWorksheetEndpoint:
+    """Test POST /api/score/worksheet"""
+
+    def test_scores_written_cells(self):
+        client = TestClient(app)
+        scored = []
+
+        def fake_score(request, reference_data):
+            scored.append(request.character)
+            # Runs in a worker thread, not on the event loop
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            return _score(80.0)
+
+        with patch("app.api.scoring._extract_user_strokes_batch") as mock_extract, \
+                patch("app.api.scoring._score_comprehensive", side_effect=fake_score), \
+                patch.object(_loader, "load_character", AsyncMock()) as mock_load:
+            mock_extract.side_effect = lambda images: [[[(0.1, 0.5), (0.9, 0.5)]] for _ in images]
+            response = client.post(
+                "/api/score/worksheet",
+                files={"image": ("sheet.png", _encode(_make_sheet(written=WRITTEN)), "image/png")},
+                data={"characters": "一"},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["rows"], data["cols"]) == (3, 4)
+        # Three cells of one character share a single reference load
+        mock_load.assert_awaited_once_with("一")
+        assert mock_extract.call_count == 1
+        assert len(mock_extract.call_args[0][0]) == 3
+        assert scored == ["一"] * 3
+        assert data["scored_count"] == 3
+        assert data["average_score"] == 80.0
+        statuses = {(c["row"], c["col"]): c["status"] for c in data["cells"]}
+        assert statuses[(0, 0)] == "scored"
+        assert statuses[(0, 1)] == "empty"
+
+    def test_characters_in_row_major_order(self):
+        client = TestClient(app)
+
+        def fake_score(request, reference_data):
+            return _score(90.0)
+
+        with patch("app.api.scoring._extract_user_strokes_batch") as mock_extract, \
+                patch("app.api.scoring._score_comprehensive", side_effect=fake_score), \
+                patch.object(_loader, "load_character", AsyncMock()):
+            mock_extract.side_effect = lambda images: [None for _ in images]
+            response = client.post(
+                "/api/score/worksheet",
+                files={"image": ("sheet.png", _encode(_make_sheet(written=WRITTEN)), "image/png")},
+                data={"characters": "一二三四 五六"},
+            )
+
+        cells = {(c["row"], c["col"]): c for c in response.json()["cells"]}
+        assert cells[(0, 0)]["character"] == "一"
+        assert cells[(0, 0)]["status"] == "no_strokes"
+        assert cells[(1, 1)]["character"] == "六"
+        assert cells[(1, 2)]["status"] == "skipped"
+
+    def test_verify_skips_mismatched_cells(self):
+        from app.models.paddle_ocr import CharacterVerification
+
+        client = TestClient(app)
+
+        def fake_score(request, reference_data):
+            return _score(70.0)
+
+        def fake_verify(images, characters):
+            recognized = ["一", "二", "一"]
+            return [
+                CharacterVerification(
+                    expected=expected, text=text, confidence=0.9, verified=text == expected
+                )
+                for expected, text in zip(characters, recognized)
+            ]
+
+        with patch("app.api.scoring._verify_cells", side_effect=fake_verify) as mock_verify, \
+                patch("app.api.scoring._extract_user_strokes_batch") as mock_extract, \
+                patch("app.api.scoring._score_comprehensive", side_effect=fake_score), \
+                patch.object(_loader, "load_character", AsyncMock()):
+            mock_extract.side_effect = lambda images: [[[(0.1, 0.5), (0.9, 0.5)]] for _ in images]
+            response = client.post(
+                "/api/score/worksheet",
+                files={"image": ("sheet.png", _encode(_make_sheet(written=WRITTEN)), "image/png")},
+                data={"characters": "一", "verify": "true"},
+            )
+
+        data = response.json()
+        assert mock_verify.call_count == 1
+        assert len(mock_extract.call_args[0][0]) == 2
+        cells = {(c["row"], c["col"]): c for c in data["cells"]}
+        assert cells[(1, 2)]["status"] == "mismatch"
+        assert cells[(1, 2)]["recognized"] == "二"
+        assert cells[(0, 0)]["status"] == "scored"
+        assert data["scored_count"] == 2
+
+    def test_grid_not_detected(self):
+        client = TestClient(app)
+        blank = np.full((300, 400, 3), 250, dtype=np.uint8)
+
+        response = client.post(
+            "/api/score/worksheet",
+            files={"image": ("blank.png", _encode(blank), "image/png")},
+            data={"characters": "永"},
+        )
+
+        assert response.status_code == 422
+        assert response.json()["detail"]["error_type"] == "grid_not_detected"
+
+    def test_invalid_image(self):
+        client = TestClient(app)
+
+        response = client.post(
+            "/api/score/worksheet",
+            files={"image": ("sheet.png", b"not an image", "image/png")},
+            data={"characters": "永"},
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["error_type"] == "invalid_image"
+
+    def test_cell_scoring_error_reported(self):
+        client = TestClient(app)
+
+        with patch("app.api.scoring._extract_user_strokes_batch") as mock_extract, \
+                patch.object(_loader, "load_character", AsyncMock(side_effect=ValueError("not found"))):
+            mock_extract.side_effect = lambda images: [[[(0.1, 0.5), (0.9, 0.5)]] for _ in images]
+            response = client.post(
+                "/api/score/worksheet",
+                files={"image": ("sheet.png", _encode(_make_sheet(written=WRITTEN)), "image/png")},
+                data={"characters": "一"},
+            )
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data["scored_count"] == 0
+        assert {c["status"] for c in data["cells"] if c["status"] != "empty"} == {"error"}
+
+    @pytest.mark.parametrize("data", [
+        {"rows": "0", "cols": "4"},
+        {"rows": "10000", "cols": "10000"},
+        {"rows": "20", "cols": "20"},
+    ])
+    def test_oversized_grid_rejected(self, data):
+        client = TestClient(app)
+
+        with patch("app.api.scoring._segment_worksheet_photo") as mock_segment:
+            response = client.post(
+                "/api/score/worksheet",
+                files={"image": ("sheet.png", _encode(_make_sheet()), "image/png")},
+                data={"characters": "永", **data},
+            )
+
+        assert response.status_code == 422
+        mock_segment.assert_not_called()
+
+    def test_detected_grid_over_cap_rejected(self):
+        client = TestClient(app)
+
+        with patch("app.api.scoring.WORKSHEET_MAX_CELLS", 4), \
+                patch("app.api.scoring._extract_user_strokes_batch") as mock_extract:
+            response = client.post(
+                "/api/score/worksheet",
+                files={"image": ("sheet.png", _encode(_make_sheet(written=WRITTEN)), "image/png")},
+                data={"characters": "一"},
+            )
+
+        assert response.status_code == 422
+        assert response.json()["detail"]["error_type"] == "worksheet_too_large"
+        mock_extract.assert_not_called()
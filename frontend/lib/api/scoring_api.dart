@@ -29,11 +29,13 @@ class ScoringApi {
     required String character,
     required XFile photo,
     Map<String, dynamic>? postureData,
+    String? userId,
   }) async {
     final postureJson = postureData != null ? jsonEncode(postureData) : null;
     final formData = FormData.fromMap({
       'character': character,
       if (postureJson != null) 'posture_data': postureJson,
+      if (userId != null) 'user_id': userId,
       'image': await MultipartFile.fromFile(
         photo.path,
         filename: photo.name,